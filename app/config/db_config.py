@@ -1,7 +1,10 @@
 import mysql.connector
 import cx_Oracle
 import logging
-from app.config.env import DB_CONFIG, ORACLE_CONFIG
+import os
+import threading
+from app.config.env import DB_CONFIG, ORACLE_CONFIG, DB_POOL_CONFIG
+from app.config.db_pool import ConnectionPool
 
 logging.basicConfig(level=logging.INFO)
 
@@ -9,6 +12,10 @@ import mysql.connector
 from app.config.env import DB_CONFIG
 import logging
 
+# Pool do banco de metadados, criado sob demanda (um por processo)
+_mysql_pool = None
+_mysql_pool_lock = threading.Lock()
+
 def create_verzo_connection():
     """
     Cria uma conexão específica com o banco MySQL 'verzo'.
@@ -28,35 +35,45 @@ def create_verzo_connection():
         logging.error(f"Erro ao conectar ao banco Verzo: {e}")
         raise ConnectionError(f"Erro ao conectar ao banco Verzo: {e}")
 
+def _open_mysql_connection():
+    conn = mysql.connector.connect(
+        host=DB_CONFIG["host"],
+        port=DB_CONFIG["port"],
+        user=DB_CONFIG["user"],
+        password=DB_CONFIG["password"],
+        database=DB_CONFIG["database"]
+    )
+    logging.info("Conexão bem-sucedida com o banco MySQL.")
+    return conn
+
+def get_mysql_pool():
+    """
+    Retorna o pool do banco MySQL de metadados, recriando-o após um fork
+    (workers do Celery/Gunicorn não podem compartilhar sockets com o pai).
+    """
+    global _mysql_pool
+    pool = _mysql_pool
+    if pool is None or pool.pid != os.getpid():
+        with _mysql_pool_lock:
+            if _mysql_pool is None or _mysql_pool.pid != os.getpid():
+                _mysql_pool = ConnectionPool("verzo-mysql", _open_mysql_connection, **DB_POOL_CONFIG)
+            pool = _mysql_pool
+    return pool
+
 def create_db_connection_mysql():
     """
-    Cria uma conexão com o banco MySQL usando as configurações definidas no env.py.
+    Empresta uma conexão do pool do banco MySQL definido no env.py.
+    `conn.close()` devolve a conexão ao pool.
     """
     try:
-        conn = mysql.connector.connect(
-            host=DB_CONFIG["host"],
-            port=DB_CONFIG["port"],
-            user=DB_CONFIG["user"],
-            password=DB_CONFIG["password"],
-            database=DB_CONFIG["database"]
-        )
-        logging.info("Conexão bem-sucedida com o banco MySQL.")
-        return conn
+        return get_mysql_pool().acquire()
     except mysql.connector.Error as e:
         logging.error(f"Erro ao conectar ao banco MySQL: {e}")
         raise ConnectionError(f"Erro ao conectar ao banco MySQL: {e}")
 
 def create_mysql_connection():
     try:
-        connection = mysql.connector.connect(
-            host=DB_CONFIG["host"],
-            port=DB_CONFIG["port"],
-            user=DB_CONFIG["user"],
-            password=DB_CONFIG["password"],
-            database=DB_CONFIG["database"]
-        )
-        logging.info("Conexão bem-sucedida com o banco MySQL.")
-        return connection
+        return get_mysql_pool().acquire()
     except mysql.connector.Error as e:
         logging.error(f"Erro ao conectar ao MySQL: {e}")
         raise ConnectionError(f"Erro ao conectar ao MySQL: {e}")
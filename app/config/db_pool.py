@@ -0,0 +1,242 @@
+# app/config/db_pool.py
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeoutError(ConnectionError):
+    """
+    Nenhuma conexão ficou disponível no pool dentro do tempo de espera.
+    """
+
+
+def _default_ping(raw):
+    """
+    Verifica se a conexão MySQL continua viva sem tentar reconectar.
+    """
+    raw.ping(reconnect=False)
+
+
+def _default_reset(raw):
+    """
+    Desfaz qualquer transação pendente antes de devolver a conexão ao pool,
+    para que o próximo usuário não herde locks nem um snapshot antigo.
+    """
+    if getattr(raw, "in_transaction", True):
+        raw.rollback()
+
+
+class PooledConnection:
+    """
+    Conexão emprestada de um ConnectionPool.
+
+    `close()` (e o `with ... as conn`) devolve a conexão ao pool em vez de
+    encerrá-la; todo o resto é repassado para a conexão real.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+
+    def close(self):
+        raw, self._raw = self.__dict__.get("_raw"), None
+        if raw is not None:
+            self._pool._release(raw, self._created_at)
+
+    def invalidate(self):
+        """
+        Descarta a conexão em vez de devolvê-la (ex.: após erro de rede).
+        """
+        raw, self._raw = self.__dict__.get("_raw"), None
+        if raw is not None:
+            self._pool._discard(raw)
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get("_raw")
+        if raw is None:
+            raise ConnectionError("Conexão já devolvida ao pool.")
+        return getattr(raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        # Rede de segurança para quem esquece de fechar a conexão.
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Pool de conexões thread-safe com tamanho máximo, tempo de espera no
+    empréstimo, health check das conexões ociosas e reciclagem por idade.
+    """
+
+    def __init__(self, name, connect, pool_size=10, timeout=10.0, recycle=1800,
+                 ping_after=30, ping=None, reset=None):
+        self.name = name
+        self.pid = os.getpid()
+        self.max_size = max(1, int(pool_size))
+        self.timeout = float(timeout)
+        self.recycle = recycle
+        self.ping_after = ping_after
+
+        self._connect = connect
+        self._ping = ping or _default_ping
+        self._reset = reset or _default_reset
+        self._idle = deque()  # (conexão, created_at, released_at)
+        self._size = 0        # conexões abertas: ociosas + emprestadas
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self._acquired = 0
+        self._created = 0
+        self._recycled = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+        self._timeouts = 0
+
+    def acquire(self):
+        """
+        Empresta uma conexão, aguardando até `timeout` segundos se o pool estiver cheio.
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+
+        while True:
+            raw = None
+            with self._cond:
+                while True:
+                    if self._idle:
+                        raw, created_at, released_at = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"Pool '{self.name}' esgotado: nenhuma conexão livre em {self.timeout}s."
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+
+            if raw is not None and not self._is_usable(raw, created_at, released_at):
+                # Conexão velha ou morta: libera a vaga e tenta de novo.
+                self._discard(raw)
+                continue
+
+            if raw is None:
+                try:
+                    raw = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                created_at = time.monotonic()
+                with self._cond:
+                    self._created += 1
+                logging.debug(f"Pool '{self.name}': nova conexão aberta.")
+            break
+
+        elapsed = time.monotonic() - started
+        with self._cond:
+            self._acquired += 1
+            if waited:
+                self._waits += 1
+            self._wait_time += elapsed
+            self._max_wait = max(self._max_wait, elapsed)
+
+        return PooledConnection(self, raw, created_at)
+
+    def _is_usable(self, raw, created_at, released_at):
+        now = time.monotonic()
+        if self.recycle and now - created_at > self.recycle:
+            with self._cond:
+                self._recycled += 1
+            return False
+        if self.ping_after is not None and now - released_at >= self.ping_after:
+            try:
+                self._ping(raw)
+            except Exception as e:
+                logging.warning(f"Pool '{self.name}': conexão ociosa inválida descartada ({e}).")
+                with self._cond:
+                    self._recycled += 1
+                return False
+        return True
+
+    def _release(self, raw, created_at):
+        if os.getpid() != self.pid:
+            # Conexão herdada de outro processo (fork): não pode ser reutilizada aqui.
+            return
+
+        if self._closed:
+            self._discard(raw)
+            return
+
+        try:
+            self._reset(raw)
+        except Exception as e:
+            logging.warning(f"Pool '{self.name}': falha ao limpar conexão, descartando ({e}).")
+            self._discard(raw)
+            return
+
+        if self.recycle and time.monotonic() - created_at > self.recycle:
+            with self._cond:
+                self._recycled += 1
+            self._discard(raw)
+            return
+
+        with self._cond:
+            self._idle.append((raw, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def close_all(self):
+        """
+        Encerra o pool: fecha as conexões ociosas e as emprestadas são
+        fechadas quando forem devolvidas.
+        """
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+        for raw, _, _ in idle:
+            self._discard(raw)
+
+    def stats(self):
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "name": self.name,
+                "max_size": self.max_size,
+                "open": self._size,
+                "idle": idle,
+                "borrowed": self._size - idle,
+                "acquired_total": self._acquired,
+                "created_total": self._created,
+                "recycled_total": self._recycled,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_time_total_ms": round(self._wait_time * 1000, 3),
+                "wait_time_max_ms": round(self._max_wait * 1000, 3),
+            }
@@ -13,6 +13,93 @@ DB_CONFIG = {
     "database": os.getenv("DB_NAME", "verzo")
 }
 
+# Pool de conexões do banco de metadados (Verzo)
+DB_POOL_CONFIG = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", 10)),
+    "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+    "recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+    "ping_after": int(os.getenv("DB_POOL_PING_AFTER", 30))
+}
+
+# Pools das conexões cadastradas (tabela connections). Podem ser sobrescritos
+# por conexão via extra_params: {"pool_min": 1, "pool_max": 5, "pool_timeout": 30}
+TARGET_POOL_CONFIG = {
+    "min": int(os.getenv("TARGET_POOL_MIN", 1)),
+    "max": int(os.getenv("TARGET_POOL_MAX", 5)),
+    "timeout": float(os.getenv("TARGET_POOL_TIMEOUT", 30)),
+    "idle_timeout": int(os.getenv("TARGET_POOL_IDLE_TIMEOUT", 300)),
+    "max_lifetime": int(os.getenv("TARGET_POOL_MAX_LIFETIME", 3600))
+}
+
+# Validade (s) dos dados de conexão já resolvidos em memória
+CONNECTION_CACHE_TTL = int(os.getenv("CONNECTION_CACHE_TTL", 60))
+
+# Validade (s) das permissões de cada usuário em memória. Com REDIS_URL, edições de
+# acesso valem em todos os workers em até CACHE_VERSION_CHECK_INTERVAL s; sem Redis,
+# os outros workers podem levar até esse tempo para deixar de autorizar um acesso revogado.
+PERMISSION_CACHE_TTL = int(os.getenv("PERMISSION_CACHE_TTL", 60))
+# Intervalo (s) mínimo entre consultas ao Redis pela versão de um cache compartilhado
+# (permissões, conexões); 0 consulta a cada uso
+CACHE_VERSION_CHECK_INTERVAL = float(os.getenv("CACHE_VERSION_CHECK_INTERVAL", 5))
+
+# Logs de requisição: enviados ao Celery em lotes (tamanho ou intervalo, o que vier primeiro)
+REQUEST_LOG_BATCH_SIZE = int(os.getenv("REQUEST_LOG_BATCH_SIZE", 200))
+REQUEST_LOG_FLUSH_INTERVAL = float(os.getenv("REQUEST_LOG_FLUSH_INTERVAL", 2))
+REQUEST_LOG_MAX_BUFFER = int(os.getenv("REQUEST_LOG_MAX_BUFFER", 20000))
+
+# Agendador de jobs: um único processo eleito via GET_LOCK do MySQL
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+SCHEDULER_LOCK_NAME = os.getenv("SCHEDULER_LOCK_NAME", "verzo_scheduler")
+SCHEDULER_ELECTION_INTERVAL = float(os.getenv("SCHEDULER_ELECTION_INTERVAL", 15))
+SCHEDULER_REFRESH_INTERVAL = float(os.getenv("SCHEDULER_REFRESH_INTERVAL", 30))
+SCHEDULER_MAX_WORKERS = int(os.getenv("SCHEDULER_MAX_WORKERS", 4))
+
+# Execução paralela em várias conexões
+FANOUT_MAX_WORKERS = int(os.getenv("FANOUT_MAX_WORKERS", 16))
+ROUTE_EXECUTION_TIMEOUT = float(os.getenv("ROUTE_EXECUTION_TIMEOUT", 60))
+# Teto (s) para o timeout enviado no corpo da requisição e para extra_params.execution_timeout
+ROUTE_EXECUTION_MAX_TIMEOUT = float(os.getenv("ROUTE_EXECUTION_MAX_TIMEOUT", 300))
+# Rotas adaptadas após ORA-00904: a query original volta a ser tentada depois de N s (0 = nunca)
+ROUTE_ADAPTATION_TTL = int(os.getenv("ROUTE_ADAPTATION_TTL", 86400))
+EXECUTOR_EXECUTION_TIMEOUT = float(os.getenv("EXECUTOR_EXECUTION_TIMEOUT", 120))
+# Contagem de registros dos executores (?count=none|cached|estimated|exact)
+EXECUTOR_COUNT_DEFAULT = os.getenv("EXECUTOR_COUNT_DEFAULT", "exact")
+EXECUTOR_COUNT_CACHE_TTL = int(os.getenv("EXECUTOR_COUNT_CACHE_TTL", 300))
+
+# Redis compartilhado (ex.: redis://redis:6379/0). "local://" usa um substituto em memória.
+REDIS_URL = os.getenv("REDIS_URL", "")
+
+# Rate limit: "local" (por processo) ou "redis" (compartilhado entre processos e hosts)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "local").lower()
+
+# Cache de resultados de rotas/executores de consulta. TTL padrão (s) para quem
+# não define cache_ttl; 0 = desligado. O cache local é limitado em bytes.
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", 0))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# Respostas em streaming (?format=ndjson|csv): linhas buscadas por fetchmany
+STREAM_ARRAYSIZE = int(os.getenv("STREAM_ARRAYSIZE", 1000))
+STREAM_MAX_ARRAYSIZE = int(os.getenv("STREAM_MAX_ARRAYSIZE", 10000))
+
+# Estrutura de tabelas Oracle (/routes/bluemind/table_structure): TTL (s) e limite de tabelas em cache.
+# SCHEMA_PREFETCH_TABLES ("slug:OWNER.TABELA,...") é recarregado a cada SCHEMA_PREFETCH_INTERVAL s
+# (0 = sem pré-carregamento); use um intervalo menor que o TTL para não haver falhas de cache.
+SCHEMA_CACHE_TTL = int(os.getenv("SCHEMA_CACHE_TTL", 3600))
+SCHEMA_CACHE_MAX_TABLES = int(os.getenv("SCHEMA_CACHE_MAX_TABLES", 5000))
+SCHEMA_PREFETCH_TABLES = os.getenv("SCHEMA_PREFETCH_TABLES", "")
+SCHEMA_PREFETCH_INTERVAL = int(os.getenv("SCHEMA_PREFETCH_INTERVAL", 1800))
+
+# /routes/bluemind/sequence: máximo de valores por pedido (count) e tamanho do bloco
+# reservado em memória por conexão e sequência (0 = sem reserva, NEXTVAL a cada pedido)
+SEQUENCE_MAX_COUNT = int(os.getenv("SEQUENCE_MAX_COUNT", 1000))
+SEQUENCE_BLOCK_SIZE = int(os.getenv("SEQUENCE_BLOCK_SIZE", 0))
+
+# Jobs de integração: linhas por bloco lido da origem e gravado no destino
+INTEGRATION_CHUNK_SIZE = int(os.getenv("INTEGRATION_CHUNK_SIZE", 5000))
+# Leitura particionada: máximo de partições (sessões) por job e blocos na fila do gravador
+INTEGRATION_MAX_PARTITIONS = int(os.getenv("INTEGRATION_MAX_PARTITIONS", 8))
+INTEGRATION_WRITER_QUEUE_SIZE = int(os.getenv("INTEGRATION_WRITER_QUEUE_SIZE", 8))
+
 ORACLE_CONFIG = {
     "cariacica": {
         "host": "ODASC1-REDEMERI",
@@ -0,0 +1,107 @@
+# app/config/redis_config.py
+import fnmatch
+import logging
+import threading
+import time
+from app.config.env import REDIS_URL
+
+_client = None
+_client_lock = threading.Lock()
+
+# Implementações em Python dos scripts Lua, usadas pelo LocalRedis
+_local_scripts = {}
+
+
+def register_local_script(script, implementation):
+    """
+    Associa um script Lua à sua versão em Python `implementation(client, keys, args)`,
+    executada pelo LocalRedis de forma atômica (sob o lock do cliente).
+    """
+    _local_scripts[script] = implementation
+
+
+class LocalRedis:
+    """
+    Substituto em memória do Redis (REDIS_URL=local://), para testes e
+    ambientes sem Redis. Implementa só os comandos usados pela aplicação e
+    vale apenas dentro do processo.
+    """
+
+    def __init__(self):
+        self._data = {}  # chave -> (expira_em, valor)
+        self._lock = threading.RLock()
+
+    def _alive(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at is not None and expires_at <= time.time():
+            del self._data[key]
+            return None
+        return item
+
+    def ping(self):
+        return True
+
+    def get(self, name):
+        with self._lock:
+            item = self._alive(name)
+            return item[1] if item else None
+
+    def set(self, name, value, ex=None, px=None, nx=False):
+        if isinstance(value, str):
+            value = value.encode()
+        with self._lock:
+            if nx and self._alive(name):
+                return None
+            ttl = ex if ex is not None else (px / 1000 if px is not None else None)
+            self._data[name] = (time.time() + ttl if ttl else None, value)
+            return True
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(1 for name in names if self._data.pop(name, None) is not None)
+
+    def scan_iter(self, match=None, count=None):
+        with self._lock:
+            keys = [key for key in list(self._data) if self._alive(key)]
+        return iter([key for key in keys if match is None or fnmatch.fnmatchcase(key, match)])
+
+    def pttl(self, name):
+        with self._lock:
+            item = self._alive(name)
+            if item is None:
+                return -2
+            return -1 if item[0] is None else int((item[0] - time.time()) * 1000)
+
+    def register_script(self, script):
+        implementation = _local_scripts[script]
+
+        def run(keys=(), args=(), client=None):
+            with self._lock:
+                return implementation(self, list(keys), list(args))
+        return run
+
+    def flushdb(self):
+        with self._lock:
+            self._data.clear()
+
+
+def get_redis():
+    """
+    Cliente Redis compartilhado, ou None quando REDIS_URL não está configurado.
+    REDIS_URL=local:// usa o LocalRedis em memória.
+    """
+    global _client
+    if not REDIS_URL:
+        return None
+    with _client_lock:
+        if _client is None:
+            if REDIS_URL.startswith("local://"):
+                _client = LocalRedis()
+            else:
+                import redis
+                _client = redis.Redis.from_url(REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+            logging.info(f"🔌 Redis configurado: {REDIS_URL.split('@')[-1]}")
+        return _client
@@ -2,6 +2,7 @@ import os
 from flask import Blueprint, request, jsonify
 from app.config.db_config import create_db_connection_mysql
 from app.utils.decorators import token_required, admin_required, permission_required
+from app.utils.permission_cache import invalidate_access_permissions, invalidate_user_permissions
 import logging
 from slugify import slugify 
 import unidecode
@@ -191,6 +192,8 @@ def assign_access_to_user(user_data):
         cursor.close()
         conn.close()
 
+        invalidate_user_permissions(user_id)
+
         return jsonify({"status": "success", "message": "Usuário associado ao access com sucesso."}), 201
 
     except Exception as e:
@@ -340,6 +343,11 @@ def edit_access(user_data, access_id):
                 cursor.execute(query_insert_prefixes, (access_id, prefix))
 
         conn.commit()
+
+        # Usuários com este access passam a ter outras rotas
+        if route_slugs or route_prefixes:
+            invalidate_access_permissions(cursor, access_id)
+
         cursor.close()
         conn.close()
 
@@ -382,6 +390,8 @@ def remove_user_access(user_data):
         cursor.close()
         conn.close()
 
+        invalidate_user_permissions(user_id)
+
         return jsonify({
             "status": "success",
             "message": "Associações removidas com sucesso."
@@ -427,6 +437,8 @@ def edit_user_access(user_data):
         cursor.close()
         conn.close()
 
+        invalidate_user_permissions(user_id)
+
         return jsonify({
             "status": "success",
             "message": "Associações atualizadas com sucesso."
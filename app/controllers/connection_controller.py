@@ -7,6 +7,9 @@ from app.services.db_service import DatabaseService
 import logging
 from app.models.connection import Connection
 from app.utils.helpers import generate_slug
+from app.config.db_config import get_mysql_pool
+from app.utils.connection_pool import invalidate_target_pool, target_pool_stats
+from app.utils.connection_cache import invalidate_connection_descriptor
 import time
 
 # Definição do Blueprint
@@ -22,14 +25,16 @@ def get_expected_params(db_type):
             {"name": "port", "type": "integer", "required": True},
             {"name": "username", "type": "string", "required": True},
             {"name": "password", "type": "string", "required": True},
-            {"name": "database_name", "type": "string", "required": False}
+            {"name": "database_name", "type": "string", "required": False},
+            {"name": "extra_params", "type": "json", "required": False}
         ],
         "mariadb": [
             {"name": "host", "type": "string", "required": True},
             {"name": "port", "type": "integer", "required": True},
             {"name": "username", "type": "string", "required": True},
             {"name": "password", "type": "string", "required": True},
-            {"name": "database_name", "type": "string", "required": True}
+            {"name": "database_name", "type": "string", "required": True},
+            {"name": "extra_params", "type": "json", "required": False}
         ],
         "oracle": [
             {"name": "host", "type": "string", "required": True},
@@ -37,7 +42,8 @@ def get_expected_params(db_type):
             {"name": "username", "type": "string", "required": True},
             {"name": "password", "type": "string", "required": True},
             {"name": "service_name", "type": "string", "required": False},
-            {"name": "sid", "type": "string", "required": False}
+            {"name": "sid", "type": "string", "required": False},
+            {"name": "extra_params", "type": "json", "required": False}
         ],
         "postgres": [
             {"name": "host", "type": "string", "required": True},
@@ -255,6 +261,8 @@ def create_connection(user_data):
         cursor.close()
         conn.close()
 
+        invalidate_connection_descriptor()
+
         return jsonify({"status": "success", "message": "Conexão criada com sucesso."}), 201
     except Exception as e:
         logging.error(f"Erro ao criar conexão: {e}")
@@ -316,6 +324,10 @@ def edit_connection(user_data, connection_id):
         cursor.close()
         conn.close()
 
+        # Dados e sessões resolvidos com os valores antigos não podem mais ser reutilizados
+        invalidate_connection_descriptor(connection_id)
+        invalidate_target_pool(connection_id)
+
         return jsonify({"status": "success", "message": "Conexão atualizada com sucesso."}), 200
 
     except Exception as e:
@@ -490,6 +502,9 @@ def delete_connection(user_data, connection_id):
 
         cursor.close()
         conn.close()
+
+        invalidate_connection_descriptor(connection_id)
+        invalidate_target_pool(connection_id)
         return jsonify({"status": "success", "message": "Conexão deletada com sucesso."}), 200
     except Exception as e:
         logging.error(f"Erro ao deletar conexão: {e}")
@@ -532,4 +547,21 @@ def list_connections_simple(user_data):
             "connections": connections
         }), 200
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
\ No newline at end of file
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@connection_bp.route('/pools', methods=['GET'])
+@token_required
+@permission_required(route_prefix='/connections')
+def list_connection_pools(user_data):
+    """
+    Retorna os contadores dos pools de conexão (emprestadas, ociosas e tempo de espera).
+    """
+    try:
+        return jsonify({
+            "status": "success",
+            "metadata_pool": get_mysql_pool().stats(),
+            "pools": target_pool_stats()
+        }), 200
+    except Exception as e:
+        logging.error(f"Erro ao listar pools de conexão: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
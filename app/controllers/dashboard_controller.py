@@ -3,6 +3,8 @@ from sqlalchemy import func, and_
 from datetime import datetime
 from app import db  
 from app.config.db_config import create_db_connection_mysql
+from app.middleware.request_logger import request_log_stats
+from app.utils.decorators import token_required
 from datetime import datetime, timedelta
 
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/dashboard')
@@ -159,3 +161,12 @@ def listar_rotas_unicas():
         return jsonify({"rotas": rotas}), 200
     except Exception as e:
         return jsonify({"error": f"Erro ao buscar rotas: {str(e)}"}), 500
+
+@dashboard_bp.route('/request-logs/stats', methods=['GET'])
+@token_required
+def request_logs_stats(user_data):
+    """
+    Contadores do pipeline de logs de requisição deste processo
+    (enfileirados, enviados, descartados, backpressure).
+    """
+    return jsonify({"status": "success", "stats": request_log_stats()}), 200
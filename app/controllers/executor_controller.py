@@ -4,8 +4,14 @@ from datetime import datetime
 from flask import Blueprint, request, jsonify
 from app.utils.decorators import token_required, admin_required, permission_required
 from app.config.db_config import create_db_connection_mysql
-from app.utils.db_connections import create_oracle_connection, create_mysql_connection
-from app.utils.security import decrypt_password
+from app.config.env import EXECUTOR_COUNT_DEFAULT, EXECUTOR_EXECUTION_TIMEOUT
+from app.services.executor_service import (
+    COUNT_MODES, execute_executor_keyset, execute_executor_query, executor_stream_sections
+)
+from app.utils.keyset import decode_continuation_token, parse_order_key
+from app.utils.result_cache import is_read_only, request_cache_policy
+from app.utils.streaming import requested_arraysize, requested_stream_format, stream_sections
+from app.utils.connection_cache import get_connection_descriptors
 
 executor_bp = Blueprint('executors', __name__, url_prefix='/executors')
 
@@ -25,6 +31,8 @@ def create_executor(user_data):
         name = data.get("name")
         query = data.get("query")
         parameters = data.get("parameters", [])  # Lista de parâmetros
+        order_key = data.get("order_key")  # Chave para paginação por keyset (opcional)
+        cache_ttl = data.get("cache_ttl")  # Segundos de cache do resultado (None = padrão, 0 = sem cache)
 
         # Log dos dados recebidos
         print("Dados recebidos:", json.dumps(data, indent=4))
@@ -34,6 +42,12 @@ def create_executor(user_data):
             print("Erro: Campos obrigatórios ausentes.")
             return jsonify({"status": "error", "message": "Todos os campos são obrigatórios."}), 400
 
+        if order_key:
+            try:
+                order_key = ",".join(parse_order_key(order_key))
+            except ValueError as e:
+                return jsonify({"status": "error", "message": str(e)}), 400
+
         # Substituir os placeholders de parâmetros de '@nome' para ':nome'
         for param in parameters:
             placeholder = f"@{param['name']}"
@@ -88,10 +102,10 @@ def create_executor(user_data):
         # Salvar o executor no banco de dados
         connection_ids_str = ",".join(map(str, connection_ids))
         query_insert = """
-            INSERT INTO executors (system_id, connection_ids, name, file_path)
-            VALUES (%s, %s, %s, %s)
+            INSERT INTO executors (system_id, connection_ids, name, file_path, order_key, cache_ttl)
+            VALUES (%s, %s, %s, %s, %s, %s)
         """
-        cursor.execute(query_insert, (system_id, connection_ids_str, name, file_path))
+        cursor.execute(query_insert, (system_id, connection_ids_str, name, file_path, order_key or None, cache_ttl))
         executor_id = cursor.lastrowid  # Obter o ID do executor criado
         print("Executor salvo no banco de dados. ID:", executor_id)
 
@@ -559,10 +573,23 @@ def execute_query(user_data, executor_id):
                 "parameters": invalid_parameters
             }), 400
 
+        # ?format=ndjson|csv transmite as linhas em vez de montar um único JSON
+        try:
+            stream_format = requested_stream_format()
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+
         # Obter parâmetros de paginação da URL
         page = int(request.args.get("page", 1))
         limit = int(request.args.get("limit", 1000))
-        offset = (page - 1) * limit
+
+        # ?count=none|cached|estimated|exact: como obter total_records
+        count_mode = (request.args.get("count") or EXECUTOR_COUNT_DEFAULT).lower()
+        if count_mode not in COUNT_MODES:
+            return jsonify({
+                "status": "error",
+                "message": f"Modo de contagem '{count_mode}' inválido. Use: {', '.join(COUNT_MODES)}."
+            }), 400
 
         conn = create_db_connection_mysql()
         cursor = conn.cursor(dictionary=True)
@@ -571,6 +598,10 @@ def execute_query(user_data, executor_id):
         cursor.execute("SELECT * FROM executors WHERE id = %s", (executor_id,))
         executor = cursor.fetchone()
 
+        # Devolve a conexão de metadados antes de consultar os bancos de destino
+        cursor.close()
+        conn.close()
+
         if not executor:
             return jsonify({"status": "error", "message": "Executor não encontrado."}), 404
 
@@ -585,102 +616,59 @@ def execute_query(user_data, executor_id):
         param_dict = {f":{param['name']}": param["value"] for param in parameters}
         print(f"Parâmetros aplicados na query: {param_dict}")
 
-        # Adicionar query para contar o total de registros
-        count_query_mysql = f"SELECT COUNT(*) AS total FROM ({query}) AS subquery"
-        count_query_oracle = f"""
-        SELECT COUNT(*) AS total FROM ({query}) subquery
-        """
-
-        # Adicionar limites de paginação à query
-        paginated_query_mysql = f"{query} LIMIT {limit} OFFSET {offset}"
-        paginated_query_oracle = f"""
-        SELECT * FROM (
-            SELECT a.*, ROWNUM rnum FROM ({query}) a
-            WHERE ROWNUM <= {offset + limit}
-        )
-        WHERE rnum > {offset}
-        """
-
-        results = {}
-        total_records = {}
-        for connection_id in connection_ids:
-            cursor.execute("""
-                SELECT name, db_type, host, port, username, password, database_name, service_name, sid
-                FROM connections WHERE id = %s
-            """, (connection_id,))
-            connection_data = cursor.fetchone()
-
-            if not connection_data:
-                results[f"connection_{connection_id}"] = "Conexão não encontrada."
-                continue
-
-            connection_name = connection_data["name"]
-            db_type = connection_data["db_type"]
-            host = connection_data["host"]
-            port = connection_data["port"]
-            user = connection_data["username"]
-            encrypted_password = connection_data["password"]
-            database_name = connection_data.get("database_name")
-            service_name = connection_data.get("service_name")
-            sid = connection_data.get("sid")
-
+        # Prazo global: nenhuma conexão segura a resposta além dele
+        timeout = float(request_data.get("timeout") or EXECUTOR_EXECUTION_TIMEOUT)
+
+        # Descritores das conexões (cache em memória, senha já descriptografada)
+        descriptors = get_connection_descriptors(connection_ids)
+        connections = [(connection_id, descriptors.get(int(connection_id))) for connection_id in connection_ids]
+
+        if stream_format:
+            # Sem ?limit o resultado completo é transmitido, com memória constante
+            sections = executor_stream_sections(
+                connections, query, param_dict, requested_arraysize(), timeout,
+                page=page, limit=limit if "limit" in request.args else None
+            )
+            mark_executor_executed(executor_id)
+            return stream_sections(sections, stream_format)
+
+        # Paginação por keyset (?pagination=keyset ou ?cursor=<token>): continua da última chave lida
+        continuation_token = request.args.get("cursor")
+        if continuation_token or request.args.get("pagination") == "keyset":
+            if not executor.get("order_key"):
+                return jsonify({
+                    "status": "error",
+                    "message": "Executor sem chave de ordenação (order_key) para paginação por keyset."
+                }), 400
             try:
-                # Descriptografar a senha
-                password = decrypt_password(encrypted_password)
-
-                if db_type == "mysql":
-                    db_conn = create_mysql_connection(host, port, user, password, database_name)
-                    final_query = paginated_query_mysql
-                    count_query = count_query_mysql
-                elif db_type == "oracle":
-                    db_conn = create_oracle_connection(
-                        host=host, port=port, user=user, password=password,
-                        service_name=service_name, sid=sid
-                    )
-                    final_query = paginated_query_oracle
-                    count_query = count_query_oracle
-                else:
-                    results[connection_name] = "Tipo de banco desconhecido."
-                    continue
-
-                print(f"Executando a query na conexão '{connection_name}' com os parâmetros: {param_dict}")
-
-                # Contar o número total de registros
-                db_cursor = db_conn.cursor()
-                db_cursor.execute(count_query, param_dict)
-                total_records[connection_name] = db_cursor.fetchone()[0]
-
-                # Executar a query paginada
-                db_cursor.execute(final_query, param_dict)
-
-                columns = [col[0] for col in db_cursor.description]
-                rows = [dict(zip(columns, row)) for row in db_cursor.fetchall()]
-
-                results[connection_name] = rows
-
-                db_cursor.close()
-                db_conn.close()
-            except Exception as e:
-                print(f"Erro ao executar a query na conexão '{connection_name}':", e)
-                results[connection_name] = str(e)
-
-        # Calcular total de páginas para cada conexão
-        pagination_info = {
-            name: {
-                "total_records": total_records[name],
-                "total_pages": (total_records[name] + limit - 1) // limit,  # Round up
-                "current_page": page
-            }
-            for name in total_records
-        }
+                key_columns = parse_order_key(executor["order_key"])
+                positions, finished = (
+                    decode_continuation_token(continuation_token, executor_id) if continuation_token else ({}, set())
+                )
+            except ValueError as e:
+                return jsonify({"status": "error", "message": str(e)}), 400
+
+            results, pagination_info, next_token = execute_executor_keyset(
+                executor_id, connections, query, param_dict, key_columns, positions, finished, limit, timeout,
+                count_mode=count_mode
+            )
+            mark_executor_executed(executor_id)
+            return jsonify({
+                "status": "success",
+                "data": results,
+                "pagination": pagination_info,
+                "next_token": next_token
+            }), 200
 
-        # Atualizar o campo executed_at
-        update_query = "UPDATE executors SET executed_at = %s WHERE id = %s"
-        cursor.execute(update_query, (datetime.now(), executor_id))
-        conn.commit()
+        # COUNT e página em paralelo, em todas as conexões ao mesmo tempo
+        # Executores são consultas: o resultado pode vir do cache (exceto se for DML)
+        cache_policy = request_cache_policy(executor.get("cache_ttl")) if is_read_only(query) else None
+        results, pagination_info = execute_executor_query(
+            executor_id, connections, query, param_dict, page, limit, timeout, count_mode=count_mode,
+            cache_policy=cache_policy
+        )
 
-        cursor.close()
-        conn.close()
+        mark_executor_executed(executor_id)
 
         return jsonify({
             "status": "success",
@@ -691,6 +679,17 @@ def execute_query(user_data, executor_id):
         print("Erro durante a execução da query:", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def mark_executor_executed(executor_id):
+    """
+    Atualiza o campo executed_at do executor.
+    """
+    conn = create_db_connection_mysql()
+    cursor = conn.cursor()
+    cursor.execute("UPDATE executors SET executed_at = %s WHERE id = %s", (datetime.now(), executor_id))
+    conn.commit()
+    cursor.close()
+    conn.close()
+
 def validate_executor_parameters_with_user_input(executor_id, user_parameters):
     """
     Valida os parâmetros de um executor considerando valores fornecidos pelo usuário.
@@ -1,6 +1,8 @@
 from flask import Blueprint, jsonify, request
 from app.config.db_config import create_db_connection_mysql
 from celery_worker import execute_integration_job
+from app.services.integration_runs import summarize_runs
+from app.utils.decorators import token_required, permission_required
 from app.utils.security import decrypt_password
 import cx_Oracle
 import mysql.connector
@@ -59,10 +61,111 @@ def listar_integracoes():
 @integration_bp.route('/<int:job_id>/executar', methods=['POST'])
 def executar_integracao(job_id):
     try:
-        logging.info(f"📨 Enviando job {job_id} para execução via Celery")
-        execute_integration_job.delay(job_id)
+        # ?full_resync=1 ignora a marca d'água e relê toda a origem
+        full_resync = request.args.get("full_resync", "").lower() in ("1", "true")
+        logging.info(f"📨 Enviando job {job_id} para execução via Celery" + (" (full resync)" if full_resync else ""))
+        execute_integration_job.delay(job_id, full_resync)
         return jsonify({"message": f"Job {job_id} enviado para execução em background."}), 202
 
     except Exception as e:
         logging.exception(f"❌ Erro ao enviar job {job_id}")
         return jsonify({"error": str(e)}), 500
+
+
+@integration_bp.route('/<int:job_id>/quarentena', methods=['GET'])
+@token_required
+@permission_required(route_prefix='/integration')
+def listar_quarentena(user_data, job_id):
+    """
+    Linhas recusadas pelo destino nas execuções do job (mais recentes primeiro).
+    """
+    conn = None
+    try:
+        limit = min(int(request.args.get("limit", 100)), 1000)
+        conn = create_db_connection_mysql()
+        with conn.cursor(dictionary=True) as cur:
+            cur.execute("""
+                SELECT id, job_id, error_message, row_data, created_at
+                FROM integration_quarantine
+                WHERE job_id = %s
+                ORDER BY id DESC
+                LIMIT %s
+            """, (job_id, limit))
+            linhas = cur.fetchall()
+        return jsonify(linhas), 200
+
+    except Exception as e:
+        logging.exception("Erro ao listar quarentena")
+        return jsonify({"error": str(e)}), 500
+
+    finally:
+        if conn:
+            conn.close()
+
+
+@integration_bp.route('/<int:job_id>/execucoes', methods=['GET'])
+@token_required
+@permission_required(route_prefix='/integration')
+def listar_execucoes(user_data, job_id):
+    """
+    Histórico de execuções do job (mais recentes primeiro), com tempos por fase.
+    """
+    conn = None
+    try:
+        limit = min(int(request.args.get("limit", 50)), 500)
+        conn = create_db_connection_mysql()
+        with conn.cursor(dictionary=True) as cur:
+            cur.execute("""
+                SELECT * FROM integration_job_runs
+                WHERE job_id = %s
+                ORDER BY id DESC
+                LIMIT %s
+            """, (job_id, limit))
+            execucoes = cur.fetchall()
+        return jsonify(execucoes), 200
+
+    except Exception as e:
+        logging.exception("Erro ao listar execuções")
+        return jsonify({"error": str(e)}), 500
+
+    finally:
+        if conn:
+            conn.close()
+
+
+@integration_bp.route('/execucoes/stats', methods=['GET'])
+@token_required
+@permission_required(route_prefix='/integration')
+def estatisticas_execucoes(user_data):
+    """
+    Agregado por job dos últimos `days` dias (padrão 7): execuções, falhas,
+    p50/p95 da duração e média das fases. `job_id` filtra um job.
+    """
+    conn = None
+    try:
+        days = int(request.args.get("days", 7))
+        job_id = request.args.get("job_id", type=int)
+        query = """
+            SELECT job_id, status, started_at, duration_ms, rows_written,
+                   connect_ms, extract_ms, transform_ms, load_ms
+            FROM integration_job_runs
+            WHERE started_at >= UTC_TIMESTAMP() - INTERVAL %s DAY AND status <> 'running'
+        """
+        params = [days]
+        if job_id is not None:
+            query += " AND job_id = %s"
+            params.append(job_id)
+
+        conn = create_db_connection_mysql()
+        with conn.cursor(dictionary=True) as cur:
+            cur.execute(query, params)
+            execucoes = cur.fetchall()
+        return jsonify({"days": days, "jobs": summarize_runs(execucoes)}), 200
+
+    except Exception as e:
+        logging.exception("Erro ao calcular estatísticas das execuções")
+        return jsonify({"error": str(e)}), 500
+
+    finally:
+        if conn:
+            conn.close()
@@ -9,11 +9,25 @@ import logging
 import unidecode
 import re
 import sys
+import threading
 import traceback
 import cx_Oracle
 from sqlalchemy.sql import text
-from app.utils.db_connections import create_oracle_connection, create_mysql_connection
-from app.utils.security import decrypt_password
+from app.utils.db_connections import create_mysql_connection
+from app.utils.connection_pool import acquire_target_connection, kill_mysql_query, parse_extra_params
+from app.utils.connection_cache import get_connection_descriptors, get_connection_descriptors_by_slugs
+from app.utils.parallel import run_parallel
+from app.utils.streaming import failed_section, iter_cursor, requested_arraysize, requested_stream_format, stream_sections
+from app.utils.result_cache import (
+    CachePolicy, get_cached_result, invalidate_results, request_cache_policy,
+    result_cache_key, result_cache_stats, store_result
+)
+from app.utils.route_template import RouteTemplate, get_route_template, invalidate_route_templates, route_template_stats
+from app.utils.route_adaptations import clear_adaptations, get_adaptation, list_adaptations, save_adaptation
+from app.utils.schema_cache import get_table_columns, schema_cache_stats
+from app.utils.sequence_allocator import next_sequence_values, sequence_block_stats
+from app.config.env import ROUTE_EXECUTION_MAX_TIMEOUT, ROUTE_EXECUTION_TIMEOUT
+from functools import partial
 from typing import Tuple
 
 # Blueprint para rotas
@@ -58,6 +72,7 @@ def create_route(user_data):
         is_pre_processed   = data.get("is_pre_processed", False)
         is_post_processed  = data.get("is_post_processed", False)
         parameters         = data.get("parameters", [])
+        cache_ttl          = data.get("cache_ttl")       # segundos; None = padrão, 0 = sem cache
 
         # 3) Validações de existência de query
         if not any([query, pre_query, query_true, query_false, post_query, dml_personalizado]):
@@ -100,13 +115,13 @@ def create_route(user_data):
         query_insert_route = """
             INSERT INTO routes
                 (name, slug, system_id, query, pre_query, query_true, query_false, post_query,
-                 dml_personalizado, is_pre_processed, is_post_processed, query_path, created_at)
+                 dml_personalizado, is_pre_processed, is_post_processed, query_path, cache_ttl, created_at)
             VALUES
-                (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+                (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
         """
         cursor.execute(query_insert_route, (
             name, slug, system_id, query, pre_query, query_true, query_false, post_query,
-            dml_personalizado, is_pre_processed, is_post_processed, None
+            dml_personalizado, is_pre_processed, is_post_processed, None, cache_ttl
         ))
         route_id = cursor.lastrowid
 
@@ -371,7 +386,7 @@ def edit_route(user_data, route_id):
         # 2) Campos que podem ser atualizados diretamente
         editable = [
             "name", "query", "pre_query", "query_true", "query_false",
-            "post_query", "dml_personalizado", "is_pre_processed", "is_post_processed"
+            "post_query", "dml_personalizado", "is_pre_processed", "is_post_processed", "cache_ttl"
         ]
         update_fields = []
         update_values = []
@@ -458,6 +473,11 @@ def edit_route(user_data, route_id):
         cursor.close()
         conn.close()
 
+        # Resultados guardados e o SQL compilado da rota não valem mais
+        invalidate_results("route", existing["slug"])
+        invalidate_route_templates(route_id)
+        clear_adaptations(route_id)
+
         return jsonify({"status": "success", "message": "Rota atualizada com sucesso."}), 200
 
     except Exception as e:
@@ -551,6 +571,393 @@ def remove_quoted_strings(sql: str) -> str:
     """
     return re.sub(r"'[^']*'", '', sql)
 
+def remove_invalid_column_from_query(slug: str, query: str, param_name: str) -> str:
+    logging.warning(f"🛠️ Removendo coluna inválida: {param_name}")
+
+    # ✅ Lógica específica para os slugs especiais
+    if slug in ['bluemind_mv_tab115', 'bluemind_mv_tab116', 'bluemind_mv_tab_127_homolog', 'bluemind_mv_tab_127_homolog']:
+        logging.warning(f"🔁 Substituindo query para slug '{slug}' devido a erro de coluna inválida")
+        if slug == 'bluemind_mv_tab115':
+            return """
+            INSERT INTO DBAMV.PROIBICAO (
+                CD_PRO_FAT, CD_CON_PLA, CD_CONVENIO, DS_PROIBICAO, TP_PROIBICAO,
+                TP_ATENDIMENTO, DT_INICIAL_PROIBICAO, CD_MULTI_EMPRESA,
+                CD_SETOR, CD_REGRA_PROIBICAO_VALOR
+            )
+            SELECT DISTINCT
+                pf.cd_pro_fat, cp.CD_CON_PLA, ecp.CD_CONVENIO, :DS_PROIBICAO,
+                :TP_PROIBICAO, :TP_ATENDIMENTO, TO_DATE(:DT_INICIAL_PROIBICAO, 'DD/MM/YYYY'),
+                ecp.CD_MULTI_EMPRESA, :CD_SETOR, :CD_REGRA_PROIBICAO_VALOR
+            FROM dbamv.CON_PLA cp, dbamv.EMPRESA_CON_PLA ecp, dbamv.pro_fat pf
+            WHERE cp.CD_CONVENIO = ecp.CD_CONVENIO
+                AND cp.CD_CON_PLA = ecp.CD_CON_PLA
+                AND cp.SN_ATIVO = 'S'
+                AND ecp.SN_ATIVO = 'S'
+                AND ecp.CD_CONVENIO = :CD_CONVENIO
+                AND ecp.CD_MULTI_EMPRESA = :CD_MULTI_EMPRESA
+                AND ecp.CD_CON_PLA = NVL(:CD_CON_PLA, ecp.CD_CON_PLA)
+                AND pf.sn_ativo = 'S'
+                AND pf.CD_PRO_FAT = :CD_PRO_FAT
+                AND NOT EXISTS (
+                    SELECT 'K'
+                    FROM DBAMV.PROIBICAO p
+                    WHERE p.CD_PRO_FAT = pf.cd_pro_fat
+                        AND p.CD_CONVENIO = cp.CD_CONVENIO
+                        AND NVL(p.CD_CON_PLA, 0) = NVL(cp.CD_CON_PLA, 0)
+                        AND p.TP_PROIBICAO = :TP_PROIBICAO
+                        AND p.TP_ATENDIMENTO = NVL(:TP_ATENDIMENTO, p.TP_ATENDIMENTO)
+                        AND TRUNC(p.DT_INICIAL_PROIBICAO) = TRUNC(TO_DATE(:DT_INICIAL_PROIBICAO, 'DD/MM/YYYY'))
+                        AND p.CD_MULTI_EMPRESA = ecp.CD_MULTI_EMPRESA
+                        AND NVL(p.cd_setor, 0) = NVL(:CD_SETOR, 0)
+                )
+            """
+        elif slug == 'bluemind_mv_tab116':
+            return """
+INSERT INTO DBAMV.PROIBICAO (
+     CD_PRO_FAT, CD_CON_PLA, CD_CONVENIO, DS_PROIBICAO, TP_PROIBICAO,
+     TP_ATENDIMENTO, DT_INICIAL_PROIBICAO, CD_MULTI_EMPRESA,
+     CD_SETOR, CD_REGRA_PROIBICAO_VALOR
+            )
+            SELECT DISTINCT
+     pf.cd_pro_fat, cp.CD_CON_PLA, ecp.CD_CONVENIO, :DS_PROIBICAO,
+     :TP_PROIBICAO, :TP_ATENDIMENTO, TO_DATE(:DT_INICIAL_PROIBICAO, 'DD/MM/YYYY'),
+     ecp.CD_MULTI_EMPRESA, :CD_SETOR, :CD_REGRA_PROIBICAO_VALOR
+ FROM dbamv.CON_PLA cp, dbamv.EMPRESA_CON_PLA ecp, dbamv.pro_fat pf
+ WHERE cp.CD_CONVENIO = ecp.CD_CONVENIO
+     AND cp.CD_CON_PLA = ecp.CD_CON_PLA
+                AND cp.SN_ATIVO = 'S'
+                AND ecp.SN_ATIVO = 'S'
+     AND ecp.CD_CONVENIO = :CD_CONVENIO
+     AND ecp.CD_MULTI_EMPRESA = :CD_MULTI_EMPRESA
+     AND ecp.CD_CON_PLA = NVL(:CD_CON_PLA, ecp.CD_CON_PLA)
+                AND pf.sn_ativo = 'S'
+   AND pf.CD_GRU_PRO = :CD_PRO_FAT
+                AND NOT EXISTS (
+                    SELECT 'K'
+         FROM DBAMV.PROIBICAO p
+         WHERE p.CD_PRO_FAT = pf.cd_pro_fat
+           AND p.CD_CONVENIO = cp.CD_CONVENIO
+             AND NVL(p.CD_CON_PLA, 0) = NVL(cp.CD_CON_PLA, 0)
+           AND p.TP_PROIBICAO = :TP_PROIBICAO
+             AND p.TP_ATENDIMENTO = NVL(:TP_ATENDIMENTO, p.TP_ATENDIMENTO)
+             AND TRUNC(p.DT_INICIAL_PROIBICAO) = TRUNC(TO_DATE(:DT_INICIAL_PROIBICAO, 'DD/MM/YYYY'))
+             AND p.CD_MULTI_EMPRESA = ecp.CD_MULTI_EMPRESA
+             AND NVL(p.cd_setor, 0) = NVL(:CD_SETOR, 0)
+                )
+            """
+        elif slug == 'bluemind_mv_tab_127_homolog':
+            return """
+            DELETE DBAMV.PROIBICAO p
+            WHERE p.CD_PRO_FAT = :CD_PRO_FAT
+            AND p.CD_CONVENIO = :CD_CONVENIO
+            AND p.CD_MULTI_EMPRESA = :CD_MULTI_EMPRESA
+            AND p.CD_CON_PLA = nvl(:CD_CON_PLA, p.CD_CON_PLA)
+            AND p.TP_PROIBICAO = :TP_PROIBICAO
+            AND p.TP_ATENDIMENTO = :TP_ATENDIMENTO
+            AND nvl(p.CD_SETOR, 0) = nvl(:CD_SETOR, nvl(p.CD_SETOR, 0))
+            AND nvl(p.CD_REGRA_PROIBICAO_VALOR, 0) = nvl(:CD_REGRA_PROIBICAO_VALOR, nvl(p.CD_REGRA_PROIBICAO_VALOR, 0))
+            """
+        elif slug == 'bluemind_mv_tab_128_homolog':
+            return """
+            DELETE DBAMV.PROIBICAO p
+            WHERE EXISTS (SELECT 1 FROM dbamv.pro_fat pf WHERE pf.CD_GRU_PRO = :pCD_PRO_FAT AND pf.cd_pro_fat = p.CD_PRO_FAT)
+            AND p.CD_CONVENIO = :CD_CONVENIO
+            AND p.CD_MULTI_EMPRESA = :CD_MULTI_EMPRESA
+            AND p.CD_CON_PLA = nvl(:CD_CON_PLA, p.CD_CON_PLA)
+            AND p.TP_PROIBICAO = :TP_PROIBICAO
+            AND p.TP_ATENDIMENTO = :TP_ATENDIMENTO
+            AND nvl(p.CD_SETOR, 0) = nvl(:CD_SETOR, nvl(p.CD_SETOR, 0))
+            AND nvl(p.CD_REGRA_PROIBICAO_VALOR, 0) = nvl(:CD_REGRA_PROIBICAO_VALOR, nvl(p.CD_REGRA_PROIBICAO_VALOR, 0))
+            """
+
+    # 🔧 Caso comum continua aqui
+    original_query = query
+    query = re.sub(rf"TO_DATE\s*\(\s*:\s*{param_name}\s*,\s*'[^']*'\s*\)", '', query, flags=re.IGNORECASE)
+    query = re.sub(rf"TRUNC\s*\(\s*:\s*{param_name}\s*\)", '', query, flags=re.IGNORECASE)
+    query = re.sub(rf"NVL\s*\(\s*:\s*{param_name}\s*,\s*[^)]+\)", '', query, flags=re.IGNORECASE)
+    query = re.sub(rf":{param_name}\b", '', query, flags=re.IGNORECASE)
+    query = re.sub(rf'\b{param_name}\b\s*,?', '', query, flags=re.IGNORECASE)
+    query = re.sub(r',\s*\)', ')', query)
+    query = re.sub(
+        rf'AND\s+[^()]*{param_name}[^()]*?(=|<>|<|>|IS|LIKE|IN)[^()]*',
+        '', query, flags=re.IGNORECASE
+    )
+    query = re.sub(r'TO_DATE\s*\(\s*:\s*,\s*\'[^\']*\'\s*\)', '', query, flags=re.IGNORECASE)
+    query = re.sub(r',\s*,', ',', query)
+    query = re.sub(r'\(\s*,', '(', query)
+    query = re.sub(r',\s*\)', ')', query)
+    query = re.sub(r',\s*FROM', ' FROM', query, flags=re.IGNORECASE)
+    query = re.sub(r'\s+', ' ', query).strip()
+
+    logging.error(f"🧼 Query original:\n{original_query}")
+    logging.error(f"🧹 Query após remover '{param_name}':\n{query}")
+    return query
+
+
+def build_update_query_with_non_nulls(query: str, params: dict) -> Tuple[str, dict]:
+    """
+    Mantém no SET só as colunas com valor informado (ver RouteTemplate.bind).
+    """
+    return RouteTemplate(query).bind(params)
+
+
+MAX_INVALID_COLUMN_RETRIES = 10
+
+
+def _connection_template(route, template, connection):
+    """
+    Template a executar na conexão: o SQL já adaptado a ela, se houver um válido,
+    e a função que grava uma nova adaptação. UPDATE (SQL depende dos parâmetros) e
+    DELETE (remover uma coluna muda o WHERE, ou seja, quais linhas são apagadas)
+    nunca são adaptados de forma permanente.
+    """
+    if template.kind in ("UPDATE", "DELETE"):
+        return template, None
+
+    adaptation = get_adaptation(route['id'], route['updated_at'], connection, route['query'])
+    previous = []
+    if adaptation:
+        template = get_route_template(route['id'], route['updated_at'], adaptation.adapted_query,
+                                      variant=connection['id'])
+        previous = adaptation.removed_columns
+    return template, partial(_learn_adaptation, route, connection, previous)
+
+
+def _learn_adaptation(route, connection, previous, removed_columns, adapted_query):
+    save_adaptation(route['id'], route['updated_at'], connection, route['query'],
+                    previous + removed_columns, adapted_query)
+
+
+# Folga do prazo da tarefa sobre o limite no banco: o comando interrompido
+# pelo banco volta como erro conhecido antes de a tarefa ser dada como perdida
+DEADLINE_GRACE = 5
+
+
+def _mysql_deadline(connection, db_conn, timeout):
+    """
+    Agenda um KILL QUERY na sessão MySQL para daqui a `timeout` s (o MySQL não
+    limita DML por comando). Retorna (timer, disparou); cancele o timer ao terminar.
+    """
+    thread_id = db_conn.connection_id
+    fired = threading.Event()
+
+    def kill():
+        fired.set()
+        try:
+            kill_mysql_query(connection, thread_id)
+            logging.warning(f"⏱️ Comando interrompido em {connection['slug']} após {timeout}s")
+        except Exception as e:
+            logging.error(f"❌ Falha ao interromper comando em {connection['slug']}: {e}")
+
+    timer = threading.Timer(timeout, kill)
+    timer.daemon = True
+    timer.start()
+    return timer, fired
+
+
+def _execute_route_on_connection(slug, db_slug, connection, template, user_param_dict, timeout, learn=None):
+    """
+    Executa o template da rota em uma conexão: empresta a sessão do pool, faz o
+    bind, executa (removendo colunas inválidas em caso de ORA-00904) e commita.
+    Se alguma coluna foi removida, `learn(colunas, sql)` guarda o SQL que funcionou.
+    Retorna (resultado, executou, último_erro); resultado None = sem entrada na resposta.
+    """
+    last_error = None
+
+    # 1) Emprestar uma sessão do pool da conexão
+    db_conn = acquire_target_connection(connection)
+    if not db_conn:
+        return f"⚠️ Falha ao conectar com {db_slug}.", False, None
+
+    is_oracle = connection['db_type'] == 'oracle'
+    if is_oracle and timeout:
+        # Interrompe chamadas que ultrapassarem o tempo limite desta conexão
+        db_conn.callTimeout = int(timeout * 1000)
+
+    db_cursor = db_conn.cursor()
+    try:
+        final_params = {k.lower(): v for k, v in user_param_dict.items()}
+
+        attempt_count = 0
+        removed_columns = []
+
+        while True:
+            attempt_count += 1
+            current_query, query_parameters = template.bind(final_params)
+
+            logging.error(f"🪢 [Tentativa {attempt_count}] Executando query para {db_slug}")
+            logging.error(f"📝 Query atual:\n{current_query}")
+            logging.error(f"📌 Parâmetros:\n{json.dumps(query_parameters, indent=4)}")
+
+            deadline = None
+            try:
+                if not is_oracle and timeout:
+                    deadline = _mysql_deadline(connection, db_conn, timeout)
+                try:
+                    db_cursor.execute(current_query, query_parameters)
+                finally:
+                    if deadline:
+                        deadline[0].cancel()
+                db_conn.commit()
+                rows_affected = db_cursor.rowcount
+                logging.info(f"📊 Linhas afetadas: {rows_affected}")
+                if removed_columns and learn:
+                    learn(removed_columns, template.source)
+
+                return {
+                    "message": "✅ Query executada com sucesso.",
+                    "executed_query": current_query,
+                    "query_parameters": query_parameters,
+                    "rows_affected": rows_affected
+                }, True, last_error
+
+            except Exception as e:
+                last_error = str(e)
+                logging.error(f"❌ Erro tentativa {attempt_count}: {last_error}")
+                logging.error(traceback.format_exc())
+
+                # ⏱️ Comando interrompido pelo banco (KILL QUERY no MySQL, callTimeout no Oracle):
+                # não chegou ao commit
+                if (deadline and deadline[1].is_set()) or "DPI-1067" in last_error:
+                    return {
+                        "error": "⏱️ Tempo limite excedido",
+                        "message": last_error,
+                        "executed_query": current_query,
+                        "query_parameters": query_parameters
+                    }, False, last_error
+
+                # ✅ Trata erros de coluna inválida ou sinônimo inválido
+                if attempt_count < MAX_INVALID_COLUMN_RETRIES and (
+                        "invalid identifier" in last_error.lower()
+                        or "synonym translation is no longer valid" in last_error.lower()):
+                    match = re.search(r'ORA-00904:\s+"?(?:\w+"\.)?"?(?P<coluna>\w+)"?', last_error)
+
+                    if match:
+                        invalid_column = match.group("coluna")
+                        removed_columns.append(invalid_column)
+                        template = RouteTemplate(remove_invalid_column_from_query(slug, current_query, invalid_column))
+                        continue  # tenta novamente com a coluna removida
+                    elif "synonym translation is no longer valid" in last_error.lower():
+                        if slug in ['bluemind_mv_tab115', 'bluemind_mv_tab116']:
+                            logging.warning("🔁 Substituindo query para slug especial após ORA-00980 (synonym inválido).")
+                            template = RouteTemplate(remove_invalid_column_from_query(slug, current_query, ""))  # força uso da query alternativa
+                            removed_columns.append("ORA-00980")
+                            continue
+                        else:
+                            logging.warning("⚠️ ORA-00980 em slug sem tratamento especial.")
+                            return None, False, last_error
+                    else:
+                        logging.warning("⚠️ 'invalid identifier' ou erro relacionado sem coluna capturada.")
+                        return None, False, last_error
+
+                # ❌ Qualquer outro erro deve encerrar a execução
+                return {
+                    "error": f"❌ Falha na execução",
+                    "message": last_error,
+                    "executed_query": current_query,
+                    "query_parameters": query_parameters
+                }, False, last_error
+    finally:
+        db_cursor.close()
+        if is_oracle and timeout:
+            db_conn.callTimeout = 0  # a sessão volta ao pool sem limite
+        db_conn.close()
+
+@route_bp.route('/adaptations', methods=['GET'])
+@token_required
+@permission_required(route_prefix='/routes')
+def list_route_adaptations(user_data):
+    """
+    SQL adaptado aprendido por rota e conexão (?route_id= filtra uma rota).
+    """
+    try:
+        route_id = request.args.get("route_id", type=int)
+        return jsonify({"status": "success", "data": list_adaptations(route_id)}), 200
+    except Exception as e:
+        logging.exception("Erro ao listar adaptações de rotas")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@route_bp.route('/adaptations', methods=['DELETE'])
+@token_required
+@permission_required(route_prefix='/routes')
+def clear_route_adaptations(user_data):
+    """
+    Apaga adaptações (?route_id= e/ou ?connection_id=; sem filtros, todas).
+    A próxima execução volta a tentar a query original.
+    """
+    try:
+        removed = clear_adaptations(request.args.get("route_id", type=int),
+                                    request.args.get("connection_id", type=int))
+        return jsonify({"status": "success", "removed": removed}), 200
+    except Exception as e:
+        logging.exception("Erro ao apagar adaptações de rotas")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@route_bp.route('/cache/stats', methods=['GET'])
+@token_required
+@permission_required(route_prefix='/routes')
+def get_result_cache_stats(user_data):
+    """
+    Contadores do cache de resultados (acertos, falhas, gravações, bytes em uso).
+    """
+    return jsonify({
+        "status": "success",
+        "cache": result_cache_stats(),
+        "templates": route_template_stats(),
+        "schema": schema_cache_stats(),
+        "sequence_blocks": sequence_block_stats()
+    }), 200
+
+@route_bp.route('/cache/<slug>', methods=['DELETE'])
+@token_required
+@permission_required(route_prefix='/routes')
+def clear_route_result_cache(user_data, slug):
+    """
+    Descarta os resultados guardados de uma rota.
+    """
+    removed = invalidate_results("route", slug)
+    return jsonify({"status": "success", "removed": removed}), 200
+
+def _stream_route_rows(slug, db_slug, connection, template, user_param_dict, timeout, arraysize, learn=None):
+    """
+    Gerador para stream_sections: executa a query SELECT da rota em uma conexão
+    (removendo colunas inválidas em caso de ORA-00904, como na execução normal)
+    e produz as colunas seguidas das linhas, buscadas com fetchmany.
+    """
+    db_conn = acquire_target_connection(connection)
+    is_oracle = connection['db_type'] == 'oracle'
+    if is_oracle and timeout:
+        db_conn.callTimeout = int(timeout * 1000)
+
+    db_cursor = db_conn.cursor()
+    try:
+        db_cursor.arraysize = arraysize
+        final_params = {k.lower(): v for k, v in user_param_dict.items()}
+        removed_columns = []
+
+        for attempt_count in range(1, MAX_INVALID_COLUMN_RETRIES + 1):
+            current_query, query_parameters = template.bind(final_params)
+            try:
+                db_cursor.execute(current_query, query_parameters)
+                if removed_columns and learn:
+                    learn(removed_columns, template.source)
+                break
+            except Exception as e:
+                match = re.search(r'ORA-00904:\s+"?(?:\w+"\.)?"?(?P<coluna>\w+)"?', str(e))
+                if not match or attempt_count == MAX_INVALID_COLUMN_RETRIES:
+                    raise
+                logging.warning(f"🪢 [Tentativa {attempt_count}] Coluna inválida em {db_slug}: {match.group('coluna')}")
+                removed_columns.append(match.group("coluna"))
+                template = RouteTemplate(remove_invalid_column_from_query(slug, current_query, match.group("coluna")))
+
+        yield [col[0] for col in db_cursor.description]
+        yield from iter_cursor(db_cursor, arraysize)
+    finally:
+        db_cursor.close()
+        if is_oracle and timeout:
+            db_conn.callTimeout = 0  # a sessão volta ao pool sem limite
+        db_conn.close()
+
 @route_bp.route('/execute/<slug>', methods=['POST'])
 @token_required
 @permission_required(route_prefix='/routes/execute')
@@ -560,6 +967,14 @@ def execute_route_query(user_data, slug):
         request_data = request.json or {}
         logging.error(f"📅 Dados recebidos na requisição:\n{json.dumps(request_data, indent=4)}")
 
+        try:
+            request_timeout = float(request_data.get("timeout") or ROUTE_EXECUTION_TIMEOUT)
+        except (TypeError, ValueError):
+            return jsonify({"status": "error", "message": "O campo 'timeout' deve ser numérico."}), 400
+        if request_timeout <= 0:
+            return jsonify({"status": "error", "message": "O campo 'timeout' deve ser positivo."}), 400
+        request_timeout = min(request_timeout, ROUTE_EXECUTION_MAX_TIMEOUT)
+
         provided_connections = request_data.get("connections", [])
         provided_parameters_list = request_data.get("parameters", [])
         provided_parameters = {
@@ -568,322 +983,143 @@ def execute_route_query(user_data, slug):
             for conn_name, params in param_entry.items()
         }
 
-        # Obter rota
+        # Obter rota e os ids das conexões associadas (sem GROUP_CONCAT, que trunca a lista)
         conn = create_db_connection_mysql()
         cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT r.id, r.query FROM routes r WHERE r.slug = %s", (slug,))
-        route = cursor.fetchone()
-        cursor.close()
-        conn.close()
+        try:
+            cursor.execute("SELECT id, query, updated_at, cache_ttl FROM routes WHERE slug = %s", (slug,))
+            route = cursor.fetchone()
+            if route:
+                cursor.execute("SELECT connection_id FROM route_connections WHERE route_id = %s", (route['id'],))
+                connection_ids = [row['connection_id'] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            conn.close()
 
         if not route:
             return jsonify({"status": "error", "message": f"❌ Rota não encontrada para o slug: {slug}"}), 404
 
-        query_legacy = route['query']
+        # SQL compilado uma vez por versão da rota; por requisição só o bind dos parâmetros
+        template = get_route_template(route['id'], route['updated_at'], route['query'])
 
-        # Obter conexões
-        conn = create_db_connection_mysql()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT DISTINCT c.* FROM connections c
-            JOIN route_connections rc ON c.id = rc.connection_id
-            WHERE rc.route_id = %s
-        """, (route['id'],))
-        connections = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        # ?format=ndjson|csv: transmite as linhas de rotas SELECT, uma seção por conexão
+        try:
+            stream_format = requested_stream_format()
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        if stream_format and template.kind not in ("SELECT", "WITH"):
+            return jsonify({
+                "status": "error",
+                "message": "O streaming (?format=) só está disponível para rotas de consulta (SELECT)."
+            }), 400
+
+        # Obter conexões (descritores em cache, com senha já descriptografada)
+        connections = list(get_connection_descriptors(connection_ids).values())
 
         slugs_requisitados = [c.strip().lower() for c in provided_connections]
         results = {}
         executed_any_query = False
+        unknown_outcome = False
         last_error = None
 
-        def remove_invalid_column_from_query(query: str, param_name: str) -> str:
-            logging.warning(f"🛠️ Removendo coluna inválida: {param_name}")
-
-            # ✅ Lógica específica para os slugs especiais
-            if slug in ['bluemind_mv_tab115', 'bluemind_mv_tab116', 'bluemind_mv_tab_127_homolog', 'bluemind_mv_tab_127_homolog']:
-                logging.warning(f"🔁 Substituindo query para slug '{slug}' devido a erro de coluna inválida")
-                if slug == 'bluemind_mv_tab115':
-                    return """
-                    INSERT INTO DBAMV.PROIBICAO (
-                        CD_PRO_FAT, CD_CON_PLA, CD_CONVENIO, DS_PROIBICAO, TP_PROIBICAO,
-                        TP_ATENDIMENTO, DT_INICIAL_PROIBICAO, CD_MULTI_EMPRESA,
-                        CD_SETOR, CD_REGRA_PROIBICAO_VALOR
-                    )
-                    SELECT DISTINCT
-                        pf.cd_pro_fat, cp.CD_CON_PLA, ecp.CD_CONVENIO, :DS_PROIBICAO,
-                        :TP_PROIBICAO, :TP_ATENDIMENTO, TO_DATE(:DT_INICIAL_PROIBICAO, 'DD/MM/YYYY'),
-                        ecp.CD_MULTI_EMPRESA, :CD_SETOR, :CD_REGRA_PROIBICAO_VALOR
-                    FROM dbamv.CON_PLA cp, dbamv.EMPRESA_CON_PLA ecp, dbamv.pro_fat pf
-                    WHERE cp.CD_CONVENIO = ecp.CD_CONVENIO
-                        AND cp.CD_CON_PLA = ecp.CD_CON_PLA
-                        AND cp.SN_ATIVO = 'S'
-                        AND ecp.SN_ATIVO = 'S'
-                        AND ecp.CD_CONVENIO = :CD_CONVENIO
-                        AND ecp.CD_MULTI_EMPRESA = :CD_MULTI_EMPRESA
-                        AND ecp.CD_CON_PLA = NVL(:CD_CON_PLA, ecp.CD_CON_PLA)
-                        AND pf.sn_ativo = 'S'
-                        AND pf.CD_PRO_FAT = :CD_PRO_FAT
-                        AND NOT EXISTS (
-                            SELECT 'K'
-                            FROM DBAMV.PROIBICAO p
-                            WHERE p.CD_PRO_FAT = pf.cd_pro_fat
-                                AND p.CD_CONVENIO = cp.CD_CONVENIO
-                                AND NVL(p.CD_CON_PLA, 0) = NVL(cp.CD_CON_PLA, 0)
-                                AND p.TP_PROIBICAO = :TP_PROIBICAO
-                                AND p.TP_ATENDIMENTO = NVL(:TP_ATENDIMENTO, p.TP_ATENDIMENTO)
-                                AND TRUNC(p.DT_INICIAL_PROIBICAO) = TRUNC(TO_DATE(:DT_INICIAL_PROIBICAO, 'DD/MM/YYYY'))
-                                AND p.CD_MULTI_EMPRESA = ecp.CD_MULTI_EMPRESA
-                                AND NVL(p.cd_setor, 0) = NVL(:CD_SETOR, 0)
-                        )
-                    """
-                elif slug == 'bluemind_mv_tab116':
-                    return """
-        INSERT INTO DBAMV.PROIBICAO (
-             CD_PRO_FAT, CD_CON_PLA, CD_CONVENIO, DS_PROIBICAO, TP_PROIBICAO,
-             TP_ATENDIMENTO, DT_INICIAL_PROIBICAO, CD_MULTI_EMPRESA,
-             CD_SETOR, CD_REGRA_PROIBICAO_VALOR
-                    )
-                    SELECT DISTINCT
-             pf.cd_pro_fat, cp.CD_CON_PLA, ecp.CD_CONVENIO, :DS_PROIBICAO,
-             :TP_PROIBICAO, :TP_ATENDIMENTO, TO_DATE(:DT_INICIAL_PROIBICAO, 'DD/MM/YYYY'),
-             ecp.CD_MULTI_EMPRESA, :CD_SETOR, :CD_REGRA_PROIBICAO_VALOR
-         FROM dbamv.CON_PLA cp, dbamv.EMPRESA_CON_PLA ecp, dbamv.pro_fat pf
-         WHERE cp.CD_CONVENIO = ecp.CD_CONVENIO
-             AND cp.CD_CON_PLA = ecp.CD_CON_PLA
-                        AND cp.SN_ATIVO = 'S'
-                        AND ecp.SN_ATIVO = 'S'
-             AND ecp.CD_CONVENIO = :CD_CONVENIO
-             AND ecp.CD_MULTI_EMPRESA = :CD_MULTI_EMPRESA
-             AND ecp.CD_CON_PLA = NVL(:CD_CON_PLA, ecp.CD_CON_PLA)
-                        AND pf.sn_ativo = 'S'
-           AND pf.CD_GRU_PRO = :CD_PRO_FAT
-                        AND NOT EXISTS (
-                            SELECT 'K'
-                 FROM DBAMV.PROIBICAO p
-                 WHERE p.CD_PRO_FAT = pf.cd_pro_fat
-                   AND p.CD_CONVENIO = cp.CD_CONVENIO
-                     AND NVL(p.CD_CON_PLA, 0) = NVL(cp.CD_CON_PLA, 0)
-                   AND p.TP_PROIBICAO = :TP_PROIBICAO
-                     AND p.TP_ATENDIMENTO = NVL(:TP_ATENDIMENTO, p.TP_ATENDIMENTO)
-                     AND TRUNC(p.DT_INICIAL_PROIBICAO) = TRUNC(TO_DATE(:DT_INICIAL_PROIBICAO, 'DD/MM/YYYY'))
-                     AND p.CD_MULTI_EMPRESA = ecp.CD_MULTI_EMPRESA
-                     AND NVL(p.cd_setor, 0) = NVL(:CD_SETOR, 0)
-                        )
-                    """
-                elif slug == 'bluemind_mv_tab_127_homolog':
-                    return """
-                    DELETE DBAMV.PROIBICAO p
-                    WHERE p.CD_PRO_FAT = :CD_PRO_FAT
-                    AND p.CD_CONVENIO = :CD_CONVENIO
-                    AND p.CD_MULTI_EMPRESA = :CD_MULTI_EMPRESA
-                    AND p.CD_CON_PLA = nvl(:CD_CON_PLA, p.CD_CON_PLA)
-                    AND p.TP_PROIBICAO = :TP_PROIBICAO
-                    AND p.TP_ATENDIMENTO = :TP_ATENDIMENTO
-                    AND nvl(p.CD_SETOR, 0) = nvl(:CD_SETOR, nvl(p.CD_SETOR, 0))
-                    AND nvl(p.CD_REGRA_PROIBICAO_VALOR, 0) = nvl(:CD_REGRA_PROIBICAO_VALOR, nvl(p.CD_REGRA_PROIBICAO_VALOR, 0))
-                    """
-                elif slug == 'bluemind_mv_tab_128_homolog':
-                    return """
-                    DELETE DBAMV.PROIBICAO p
-                    WHERE EXISTS (SELECT 1 FROM dbamv.pro_fat pf WHERE pf.CD_GRU_PRO = :pCD_PRO_FAT AND pf.cd_pro_fat = p.CD_PRO_FAT)
-                    AND p.CD_CONVENIO = :CD_CONVENIO
-                    AND p.CD_MULTI_EMPRESA = :CD_MULTI_EMPRESA
-                    AND p.CD_CON_PLA = nvl(:CD_CON_PLA, p.CD_CON_PLA)
-                    AND p.TP_PROIBICAO = :TP_PROIBICAO
-                    AND p.TP_ATENDIMENTO = :TP_ATENDIMENTO
-                    AND nvl(p.CD_SETOR, 0) = nvl(:CD_SETOR, nvl(p.CD_SETOR, 0))
-                    AND nvl(p.CD_REGRA_PROIBICAO_VALOR, 0) = nvl(:CD_REGRA_PROIBICAO_VALOR, nvl(p.CD_REGRA_PROIBICAO_VALOR, 0))
-                    """
-
-            # 🔧 Caso comum continua aqui
-            original_query = query
-            query = re.sub(rf"TO_DATE\s*\(\s*:\s*{param_name}\s*,\s*'[^']*'\s*\)", '', query, flags=re.IGNORECASE)
-            query = re.sub(rf"TRUNC\s*\(\s*:\s*{param_name}\s*\)", '', query, flags=re.IGNORECASE)
-            query = re.sub(rf"NVL\s*\(\s*:\s*{param_name}\s*,\s*[^)]+\)", '', query, flags=re.IGNORECASE)
-            query = re.sub(rf":{param_name}\b", '', query, flags=re.IGNORECASE)
-            query = re.sub(rf'\b{param_name}\b\s*,?', '', query, flags=re.IGNORECASE)
-            query = re.sub(r',\s*\)', ')', query)
-            query = re.sub(
-                rf'AND\s+[^()]*{param_name}[^()]*?(=|<>|<|>|IS|LIKE|IN)[^()]*',
-                '', query, flags=re.IGNORECASE
-            )
-            query = re.sub(r'TO_DATE\s*\(\s*:\s*,\s*\'[^\']*\'\s*\)', '', query, flags=re.IGNORECASE)
-            query = re.sub(r',\s*,', ',', query)
-            query = re.sub(r'\(\s*,', '(', query)
-            query = re.sub(r',\s*\)', ')', query)
-            query = re.sub(r',\s*FROM', ' FROM', query, flags=re.IGNORECASE)
-            query = re.sub(r'\s+', ' ', query).strip()
-
-            logging.error(f"🧼 Query original:\n{original_query}")
-            logging.error(f"🧹 Query após remover '{param_name}':\n{query}")
-            return query
-
-
-        def build_update_query_with_non_nulls(query: str, params: dict) -> Tuple[str, dict]:
-            # 🔒 Validação obrigatória do campo primary_key
-            primary_key = params.get("primary_key")
-            if primary_key in [None, "", "null", "none"]:
-                raise ValueError("❌ Parâmetro obrigatório 'primary_key' não foi informado ou está vazio.")
-
-            set_clause_match = re.search(r'SET\s+(.*?)\s+WHERE', query, re.IGNORECASE | re.DOTALL)
-            if not set_clause_match:
-                return query, params
-
-            set_clause = set_clause_match.group(1)
-            assignments = re.findall(r'(\w+)\s*=\s*(TO_DATE\s*\(:\w+[^)]*\)|:\w+)', set_clause)
-
-            kept_assignments = []
-            kept_params = {}
-
-            for column, expression in assignments:
-                param_match = re.search(r':(\w+)', expression)
-                if not param_match:
-                    continue
-                param_name = param_match.group(1).lower()
-                value = params.get(param_name)
-                if value not in [None, "", "null"]:
-                    kept_assignments.append(f"{column} = {expression}")
-                    kept_params[param_name] = value
-
-            set_clause_clean = ', '.join(kept_assignments)
-            new_query = re.sub(r'SET\s+.*?\s+WHERE', f"SET {set_clause_clean} WHERE", query, flags=re.IGNORECASE | re.DOTALL)
-
-            # Mantém parâmetros do WHERE mesmo se não estiverem no SET
-            where_params = re.findall(r':(\w+)', new_query)
-            for param in where_params:
-                param_lower = param.lower()
-                if param_lower not in kept_params:
-                    kept_params[param_lower] = params.get(param_lower)
-
-            return new_query, kept_params
+        # Rotas de consulta podem reaproveitar resultados recentes; DML nunca é cacheado
+        cache_policy = request_cache_policy(route["cache_ttl"]) if template.read_only else CachePolicy(0)
+        cache_keys = {}
+        cache_hits = 0
 
+        # Monta uma tarefa por conexão requisitada e executa todas em paralelo
+        tasks = {}
         for connection in connections:
             db_slug = connection['slug'].strip().lower()
             if db_slug not in slugs_requisitados:
                 continue
 
             logging.error(f"✅ Conexão {db_slug} será utilizada para execução.")
-            password = decrypt_password(connection['password'])
-
-            # 1) Levantar a conexão certa
-            if connection['db_type'] == 'oracle':
-                db_conn = create_oracle_connection(
-                    host=connection['host'],
-                    port=connection['port'],
-                    user=connection['username'],
-                    password=password,
-                    service_name=connection.get('service_name'),
-                    sid=connection.get('sid')
-                )
-                placeholder_style = "oracle"
-            elif connection['db_type'] in ('mysql', 'mariadb'):
-                db_conn = create_db_connection_mysql(
-                    host=connection['host'],
-                    port=connection['port'],
-                    user=connection['username'],
-                    password=password,
-                    database=connection['database_name']
-                )
-                placeholder_style = "mysql"
-            else:
-                results[db_slug] = f"⚠️ Tipo de DB não suportado: {connection['db_type']}"
-                continue
 
-            if not db_conn:
-                results[db_slug] = f"⚠️ Falha ao conectar com {db_slug}."
+            if connection['db_type'] not in ('oracle', 'mysql', 'mariadb'):
+                results[db_slug] = f"⚠️ Tipo de DB não suportado: {connection['db_type']}"
                 continue
 
-            db_cursor = db_conn.cursor()
             if db_slug not in provided_parameters:
                 results[db_slug] = f"⚠️ Nenhum parâmetro enviado para {db_slug}."
-                db_cursor.close()
                 continue
 
-            user_param_dict = provided_parameters[db_slug]
-            final_params = {k.lower(): v for k, v in user_param_dict.items()}
-            current_query = re.sub(r"@(\w+)", r":\1", query_legacy)
-
-            attempt_count = 0
-            removed_columns = []
-
-            while True:
-                attempt_count += 1
-                query_type = current_query.strip().split()[0].upper()
-
-                if query_type == "UPDATE":
-                    current_query, query_parameters = build_update_query_with_non_nulls(current_query, final_params)
-                else:
-                    found_vars = re.findall(r':(\w+)', current_query)
-                    query_parameters = {var.lower(): final_params.get(var.lower()) for var in found_vars}
-
-                logging.error(f"🪢 [Tentativa {attempt_count}] Executando query para {db_slug}")
-                logging.error(f"📝 Query atual:\n{current_query}")
-                logging.error(f"📌 Parâmetros:\n{json.dumps(query_parameters, indent=4)}")
+            # Tempo limite por conexão: extra_params.execution_timeout ou o da requisição
+            timeout = min(float(parse_extra_params(connection).get("execution_timeout", request_timeout)),
+                          ROUTE_EXECUTION_MAX_TIMEOUT)
+            if stream_format:
+                connection_template, learn = _connection_template(route, template, connection)
+                tasks[db_slug] = partial(_stream_route_rows, slug, db_slug, connection, connection_template,
+                                         provided_parameters[db_slug], timeout, requested_arraysize(), learn)
+                continue
 
-                try:
-                    db_cursor.execute(current_query, query_parameters)
-                    db_conn.commit()
+            if cache_policy.enabled:
+                cache_keys[db_slug] = result_cache_key("route", slug, db_slug, provided_parameters[db_slug])
+                cached = get_cached_result(cache_keys[db_slug], cache_policy)
+                if cached is not None:
+                    results[db_slug] = cached
                     executed_any_query = True
-                    rows_affected = db_cursor.rowcount
-                    logging.info(f"📊 Linhas afetadas: {rows_affected}")
-
-                    results[db_slug] = {
-                        "message": "✅ Query executada com sucesso.",
-                        "executed_query": current_query,
-                        "query_parameters": query_parameters,
-                        "rows_affected": rows_affected
-                    }
-                    break
-
-                except Exception as e:
-                    last_error = str(e)
-                    logging.error(f"❌ Erro tentativa {attempt_count}: {last_error}")
-                    logging.error(traceback.format_exc())
-
-                    # ✅ Trata erros de coluna inválida ou sinônimo inválido
-                    if "invalid identifier" in last_error.lower() or "synonym translation is no longer valid" in last_error.lower():
-                        match = re.search(r'ORA-00904:\s+"?(?:\w+"\.)?"?(?P<coluna>\w+)"?', last_error)
-                        
-                        if match:
-                            invalid_column = match.group("coluna")
-                            removed_columns.append(invalid_column)
-                            current_query = remove_invalid_column_from_query(current_query, invalid_column)
-                            continue  # tenta novamente com a coluna removida
-                        elif "synonym translation is no longer valid" in last_error.lower():
-                            if slug in ['bluemind_mv_tab115', 'bluemind_mv_tab116']:
-                                logging.warning("🔁 Substituindo query para slug especial após ORA-00980 (synonym inválido).")
-                                current_query = remove_invalid_column_from_query(current_query, "")  # força uso da query alternativa
-                                continue
-                            else:
-                                logging.warning("⚠️ ORA-00980 em slug sem tratamento especial.")
-                                break
-                        else:
-                            logging.warning("⚠️ 'invalid identifier' ou erro relacionado sem coluna capturada.")
-                            break
-
+                    cache_hits += 1
+                    continue
 
-                    # ❌ Qualquer outro erro deve encerrar a execução
-                    results[db_slug] = {
-                        "error": f"❌ Falha na execução",
-                        "message": last_error,
-                        "executed_query": current_query,
-                        "query_parameters": query_parameters
-                    }
-                    break
+            # SQL já adaptado a esta conexão evita repetir as tentativas com ORA-00904
+            connection_template, learn = _connection_template(route, template, connection)
+            tasks[db_slug] = (
+                partial(_execute_route_on_connection, slug, db_slug, connection,
+                        connection_template, provided_parameters[db_slug], timeout, learn),
+                timeout + DEADLINE_GRACE
+            )
 
-            db_cursor.close()
+        if stream_format:
+            # Conexões sem execução possível viram seções com a mensagem de erro
+            sections = [(db_slug, partial(failed_section, message)) for db_slug, message in results.items()]
+            return stream_sections(sections + list(tasks.items()), stream_format)
+
+        timings = {}
+        for db_slug, outcome in run_parallel(tasks, request_timeout).items():
+            timings[db_slug] = outcome["elapsed_ms"]
+            if outcome["status"] == "ok":
+                result, executed, error = outcome["result"]
+                if result is not None:
+                    results[db_slug] = result
+                if executed and db_slug in cache_keys:
+                    store_result(cache_keys[db_slug], result, cache_policy)
+                executed_any_query = executed_any_query or executed
+                last_error = error or last_error
+            elif outcome["status"] == "timeout" and not template.read_only:
+                # O comando segue no banco e pode ainda ser commitado: resultado desconhecido
+                unknown_outcome = True
+                last_error = outcome["error"]
+                results[db_slug] = {
+                    "error": "⏱️ Tempo limite excedido",
+                    "outcome": "unknown",
+                    "message": f"{outcome['error']} O comando pode ter sido aplicado; confira no banco antes de repetir."
+                }
+            else:
+                last_error = outcome["error"]
+                results[db_slug] = {
+                    "error": "⏱️ Tempo limite excedido" if outcome["status"] == "timeout" else "❌ Falha na execução",
+                    "message": outcome["error"]
+                }
 
         if not executed_any_query:
             return jsonify({
                 "status": "error",
-                "message": "Nenhuma query foi executada.",
+                "message": "Resultado desconhecido: tempo limite excedido." if unknown_outcome
+                           else "Nenhuma query foi executada.",
                 "last_error": last_error,
-                "data": results
-            }), 400
-
-        return jsonify({"status": "success", "data": results}), 200
+                "data": results,
+                "timings_ms": timings
+            }), 504 if unknown_outcome else 400
+
+        response = jsonify({"status": "success", "data": results, "timings_ms": timings})
+        if cache_policy.enabled:
+            response.headers["X-Cache"] = (
+                "BYPASS" if not cache_policy.read else
+                "HIT" if cache_hits and not tasks else
+                "PARTIAL" if cache_hits else "MISS"
+            )
+        return response, 200
 
     except Exception as e:
         logging.error(f"❌ Erro inesperado: {str(e)}")
@@ -911,20 +1147,8 @@ def get_sequence_nextval(user_data):
             for connection_name, params in param_entry.items():
                 provided_parameters[connection_name] = params
 
-        # Criar conexão com MySQL para buscar credenciais das conexões Oracle
-        conn = create_db_connection_mysql()
-        cursor = conn.cursor(dictionary=True)
-
-        query_connections = """
-            SELECT c.slug, c.db_type, c.host, c.port, c.username, c.password, c.service_name, c.sid
-            FROM connections c
-            WHERE c.slug IN (%s)
-        """ % (",".join(["%s"] * len(provided_connections)))
-
-        cursor.execute(query_connections, tuple(provided_connections))
-        connections = {conn["slug"]: conn for conn in cursor.fetchall()}
-        cursor.close()
-        conn.close()
+        # Credenciais das conexões Oracle (descritores em cache)
+        connections = get_connection_descriptors_by_slugs(provided_connections)
 
         if not connections:
             return jsonify({"status": "error", "message": "❌ Nenhuma conexão válida encontrada no banco de dados."}), 404
@@ -949,48 +1173,34 @@ def get_sequence_nextval(user_data):
                     results[db_slug] = f"⚠️ Conexão {db_slug} não é um banco Oracle."
                     continue
 
-                password = decrypt_password(conn_details["password"])
-                db_conn = create_oracle_connection(
-                    host=conn_details["host"],
-                    port=conn_details["port"],
-                    user=conn_details["username"],
-                    password=password,
-                    service_name=conn_details.get("service_name"),
-                    sid=conn_details.get("sid")
-                )
-
-                if not db_conn:
-                    results[db_slug] = f"⚠️ Não foi possível criar conexão para {db_slug}."
-                    continue
-
-                db_cursor = db_conn.cursor()
-
                 # Obtendo o nome da sequência
                 sequence_name = user_param_dict.get("sequence")
                 if not sequence_name:
                     results[db_slug] = "⚠️ Nenhuma sequência informada."
-                    db_cursor.close()
                     continue
 
-                logging.error(f"🔍 [{db_slug}] Obtendo NEXTVAL de {sequence_name}")
+                try:
+                    count = int(user_param_dict.get("count", 1))
+                except (TypeError, ValueError):
+                    results[db_slug] = "⚠️ count deve ser um número inteiro."
+                    continue
 
-                # Montando a query dinâmica
-                query = f"SELECT {sequence_name}.NEXTVAL AS id_sequence_utilizada FROM DUAL"
-                logging.error(f"🔥 [ORACLE] Query final:\n{query}")
+                logging.error(f"🔍 [{db_slug}] Obtendo {count} NEXTVAL de {sequence_name}")
                 sys.stdout.flush()
 
-                # Executando a query
-                db_cursor.execute(query)
-                result = db_cursor.fetchone()
-
-                # Fechando conexão
-                db_cursor.close()
-                db_conn.close()
+                # N valores numa ida ao banco, ou direto do bloco já reservado (SEQUENCE_BLOCK_SIZE)
+                use_block = str(user_param_dict.get("use_block", True)).lower() not in ("0", "false")
+                try:
+                    values = next_sequence_values(conn_details, sequence_name, count, use_block=use_block)
+                except ValueError as e:
+                    results[db_slug] = f"⚠️ {e}"
+                    continue
 
-                if result:
+                if values:
                     results[db_slug] = {
                         "message": "NEXTVAL obtido com sucesso",
-                        "id_sequence_utilizada": result[0]
+                        "id_sequence_utilizada": values[0],
+                        "ids": values
                     }
                     executed_any_query = True
                 else:
@@ -1014,10 +1224,32 @@ def get_sequence_nextval(user_data):
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+def _requested_tables(params):
+    """
+    Tabelas pedidas para uma conexão: {"schema", "table_name"} ou, em lote,
+    {"tables": [{"schema", "table_name"} | "OWNER.TABELA", ...]} ("schema" vale
+    como padrão para nomes sem owner). Retorna (lista de (owner, tabela), é_lote).
+    """
+    if "tables" not in params:
+        return [(params.get("schema"), params.get("table_name"))], False
+
+    tables = []
+    for item in params.get("tables") or []:
+        if isinstance(item, dict):
+            tables.append((item.get("schema") or params.get("schema"), item.get("table_name")))
+        else:
+            owner, _, table = str(item).rpartition(".")
+            tables.append((owner or params.get("schema"), table))
+    return tables, True
+
 @route_bp.route('/bluemind/table_structure/', methods=['POST'])
 @token_required
 @permission_required(route_prefix='/routes')
 def get_table_structure(user_data):
+    """
+    Estrutura (colunas) de tabelas Oracle por conexão, servida do cache de
+    metadados; ?refresh=1 consulta o dicionário de novo.
+    """
     try:
         logging.info("🔹 Iniciando obtenção da estrutura da tabela")
         request_data = request.json or {}
@@ -1025,83 +1257,41 @@ def get_table_structure(user_data):
 
         provided_connections = request_data.get("connections", [])
         provided_parameters_list = request_data.get("parameters", [])
+        refresh = request.args.get("refresh", "").lower() in ("1", "true")
 
         provided_parameters = {}
         for param_entry in provided_parameters_list:
             for connection_name, params in param_entry.items():
                 provided_parameters[connection_name] = params
 
-        # Obter credenciais Oracle
-        conn = create_db_connection_mysql()
-        cursor = conn.cursor(dictionary=True)
-        query = """
-            SELECT c.slug, c.db_type, c.host, c.port, c.username, c.password, c.service_name, c.sid
-            FROM connections c
-            WHERE c.slug IN (%s)
-        """ % (",".join(["%s"] * len(provided_connections)))
-        cursor.execute(query, tuple(provided_connections))
-        connections = {conn["slug"]: conn for conn in cursor.fetchall()}
-        cursor.close()
-        conn.close()
+        # Obter credenciais Oracle (descritores em cache)
+        connections = get_connection_descriptors_by_slugs(provided_connections)
 
         if not connections:
             return jsonify({"status": "error", "message": "❌ Nenhuma conexão encontrada."}), 404
 
         results = {}
         for db_slug, params in provided_parameters.items():
-            if db_slug not in connections:
+            if db_slug.strip().lower() not in connections:
                 continue
 
-            conn_details = connections[db_slug]
+            conn_details = connections[db_slug.strip().lower()]
             if conn_details["db_type"].lower() != "oracle":
                 results[db_slug] = "⚠️ Não é Oracle."
                 continue
 
-            schema = params.get("schema")
-            table_name = params.get("table_name")
-
-            if not schema or not table_name:
+            tables, batch = _requested_tables(params)
+            if not tables or not all(schema and table_name for schema, table_name in tables):
                 results[db_slug] = "⚠️ Schema ou tabela não informados."
                 continue
 
             try:
-                password = decrypt_password(conn_details["password"])
-                db_conn = create_oracle_connection(
-                    host=conn_details["host"],
-                    port=conn_details["port"],
-                    user=conn_details["username"],
-                    password=password,
-                    service_name=conn_details.get("service_name"),
-                    sid=conn_details.get("sid")
-                )
-
-                db_cursor = db_conn.cursor()
-
-                query = f"""
-                    SELECT column_name, data_type, data_length, data_precision, data_scale, nullable
-                    FROM all_tab_columns
-                    WHERE owner = :schema
-                      AND table_name = :table_name
-                    ORDER BY column_id
-                """
-                db_cursor.execute(query, {"schema": schema.upper(), "table_name": table_name.upper()})
-                columns = db_cursor.fetchall()
-
-                structure = []
-                for col in columns:
-                    structure.append({
-                        "column_name": col[0],
-                        "data_type": col[1],
-                        "data_length": col[2],
-                        "data_precision": col[3],
-                        "data_scale": col[4],
-                        "nullable": col[5]
-                    })
-
-                results[db_slug] = structure
-
-                db_cursor.close()
-                db_conn.close()
+                # Uma consulta ao dicionário para todas as tabelas fora do cache
+                structures = get_table_columns(conn_details, tables, refresh=refresh)
+                if batch:
+                    results[db_slug] = {f"{owner}.{table}": columns for (owner, table), columns in structures.items()}
+                else:
+                    results[db_slug] = next(iter(structures.values()))
 
             except Exception as e:
                 results[db_slug] = f"❌ Erro: {str(e)}"
@@ -2,6 +2,7 @@ import bcrypt
 from flask import Blueprint, request, jsonify
 from app.utils.decorators import token_required, admin_required, permission_required
 from app.config.db_config import create_db_connection_mysql
+from app.utils.permission_cache import invalidate_user_permissions
 
 user_bp = Blueprint('users', __name__, url_prefix='/users')
 
@@ -150,6 +151,8 @@ def edit_user(user_data, user_id):
                     cursor.execute("DELETE FROM user_access WHERE user_id = %s", (user_id,))
                     conn.commit()
 
+        invalidate_user_permissions(user_id)
+
         # Retornar o ID do usuário atualizado
         return jsonify({"status": "success", "message": "Usuário atualizado com sucesso", "user_id": user_id}), 200
 
@@ -187,6 +190,8 @@ def delete_user(user_data, user_id):
         cursor.close()
         conn.close()
 
+        invalidate_user_permissions(user_id)
+
         return jsonify({"status": "success", "message": "Usuário desativado e vínculos removidos com sucesso."}), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -218,6 +223,8 @@ def restore_user(user_data, user_id):
         cursor.close()
         conn.close()
 
+        invalidate_user_permissions(user_id)
+
         return jsonify({"status": "success", "message": "Usuário restaurado com sucesso."}), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
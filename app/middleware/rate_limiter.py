@@ -1,14 +1,13 @@
 from flask import request, jsonify
 from datetime import datetime
-from celery_worker import log_request_to_db
-from collections import defaultdict
+from app.config.env import RATE_LIMIT_BACKEND
+from app.config.redis_config import get_redis, register_local_script
+from app.middleware.request_logger import enqueue_request_log
+import json
+import logging
 import time
 import threading
-
-# Armazenamento em memória (volátil)
-request_counts = defaultdict(list)
-blocked_ips = {}
-lock = threading.Lock()
+import zlib
 
 # Limites padrão
 MAX_REQUESTS_DEFAULT = 10
@@ -29,42 +28,207 @@ WHITELISTED_IPS = {
     },
 }
 
-def rate_limit():
-    ip = request.headers.get("X-Forwarded-For", request.remote_addr)
-    now = time.time()
+DEFAULT_LIMITS = {
+    "max_requests": MAX_REQUESTS_DEFAULT,
+    "window_seconds": WINDOW_SECONDS_DEFAULT,
+    "block_duration": BLOCK_DURATION_DEFAULT
+}
+
+# Estado em memória (volátil), dividido em shards para reduzir a disputa de locks
+SHARD_COUNT = 64
+SWEEP_INTERVAL = 60  # segundos entre varreduras de IPs ociosos em cada shard
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets", "blocked", "last_sweep")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}   # ip -> [tokens, atualizado_em]
+        self.blocked = {}   # ip -> desbloqueio_em
+        self.last_sweep = time.monotonic()
+
+
+_shards = [_Shard() for _ in range(SHARD_COUNT)]
 
-    # Configura limites e duração do bloqueio
-    limits = WHITELISTED_IPS.get(ip, {
-        "max_requests": MAX_REQUESTS_DEFAULT,
-        "window_seconds": WINDOW_SECONDS_DEFAULT,
-        "block_duration": BLOCK_DURATION_DEFAULT
-    })
 
+def _shard_for(ip):
+    return _shards[zlib.crc32(ip.encode()) % SHARD_COUNT]
+
+
+def _sweep(shard, now):
+    """
+    Remove IPs ociosos (balde cheio de novo) e bloqueios vencidos. Chamado com o lock do shard.
+    """
+    for ip in [ip for ip, until in shard.blocked.items() if until <= now]:
+        del shard.blocked[ip]
+    for ip, (tokens, updated_at) in list(shard.buckets.items()):
+        limits = WHITELISTED_IPS.get(ip, DEFAULT_LIMITS)
+        if now - updated_at >= limits["window_seconds"]:
+            del shard.buckets[ip]
+    shard.last_sweep = now
+
+
+def check_local_rate_limit(ip, now=None):
+    """
+    Token bucket por IP: o balde comporta `max_requests` fichas e se recompõe
+    a `max_requests / window_seconds` fichas por segundo. Uma requisição sem
+    ficha disponível bloqueia o IP por `block_duration`. O custo é constante
+    por requisição, independente do limite.
+    Retorna True se a requisição pode seguir.
+    """
+    now = time.monotonic() if now is None else now
+    limits = WHITELISTED_IPS.get(ip, DEFAULT_LIMITS)
     max_requests = limits["max_requests"]
-    window_seconds = limits["window_seconds"]
-    block_duration = limits["block_duration"]
+    shard = _shard_for(ip)
+
+    with shard.lock:
+        if now - shard.last_sweep >= SWEEP_INTERVAL:
+            _sweep(shard, now)
 
-    with lock:
         # Verifica se IP está bloqueado
-        if ip in blocked_ips:
-            unblock_time = blocked_ips[ip]
+        unblock_time = shard.blocked.get(ip)
+        if unblock_time is not None:
             if now < unblock_time:
-                _log_blocked_request(ip, request.path, 429)
-                return jsonify({"error": "IP bloqueado por excesso de requisições. Tente novamente mais tarde."}), 429
-            else:
-                del blocked_ips[ip]
-
-        # Filtra e registra requisições recentes
-        request_times = request_counts[ip]
-        request_times = [t for t in request_times if now - t < window_seconds]
-        request_times.append(now)
-        request_counts[ip] = request_times
-
-        if len(request_times) > max_requests:
-            blocked_ips[ip] = now + block_duration
-            del request_counts[ip]
-            _log_blocked_request(ip, request.path, 429)
-            return jsonify({"error": "IP bloqueado por excesso de requisições. Tente novamente mais tarde."}), 429
+                return False
+            del shard.blocked[ip]
+
+        bucket = shard.buckets.get(ip)
+        if bucket is None:
+            shard.buckets[ip] = [max_requests - 1, now]
+            return True
+
+        refill = (now - bucket[1]) * max_requests / limits["window_seconds"]
+        tokens = min(max_requests, bucket[0] + refill)
+        if tokens < 1:
+            shard.blocked[ip] = now + limits["block_duration"]
+            del shard.buckets[ip]
+            return False
+
+        bucket[0] = tokens - 1
+        bucket[1] = now
+        return True
+
+
+# --- Limite compartilhado entre processos e hosts (Redis) ---
+
+REDIS_KEY_PREFIX = "verzo:ratelimit"
+
+# Mesmo token bucket, atômico no Redis. KEYS: balde, bloqueio.
+# ARGV: max_requests, window_seconds, block_duration. Retorna {permitido, ms_de_bloqueio}.
+TOKEN_BUCKET_LUA = """
+local blocked = redis.call('PTTL', KEYS[2])
+if blocked > 0 then return {0, blocked} end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local max = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local block_ms = math.floor(tonumber(ARGV[3]) * 1000)
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil then
+  tokens = max
+  ts = now
+end
+tokens = math.min(max, tokens + (now - ts) * max / window)
+if tokens < 1 then
+  redis.call('SET', KEYS[2], '1', 'PX', block_ms)
+  redis.call('DEL', KEYS[1])
+  return {0, block_ms}
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens - 1), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(window * 1000) + 1000)
+return {1, 0}
+"""
+
+
+def _token_bucket_local(client, keys, args):
+    """
+    Versão em Python do TOKEN_BUCKET_LUA para o LocalRedis.
+    """
+    bucket_key, block_key = keys
+    max_requests, window, block_duration = float(args[0]), float(args[1]), float(args[2])
+    blocked = client.pttl(block_key)
+    if blocked > 0:
+        return [0, blocked]
+    now = time.time()
+    raw = client.get(bucket_key)
+    tokens, ts = json.loads(raw) if raw else (max_requests, now)
+    tokens = min(max_requests, tokens + (now - ts) * max_requests / window)
+    if tokens < 1:
+        client.set(block_key, "1", px=int(block_duration * 1000))
+        client.delete(bucket_key)
+        return [0, int(block_duration * 1000)]
+    client.set(bucket_key, json.dumps([tokens - 1, now]), px=int(window * 1000) + 1000)
+    return [1, 0]
+
+
+register_local_script(TOKEN_BUCKET_LUA, _token_bucket_local)
+
+_script = None
+_script_client = None
+# Cache local dos IPs bloqueados no Redis: rejeita sem ida à rede até o desbloqueio
+_blocked_cache = {}
+_blocked_cache_lock = threading.Lock()
+_last_redis_error = 0.0
+
+
+def check_shared_rate_limit(ip):
+    """
+    Token bucket compartilhado no Redis. Se o Redis estiver indisponível,
+    cai para o limite local do processo.
+    """
+    global _script, _script_client, _last_redis_error
+    now = time.monotonic()
+
+    with _blocked_cache_lock:
+        unblock_time = _blocked_cache.get(ip)
+        if unblock_time is not None:
+            if now < unblock_time:
+                return False
+            del _blocked_cache[ip]
+
+    limits = WHITELISTED_IPS.get(ip, DEFAULT_LIMITS)
+    try:
+        client = get_redis()
+        if _script is None or _script_client is not client:
+            _script, _script_client = client.register_script(TOKEN_BUCKET_LUA), client
+        allowed, blocked_ms = _script(
+            keys=[f"{REDIS_KEY_PREFIX}:bucket:{ip}", f"{REDIS_KEY_PREFIX}:blocked:{ip}"],
+            args=[limits["max_requests"], limits["window_seconds"], limits["block_duration"]]
+        )
+    except Exception as e:
+        if now - _last_redis_error > 60:
+            logging.warning(f"⚠️ Rate limit compartilhado indisponível, usando limite local: {e}")
+            _last_redis_error = now
+        return check_local_rate_limit(ip)
+
+    if not int(allowed):
+        with _blocked_cache_lock:
+            if len(_blocked_cache) > 10000:
+                for expired in [key for key, until in _blocked_cache.items() if until <= now]:
+                    del _blocked_cache[expired]
+            _blocked_cache[ip] = now + int(blocked_ms) / 1000
+        return False
+    return True
+
+
+def check_rate_limit(ip):
+    """
+    Aplica o limite no backend configurado (RATE_LIMIT_BACKEND=local|redis).
+    """
+    if RATE_LIMIT_BACKEND == "redis" and get_redis() is not None:
+        return check_shared_rate_limit(ip)
+    return check_local_rate_limit(ip)
+
+
+def rate_limit():
+    ip = request.headers.get("X-Forwarded-For", request.remote_addr)
+
+    if not check_rate_limit(ip):
+        _log_blocked_request(ip, request.path, 429)
+        return jsonify({"error": "IP bloqueado por excesso de requisições. Tente novamente mais tarde."}), 429
 
     return None
 
@@ -72,8 +236,8 @@ def _log_blocked_request(ip, endpoint, status_code):
     try:
         username = "IP Bloqueado"
         ts = datetime.utcnow()
-        log_request_to_db.delay(username, endpoint, status_code, ts.isoformat(), ip)
-        print(f"[RATE LIMIT] Log enviado para Celery: {username} {endpoint} {status_code}")
+        enqueue_request_log(username, endpoint, status_code, ts.isoformat(), ip)
+        print(f"[RATE LIMIT] Log enfileirado: {username} {endpoint} {status_code}")
     except Exception:
         import logging
         logging.exception("Erro ao logar requisição bloqueada")
@@ -0,0 +1,117 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from app.config.env import REQUEST_LOG_BATCH_SIZE, REQUEST_LOG_FLUSH_INTERVAL, REQUEST_LOG_MAX_BUFFER
+
+# Buffer em memória dos logs de requisição; um thread por processo envia lotes ao Celery
+_buffer = []
+_cond = threading.Condition()
+_flusher_pid = None
+
+_counters = {
+    "enqueued": 0,        # logs aceitos no buffer
+    "dropped": 0,         # descartados por buffer cheio
+    "backpressure": 0,    # vezes em que o buffer passou de 80% da capacidade
+    "batches_sent": 0,
+    "rows_sent": 0,
+    "publish_failures": 0,
+}
+
+
+def _publish(batch):
+    # Import tardio: celery_worker importa serviços da aplicação
+    from celery_worker import log_requests_batch_to_db
+    log_requests_batch_to_db.delay(batch)
+
+
+def _take_batch():
+    batch = _buffer[:REQUEST_LOG_BATCH_SIZE]
+    del _buffer[:REQUEST_LOG_BATCH_SIZE]
+    return batch
+
+
+def _send(batch):
+    try:
+        _publish(batch)
+        with _cond:
+            _counters["batches_sent"] += 1
+            _counters["rows_sent"] += len(batch)
+        return True
+    except Exception as e:
+        logging.warning(f"⚠️ Falha ao enviar lote de {len(batch)} logs ao Celery: {e}")
+        with _cond:
+            _counters["publish_failures"] += 1
+            # Devolve o lote ao início do buffer no limite da capacidade; o excedente é descartado
+            room = max(0, REQUEST_LOG_MAX_BUFFER - len(_buffer))
+            _buffer[:0] = batch[:room]
+            _counters["dropped"] += len(batch) - min(room, len(batch))
+        return False
+
+
+def _flusher():
+    while True:
+        with _cond:
+            deadline = time.monotonic() + REQUEST_LOG_FLUSH_INTERVAL
+            while len(_buffer) < REQUEST_LOG_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                _cond.wait(remaining)
+            batch = _take_batch()
+        if batch and not _send(batch):
+            time.sleep(REQUEST_LOG_FLUSH_INTERVAL)  # broker fora: espera antes de tentar de novo
+
+
+def _ensure_flusher():
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    with _cond:
+        if _flusher_pid == os.getpid():
+            return
+        # Após um fork, o thread do processo pai não existe aqui: descarta o buffer herdado
+        if _flusher_pid is not None:
+            _buffer.clear()
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flusher, name="request-log-flusher", daemon=True).start()
+
+
+def enqueue_request_log(username, endpoint, status_code, requested_at, ip_address):
+    """
+    Coloca o log no buffer sem bloquear a requisição. Se o buffer estiver cheio
+    o log é descartado (e contado), nunca segura a resposta.
+    """
+    _ensure_flusher()
+    with _cond:
+        if len(_buffer) >= REQUEST_LOG_MAX_BUFFER:
+            _counters["dropped"] += 1
+            return False
+        _buffer.append((username, endpoint, status_code, requested_at, ip_address))
+        _counters["enqueued"] += 1
+        if len(_buffer) >= REQUEST_LOG_MAX_BUFFER * 0.8:
+            _counters["backpressure"] += 1
+        if len(_buffer) >= REQUEST_LOG_BATCH_SIZE:
+            _cond.notify()
+    return True
+
+
+def flush_request_logs():
+    """
+    Envia tudo o que está no buffer (usado no encerramento do processo).
+    """
+    while True:
+        with _cond:
+            batch = _take_batch()
+        if not batch or not _send(batch):
+            return  # buffer vazio ou Celery indisponível: não insiste no encerramento
+
+
+def request_log_stats():
+    with _cond:
+        return {**_counters, "buffered": len(_buffer), "max_buffer": REQUEST_LOG_MAX_BUFFER,
+                "batch_size": REQUEST_LOG_BATCH_SIZE, "flush_interval": REQUEST_LOG_FLUSH_INTERVAL}
+
+
+atexit.register(flush_request_logs)
@@ -0,0 +1,5 @@
+-- Chave de ordenação usada na paginação por keyset (?pagination=keyset) dos executores.
+-- Lista de colunas separadas por vírgula, ex.: "CD_ATENDIMENTO" ou "DT_ATENDIMENTO,CD_ATENDIMENTO".
+-- A combinação das colunas deve ser única no resultado da query.
+ALTER TABLE executors
+    ADD COLUMN order_key VARCHAR(255) NULL AFTER file_path;
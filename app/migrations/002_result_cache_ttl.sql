@@ -0,0 +1,7 @@
+-- Tempo de vida (s) do cache de resultados por rota/executor de consulta.
+-- NULL = usa RESULT_CACHE_TTL; 0 = nunca cachear. Rotas DML nunca são cacheadas.
+ALTER TABLE routes
+    ADD COLUMN cache_ttl INT NULL;
+
+ALTER TABLE executors
+    ADD COLUMN cache_ttl INT NULL;
@@ -0,0 +1,11 @@
+-- Modo incremental dos jobs de integração.
+-- watermark_column: coluna do resultado da source_query usada como marca d'água
+--   (timestamp ou id crescente). NULL = job sempre lê tudo (comportamento antigo).
+-- watermark_type: 'id' (numérico) ou 'timestamp'.
+-- watermark_value: maior valor já gravado no destino; só avança após o commit.
+-- full_resync: 1 = a próxima execução ignora a marca e relê tudo (volta a 0 ao terminar).
+ALTER TABLE integration_jobs
+    ADD COLUMN watermark_column VARCHAR(128) NULL,
+    ADD COLUMN watermark_type ENUM('id', 'timestamp') NOT NULL DEFAULT 'id',
+    ADD COLUMN watermark_value VARCHAR(64) NULL,
+    ADD COLUMN full_resync TINYINT(1) NOT NULL DEFAULT 0;
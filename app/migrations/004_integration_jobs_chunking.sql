@@ -0,0 +1,7 @@
+-- Leitura/gravação em blocos dos jobs de integração.
+-- chunk_size: linhas por bloco (fetchmany + executemany). NULL = INTEGRATION_CHUNK_SIZE.
+-- commit_per_chunk: 1 = confirma cada bloco no destino (e avança a marca d'água a cada
+--   bloco); 0 = um único commit no final, como antes.
+ALTER TABLE integration_jobs
+    ADD COLUMN chunk_size INT NULL,
+    ADD COLUMN commit_per_chunk TINYINT(1) NOT NULL DEFAULT 0;
@@ -0,0 +1,11 @@
+-- Linhas recusadas pelo destino nos jobs de integração (erro de conteúdo da linha:
+-- chave duplicada, valor inválido, tamanho, etc.). O restante do bloco é gravado
+-- normalmente e o job continua ativo.
+CREATE TABLE IF NOT EXISTS integration_quarantine (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    job_id INT NOT NULL,
+    error_message TEXT NOT NULL,
+    row_data LONGTEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_integration_quarantine_job (job_id, created_at)
+);
@@ -0,0 +1,10 @@
+-- Leitura particionada e paralela da origem dos jobs de integração.
+-- partition_count: número de partições (> 1 ativa; limitado por INTEGRATION_MAX_PARTITIONS).
+--   Cada partição usa uma sessão do pool da conexão de origem.
+-- partition_strategy: 'hash' (ORA_HASH/CRC32 da coluna), 'range' (faixas entre MIN e MAX
+--   de uma coluna numérica ou de data) ou 'date' (faixas de datas).
+-- partition_column: coluna do resultado da source_query usada para dividir.
+ALTER TABLE integration_jobs
+    ADD COLUMN partition_count INT NULL,
+    ADD COLUMN partition_strategy ENUM('hash', 'range', 'date') NULL,
+    ADD COLUMN partition_column VARCHAR(128) NULL;
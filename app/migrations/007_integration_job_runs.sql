@@ -0,0 +1,23 @@
+-- Histórico das execuções dos jobs de integração: uma linha por execução, com
+-- volume processado e tempo gasto em cada fase (ms).
+CREATE TABLE IF NOT EXISTS integration_job_runs (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    job_id INT NOT NULL,
+    trigger_type VARCHAR(16) NOT NULL,          -- manual | schedule
+    status VARCHAR(16) NOT NULL,                -- running | success | failed
+    started_at DATETIME(3) NOT NULL,
+    finished_at DATETIME(3) NULL,
+    duration_ms INT NULL,
+    rows_read INT NOT NULL DEFAULT 0,
+    rows_written INT NOT NULL DEFAULT 0,
+    rows_rejected INT NOT NULL DEFAULT 0,
+    bytes_read BIGINT NOT NULL DEFAULT 0,
+    connect_ms INT NULL,
+    extract_ms INT NULL,
+    transform_ms INT NULL,
+    load_ms INT NULL,
+    partitions TEXT NULL,                       -- JSON com o progresso de cada partição
+    error_message TEXT NULL,
+    KEY idx_integration_job_runs_job (job_id, started_at),
+    KEY idx_integration_job_runs_started (started_at)
+);
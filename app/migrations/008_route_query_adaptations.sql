@@ -0,0 +1,14 @@
+-- SQL das rotas adaptado por conexão: colunas removidas após ORA-00904 (ou a
+-- query alternativa dos slugs Bluemind), reaproveitado enquanto a rota, a
+-- conexão e as colunas das tabelas usadas não mudarem.
+CREATE TABLE IF NOT EXISTS route_query_adaptations (
+    route_id INT NOT NULL,
+    connection_id INT NOT NULL,
+    route_updated_at DATETIME NULL,             -- routes.updated_at quando foi aprendida
+    schema_fingerprint CHAR(40) NOT NULL,       -- sha1 da conexão + ALL_TAB_COLUMNS das tabelas da rota
+    removed_columns TEXT NOT NULL,              -- JSON com as colunas removidas
+    adapted_query LONGTEXT NOT NULL,
+    learned_at DATETIME NOT NULL,               -- UTC
+    PRIMARY KEY (route_id, connection_id),
+    KEY idx_route_query_adaptations_connection (connection_id)
+);
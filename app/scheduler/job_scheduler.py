@@ -1,69 +1,156 @@
+import heapq
 import threading
-import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from app.config.db_config import create_db_connection_mysql
+from app.config.env import SCHEDULER_MAX_WORKERS, SCHEDULER_REFRESH_INTERVAL
 from app.services.integration_service import executar_job, get_job_by_id
 
-def job_worker(job_id, schedule_seconds):
-    logging.info(f"🚀 Thread de job #{job_id} iniciada (cada {schedule_seconds}s)")
-    while True:
-        try:
-            # Verifica se job ainda está ativo
-            conn = create_db_connection_mysql()
-            with conn.cursor(dictionary=True) as cur:
-                cur.execute("SELECT is_active, last_run FROM integration_jobs WHERE id = %s", (job_id,))
-                job_status = cur.fetchone()
+# Sinaliza ao laço do agendador que este processo deixou de ser o agendador
+_stop_event = threading.Event()
+_scheduler = None
 
-            if not job_status or job_status["is_active"] != 1:
-                logging.info(f"⏹️ Job #{job_id} desativado. Encerrando thread.")
-                break
 
-            now = datetime.utcnow()
-            last_run = job_status["last_run"] or datetime.min
-            next_run = last_run + timedelta(seconds=schedule_seconds)
-
-            if now >= next_run:
-                logging.info(f"⏱️ Executando job automático #{job_id}")
-                job_data = get_job_by_id(job_id)
-                executar_job(job_id, job_data)
-
-                # Atualiza o campo last_run
-                with create_db_connection_mysql() as conn_update:
-                    with conn_update.cursor() as cur_update:
-                        cur_update.execute("""
-                            UPDATE integration_jobs
-                            SET last_run = %s
-                            WHERE id = %s
-                        """, (now, job_id))
-                        conn_update.commit()
-
-            time.sleep(1)
-
-        except Exception as e:
-            logging.exception(f"❌ Erro ao executar job automático {job_id}: {e}")
-            time.sleep(5)
-
-def start_scheduler():
-    logging.info("🧠 Iniciando agendador de jobs com threads por job...")
-
-    try:
-        conn = create_db_connection_mysql()
+def load_scheduled_jobs():
+    """
+    Lê, numa única consulta, os jobs ativos com agendamento: {id: (intervalo, last_run)}.
+    """
+    with create_db_connection_mysql() as conn:
         with conn.cursor(dictionary=True) as cur:
             cur.execute("""
-                SELECT id, schedule_seconds
+                SELECT id, schedule_seconds, last_run
                 FROM integration_jobs
                 WHERE is_active = 1 AND schedule_seconds IS NOT NULL
             """)
-            jobs = cur.fetchall()
-
-        for job in jobs:
-            job_id = job["id"]
-            interval = job["schedule_seconds"]
+            return {
+                job["id"]: (int(job["schedule_seconds"]), job["last_run"] or datetime.min)
+                for job in cur.fetchall()
+            }
 
-            t = threading.Thread(target=job_worker, args=(job_id, interval), daemon=True)
-            t.start()
-            logging.info(f"🧵 Thread iniciada para job #{job_id} (intervalo: {interval}s)")
 
+def run_scheduled_job(job_id, started_at):
+    """
+    Executa um job agendado e grava o last_run (horário de início, como antes).
+    """
+    try:
+        logging.info(f"⏱️ Executando job automático #{job_id}")
+        job_data = get_job_by_id(job_id)
+        executar_job(job_id, job_data, trigger="schedule")
     except Exception as e:
-        logging.exception("❌ Erro ao iniciar agendador")
\ No newline at end of file
+        logging.exception(f"❌ Erro ao executar job automático {job_id}: {e}")
+    finally:
+        with create_db_connection_mysql() as conn:
+            with conn.cursor() as cur:
+                cur.execute("UPDATE integration_jobs SET last_run = %s WHERE id = %s", (started_at, job_id))
+                conn.commit()
+
+
+class JobScheduler:
+    """
+    Um único laço com fila de prioridade (heap) de próximas execuções.
+
+    A tabela integration_jobs é relida a cada `refresh_interval` segundos numa
+    única consulta: jobs novos, desativados ou com intervalo alterado entram
+    ou saem da fila sem reiniciar o processo. Jobs vencidos vão para um pool
+    limitado a `max_workers` execuções simultâneas; um job nunca roda duas
+    vezes em paralelo.
+    """
+
+    def __init__(self, stop_event, refresh_interval=SCHEDULER_REFRESH_INTERVAL, max_workers=SCHEDULER_MAX_WORKERS):
+        self.stop_event = stop_event
+        self.refresh_interval = refresh_interval
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.jobs = {}      # id -> (intervalo, próxima execução)
+        self.heap = []      # (próxima execução, id); entradas velhas são ignoradas ao sair
+        self.running = set()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()  # acorda o laço quando um job termina ou no encerramento
+
+    def _schedule(self, job_id, interval, next_run):
+        self.jobs[job_id] = (interval, next_run)
+        heapq.heappush(self.heap, (next_run, job_id))
+
+    def refresh(self):
+        active = load_scheduled_jobs()
+        with self.lock:
+            for job_id in [job_id for job_id in self.jobs if job_id not in active]:
+                logging.info(f"⏹️ Job #{job_id} desativado; removido da agenda.")
+                del self.jobs[job_id]
+
+            for job_id, (interval, last_run) in active.items():
+                if job_id in self.running:
+                    continue  # reagendado quando terminar
+                next_run = last_run + timedelta(seconds=interval) if last_run != datetime.min else datetime.min
+                if self.jobs.get(job_id) != (interval, next_run):
+                    if job_id not in self.jobs:
+                        logging.info(f"🧵 Job #{job_id} agendado (intervalo: {interval}s)")
+                    self._schedule(job_id, interval, next_run)
+
+    def _finished(self, job_id, started_at):
+        with self.lock:
+            self.running.discard(job_id)
+            if job_id in self.jobs:
+                interval = self.jobs[job_id][0]
+                self._schedule(job_id, interval, started_at + timedelta(seconds=interval))
+        self.wakeup.set()
+
+    def _dispatch_due(self, now):
+        """
+        Envia ao pool os jobs vencidos, até o limite de execuções simultâneas.
+        Retorna os segundos até a próxima execução (ou None se a fila estiver vazia).
+        """
+        with self.lock:
+            while self.heap and len(self.running) < self.max_workers:
+                next_run, job_id = self.heap[0]
+                current = self.jobs.get(job_id)
+                if current is None or current[1] != next_run or job_id in self.running:
+                    heapq.heappop(self.heap)  # entrada obsoleta
+                    continue
+                if next_run > now:
+                    return (next_run - now).total_seconds()
+                heapq.heappop(self.heap)
+                self.running.add(job_id)
+                future = self.executor.submit(run_scheduled_job, job_id, now)
+                future.add_done_callback(lambda _, job_id=job_id, started_at=now: self._finished(job_id, started_at))
+            return None
+
+    def run(self):
+        logging.info(f"🧠 Agendador de jobs iniciado (refresh a cada {self.refresh_interval}s, "
+                     f"até {self.max_workers} jobs simultâneos)")
+        next_refresh = datetime.utcnow()
+        while not self.stop_event.is_set():
+            now = datetime.utcnow()
+            if now >= next_refresh:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logging.exception(f"❌ Erro ao atualizar a agenda de jobs: {e}")
+                next_refresh = now + timedelta(seconds=self.refresh_interval)
+
+            wait = self._dispatch_due(now)
+            until_refresh = (next_refresh - now).total_seconds()
+            self.wakeup.wait(max(0.05, min(until_refresh, wait if wait is not None else until_refresh)))
+            self.wakeup.clear()
+
+        self.executor.shutdown(wait=False)
+        logging.info("⏹️ Agendador de jobs encerrado.")
+
+
+def start_scheduler():
+    global _stop_event, _scheduler
+    _stop_event = threading.Event()
+    _scheduler = JobScheduler(_stop_event)
+    threading.Thread(target=_scheduler.run, name="job-scheduler", daemon=True).start()
+    return _scheduler
+
+
+def stop_scheduler():
+    """
+    Encerra o laço do agendador (jobs em andamento terminam normalmente).
+    """
+    logging.info("⏹️ Parando agendador de jobs deste processo.")
+    _stop_event.set()
+    if _scheduler is not None:
+        _scheduler.wakeup.set()
@@ -0,0 +1,91 @@
+import logging
+import os
+import socket
+import threading
+from app.config.db_config import _open_mysql_connection
+from app.config.env import SCHEDULER_ELECTION_INTERVAL, SCHEDULER_LOCK_NAME
+from app.scheduler.job_scheduler import start_scheduler, stop_scheduler
+
+# Só um processo (entre todos os workers e hosts) é o agendador: o que detém o
+# lock nomeado do MySQL (GET_LOCK). O lock pertence à conexão, então se o
+# processo morrer ou a conexão cair, outro worker assume na próxima rodada.
+_election_pid = None
+_election_lock = threading.Lock()
+_shutdown = threading.Event()
+
+
+def _try_acquire(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT GET_LOCK(%s, 0)", (SCHEDULER_LOCK_NAME,))
+        return cur.fetchone()[0] == 1
+
+
+def _still_leader(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT IS_USED_LOCK(%s) = CONNECTION_ID()", (SCHEDULER_LOCK_NAME,))
+        return cur.fetchone()[0] == 1
+
+
+def _close(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def _election_loop():
+    identity = f"{socket.gethostname()}:{os.getpid()}"
+    conn = None
+    leader = False
+
+    while not _shutdown.is_set():
+        try:
+            if conn is None:
+                # Conexão dedicada (fora do pool): o lock vive enquanto ela viver
+                conn = _open_mysql_connection()
+                conn.autocommit = True
+
+            if leader:
+                if not _still_leader(conn):
+                    raise ConnectionError("lock do agendador perdido")
+            elif _try_acquire(conn):
+                leader = True
+                logging.info(f"👑 {identity} eleito agendador de jobs ({SCHEDULER_LOCK_NAME}).")
+                start_scheduler()
+        except Exception as e:
+            if leader:
+                logging.error(f"⚠️ {identity} deixou de ser o agendador: {e}")
+                stop_scheduler()
+                leader = False
+            else:
+                logging.warning(f"⚠️ Falha na eleição do agendador: {e}")
+            if conn is not None:
+                _close(conn)
+                conn = None
+
+        _shutdown.wait(SCHEDULER_ELECTION_INTERVAL)
+
+    if leader:
+        stop_scheduler()
+    if conn is not None:
+        _close(conn)  # libera o lock para outro processo
+
+
+def start_scheduler_election():
+    """
+    Inicia (uma vez por processo) a thread que disputa o papel de agendador.
+    """
+    global _election_pid
+    with _election_lock:
+        if _election_pid == os.getpid():
+            return
+        _election_pid = os.getpid()
+        _shutdown.clear()
+    threading.Thread(target=_election_loop, name="scheduler-election", daemon=True).start()
+
+
+def stop_scheduler_election():
+    """
+    Sai da eleição e libera o lock (usado no encerramento gracioso do worker).
+    """
+    _shutdown.set()
@@ -0,0 +1,373 @@
+import hashlib
+import json
+import logging
+import uuid
+from functools import partial
+from app.config.env import EXECUTOR_COUNT_CACHE_TTL
+from app.utils.cache import TTLCache
+from app.utils.connection_pool import acquire_target_connection
+from app.utils.keyset import build_keyset_query, encode_continuation_token, extract_key
+from app.utils.parallel import run_parallel
+from app.utils.result_cache import get_cached_result, result_cache_key, store_result
+from app.utils.streaming import failed_section, iter_cursor
+
+
+def build_executor_queries(query, db_type, limit, offset):
+    """
+    Retorna (count_query, paginated_query) para o tipo de banco, ou None se não suportado.
+    """
+    if db_type == "mysql":
+        count_query = f"SELECT COUNT(*) AS total FROM ({query}) AS subquery"
+        paginated_query = f"{query} LIMIT {limit} OFFSET {offset}"
+    elif db_type == "oracle":
+        count_query = f"""
+        SELECT COUNT(*) AS total FROM ({query}) subquery
+        """
+        paginated_query = f"""
+        SELECT * FROM (
+            SELECT a.*, ROWNUM rnum FROM ({query}) a
+            WHERE ROWNUM <= {offset + limit}
+        )
+        WHERE rnum > {offset}
+        """
+    else:
+        return None
+    return count_query, paginated_query
+
+
+# Modos de contagem aceitos em ?count= (exact é o comportamento original)
+COUNT_MODES = ("none", "cached", "estimated", "exact")
+
+# Contagens exatas já calculadas, por (executor, conexão, parâmetros)
+_count_cache = TTLCache(ttl=EXECUTOR_COUNT_CACHE_TTL, maxsize=2048)
+
+
+def _with_cursor(connection_data, timeout, work):
+    """
+    Empresta uma sessão do pool e devolve `work(conexão, cursor)`.
+    """
+    db_conn = acquire_target_connection(connection_data)
+    is_oracle = connection_data["db_type"] == "oracle"
+    if is_oracle and timeout:
+        db_conn.callTimeout = int(timeout * 1000)
+
+    db_cursor = db_conn.cursor()
+    try:
+        return work(db_conn, db_cursor)
+    finally:
+        db_cursor.close()
+        if is_oracle and timeout:
+            db_conn.callTimeout = 0
+        db_conn.close()
+
+
+def _run_on_connection(connection_data, sql, params, timeout, fetch):
+    """
+    Empresta uma sessão do pool, executa `sql` e devolve `fetch(cursor)`.
+    """
+    def work(db_conn, db_cursor):
+        db_cursor.execute(sql, params)
+        return fetch(db_cursor)
+    return _with_cursor(connection_data, timeout, work)
+
+
+def _fetch_total(cursor):
+    return cursor.fetchone()[0]
+
+
+def _estimate_total(connection_data, query, params, timeout):
+    """
+    Estima o total de linhas pelo plano de execução, sem executar a query.
+    Oracle: cardinalidade da linha 0 do EXPLAIN PLAN. MySQL: produto de
+    rows * filtered das tabelas do SELECT principal no EXPLAIN.
+    """
+    def work(db_conn, db_cursor):
+        if connection_data["db_type"] == "oracle":
+            statement_id = f"verzo_{uuid.uuid4().hex[:20]}"
+            db_cursor.execute(f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {query}")
+            try:
+                db_cursor.execute(
+                    "SELECT cardinality FROM plan_table WHERE statement_id = :sid AND id = 0",
+                    {"sid": statement_id}
+                )
+                row = db_cursor.fetchone()
+                return int(row[0]) if row and row[0] is not None else None
+            finally:
+                db_cursor.execute("DELETE FROM plan_table WHERE statement_id = :sid", {"sid": statement_id})
+                db_conn.commit()
+
+        db_cursor.execute(f"EXPLAIN {query}", params)
+        columns = [col[0].lower() for col in db_cursor.description]
+        estimate = None
+        for values in db_cursor.fetchall():
+            row = dict(zip(columns, values))
+            if str(row.get("id")) != "1" or row.get("rows") is None:
+                continue
+            factor = float(row["rows"]) * float(row.get("filtered") or 100) / 100
+            estimate = factor if estimate is None else estimate * factor
+        return int(estimate) if estimate is not None else None
+
+    return _with_cursor(connection_data, timeout, work)
+
+
+def _count_task(count_mode, cache_key, connection_data, query, count_query, params, timeout):
+    """
+    Tarefa que obtém o total de registros conforme o modo, ou None para count=none.
+    """
+    if count_mode == "none":
+        return None
+    if count_mode == "estimated":
+        return lambda: _estimate_total(connection_data, query, params, timeout)
+
+    def exact():
+        if count_mode == "cached":
+            total = _count_cache.get(cache_key)
+            if total is not None:
+                return total
+        total = _run_on_connection(connection_data, count_query, params, timeout, _fetch_total)
+        _count_cache.set(cache_key, total)
+        return total
+    return exact
+
+
+def _count_cache_key(executor_id, connection_id, param_dict):
+    digest = hashlib.sha1(json.dumps(param_dict, sort_keys=True, default=str).encode()).hexdigest()
+    return (int(executor_id), str(connection_id).strip(), digest)
+
+
+def _count_info(count_mode, outcome, limit):
+    """
+    Campos de contagem do bloco `pagination` de uma conexão.
+    """
+    info = {"count_mode": count_mode}
+    if outcome is None or outcome["status"] != "ok" or outcome["result"] is None:
+        info["total_records"] = None
+        if outcome is not None and outcome["status"] != "ok":
+            info["count_error"] = outcome["error"]
+        return info
+    total = outcome["result"]
+    info["total_records"] = total
+    info["total_pages"] = (total + limit - 1) // limit  # Arredonda para cima
+    if count_mode == "estimated":
+        info["estimated"] = True
+    return info
+
+
+def _fetch_rows(cursor):
+    columns = [col[0] for col in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def execute_executor_query(executor_id, connections, query, param_dict, page, limit, timeout, count_mode="exact",
+                           cache_policy=None):
+    """
+    Executa a contagem e a página da query em todas as conexões ao mesmo tempo.
+
+    `connections` é uma lista de (connection_id, descritor ou None). Cada conexão
+    gera duas tarefas independentes (contagem e página), cada uma com sua própria
+    sessão do pool, e todas respeitam o mesmo prazo global `timeout`. A contagem
+    segue `count_mode` (ver COUNT_MODES). Com `cache_policy`, páginas já lidas
+    com os mesmos parâmetros são reaproveitadas do cache de resultados.
+    Retorna (results, pagination) no formato do endpoint /executors/execute.
+    """
+    offset = (page - 1) * limit
+    results = {}
+    pagination = {}
+    tasks = {}
+    names = []
+    cache_keys = {}
+
+    for connection_id, connection_data in connections:
+        if not connection_data:
+            results[f"connection_{connection_id}"] = "Conexão não encontrada."
+            continue
+
+        connection_name = connection_data["name"]
+        queries = build_executor_queries(query, connection_data["db_type"], limit, offset)
+        if queries is None:
+            results[connection_name] = "Tipo de banco desconhecido."
+            continue
+
+        if cache_policy is not None and cache_policy.enabled:
+            cache_keys[connection_name] = result_cache_key(
+                "executor", executor_id, connection_id, param_dict, [page, limit, count_mode]
+            )
+            cached = get_cached_result(cache_keys[connection_name], cache_policy)
+            if cached is not None:
+                results[connection_name] = cached["rows"]
+                pagination[connection_name] = {**cached["pagination"], "cache": "hit"}
+                continue
+
+        count_query, paginated_query = queries
+        logging.info(f"🚀 Executando a query na conexão '{connection_name}' com os parâmetros: {param_dict}")
+        count_task = _count_task(count_mode, _count_cache_key(executor_id, connection_id, param_dict),
+                                 connection_data, query, count_query, param_dict, timeout)
+        if count_task:
+            tasks[(connection_name, "count")] = count_task
+        tasks[(connection_name, "page")] = lambda c=connection_data, q=paginated_query: _run_on_connection(
+            c, q, param_dict, timeout, _fetch_rows)
+        names.append(connection_name)
+
+    outcomes = run_parallel(tasks, timeout)
+
+    for connection_name in names:
+        count = outcomes.get((connection_name, "count"))
+        rows = outcomes[(connection_name, "page")]
+        timing = _timing(count, rows)
+
+        if rows["status"] != "ok":
+            logging.error(f"❌ Erro ao executar a query na conexão '{connection_name}': {rows['error']}")
+            results[connection_name] = rows["error"]
+            pagination[connection_name] = {"current_page": page, "status": rows["status"], "timing": timing}
+            continue
+
+        results[connection_name] = rows["result"]
+        pagination[connection_name] = {
+            **_count_info(count_mode, count, limit),
+            "current_page": page,
+            "timing": timing
+        }
+        if connection_name in cache_keys and "count_error" not in pagination[connection_name]:
+            store_result(cache_keys[connection_name], {
+                "rows": rows["result"],
+                "pagination": {k: v for k, v in pagination[connection_name].items() if k != "timing"}
+            }, cache_policy)
+
+    return results, pagination
+
+
+def _timing(count, page):
+    count_ms = count["elapsed_ms"] if count else 0.0
+    return {"count_ms": count_ms, "page_ms": page["elapsed_ms"], "elapsed_ms": max(count_ms, page["elapsed_ms"])}
+
+
+def execute_executor_keyset(executor_id, connections, query, param_dict, key_columns, positions, finished,
+                            limit, timeout, count_mode="exact"):
+    """
+    Paginação por keyset: cada conexão continua a partir da última chave lida
+    (`positions`, vinda do token de continuação), então a página N+1 custa o
+    mesmo que a primeira. Conexões em `finished` já chegaram ao fim e são puladas.
+    Retorna (results, pagination, next_token); next_token None = não há mais páginas.
+    """
+    results = {}
+    tasks = {}
+    names = {}
+    positions = dict(positions)
+    finished = set(finished)
+
+    for connection_id, connection_data in connections:
+        cid = str(connection_id).strip()
+        if not connection_data:
+            results[f"connection_{connection_id}"] = "Conexão não encontrada."
+            continue
+
+        connection_name = connection_data["name"]
+        if cid in finished:
+            results[connection_name] = []
+            continue
+
+        db_type = connection_data["db_type"]
+        counted = build_executor_queries(query, db_type, limit, 0)
+        seek = build_keyset_query(query, db_type, key_columns, positions.get(cid), limit)
+        if counted is None or seek is None:
+            results[connection_name] = "Tipo de banco desconhecido."
+            continue
+
+        seek_query, seek_binds = seek
+        seek_params = {**param_dict, **seek_binds}
+        count_task = _count_task(count_mode, _count_cache_key(executor_id, cid, param_dict),
+                                 connection_data, query, counted[0], param_dict, timeout)
+        if count_task:
+            tasks[(cid, "count")] = count_task
+        tasks[(cid, "page")] = lambda c=connection_data, q=seek_query, p=seek_params: _run_on_connection(
+            c, q, p, timeout, _fetch_rows)
+        names[cid] = connection_name
+
+    outcomes = run_parallel(tasks, timeout)
+
+    pagination = {}
+    for cid, connection_name in names.items():
+        count = outcomes.get((cid, "count"))
+        page = outcomes[(cid, "page")]
+        timing = _timing(count, page)
+
+        if page["status"] != "ok":
+            # A posição não avança: o mesmo token repete esta página
+            logging.error(f"❌ Erro ao executar a query na conexão '{connection_name}': {page['error']}")
+            results[connection_name] = page["error"]
+            pagination[connection_name] = {"mode": "keyset", "status": page["status"], "timing": timing}
+            continue
+
+        rows = page["result"]
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if rows:
+            try:
+                positions[cid] = extract_key(rows[-1], key_columns)
+            except ValueError as e:
+                results[connection_name] = str(e)
+                finished.add(cid)
+                continue
+        if not has_more:
+            finished.add(cid)
+
+        results[connection_name] = rows
+        pagination[connection_name] = {
+            "mode": "keyset",
+            **_count_info(count_mode, count, limit),
+            "has_more": has_more,
+            "timing": timing
+        }
+
+    pending = [cid for cid in names if cid not in finished]
+    next_token = encode_continuation_token(executor_id, positions, finished) if pending else None
+    return results, pagination, next_token
+
+
+def stream_connection_rows(connection_data, sql, params, arraysize, timeout=None):
+    """
+    Gerador para stream_sections: empresta uma sessão, produz as colunas e depois
+    as linhas via fetchmany. A sessão volta ao pool quando o gerador termina ou é
+    fechado (cliente desconectou).
+    """
+    db_conn = acquire_target_connection(connection_data)
+    is_oracle = connection_data["db_type"] == "oracle"
+    if is_oracle and timeout:
+        db_conn.callTimeout = int(timeout * 1000)
+
+    db_cursor = db_conn.cursor()
+    try:
+        db_cursor.arraysize = arraysize
+        db_cursor.execute(sql, params)
+        yield [col[0] for col in db_cursor.description]
+        yield from iter_cursor(db_cursor, arraysize)
+    finally:
+        db_cursor.close()
+        if is_oracle and timeout:
+            db_conn.callTimeout = 0
+        db_conn.close()
+
+
+def executor_stream_sections(connections, query, param_dict, arraysize, timeout, page=1, limit=None):
+    """
+    Monta as seções de streaming (uma por conexão) para stream_sections.
+    Sem `limit`, a query é transmitida inteira; com `limit`, só a página pedida.
+    """
+    sections = []
+    for connection_id, connection_data in connections:
+        if not connection_data:
+            sections.append((f"connection_{connection_id}", partial(failed_section, "Conexão não encontrada.")))
+            continue
+
+        connection_name = connection_data["name"]
+        sql = query
+        if limit:
+            queries = build_executor_queries(query, connection_data["db_type"], limit, (page - 1) * limit)
+            if queries is None:
+                sections.append((connection_name, partial(failed_section, "Tipo de banco desconhecido.")))
+                continue
+            sql = queries[1]
+
+        sections.append((connection_name, partial(
+            stream_connection_rows, connection_data, sql, param_dict, arraysize, timeout)))
+    return sections
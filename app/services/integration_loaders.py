@@ -0,0 +1,107 @@
+import mysql.connector
+
+# Erros do MySQL causados pelo conteúdo da linha (e não pelo comando ou pela conexão):
+# a linha vai para a quarentena e o restante do bloco segue
+MYSQL_ROW_ERRORS = {
+    1048,  # coluna não pode ser nula
+    1062,  # chave duplicada
+    1264,  # valor fora do intervalo
+    1265,  # dado truncado
+    1292,  # valor de data/hora inválido
+    1366,  # valor inválido para a coluna
+    1406,  # valor grande demais para a coluna
+    1451,  # linha referenciada por chave estrangeira
+    1452,  # chave estrangeira inexistente
+    3819,  # check constraint violada
+}
+
+
+class ChunkLoadError(Exception):
+    """
+    Erro que interrompe a gravação do bloco. `offset` é a posição no bloco da
+    linha que o causou, quando o carregador consegue isolá-la (senão None).
+    """
+
+    def __init__(self, error, offset=None):
+        super().__init__(str(error))
+        self.error = error
+        self.offset = offset
+
+
+def generate_oracle_statement(mode, table, columns, where_key="id"):
+    """
+    Equivalente Oracle do generate_sql_statement, com binds posicionais (:1, :2...).
+    `replace` e `upsert` viram MERGE pela `where_key`.
+    """
+    cols = ", ".join(columns)
+    binds = [f":{i}" for i in range(1, len(columns) + 1)]
+
+    if mode == "insert":
+        return f"INSERT INTO {table} ({cols}) VALUES ({', '.join(binds)})"
+    elif mode == "update":
+        set_clause = ", ".join(f"{col} = {bind}" for col, bind in zip(columns, binds))
+        return f"UPDATE {table} SET {set_clause} WHERE {where_key} = :{len(columns) + 1}"
+    elif mode in ("replace", "upsert"):
+        if where_key not in columns:
+            raise ValueError(f"Modo {mode} no Oracle exige a coluna '{where_key}' em target_columns.")
+        source = ", ".join(f"{bind} AS {col}" for col, bind in zip(columns, binds))
+        update_clause = ", ".join(f"d.{col} = s.{col}" for col in columns if col != where_key)
+        values = ", ".join(f"s.{col}" for col in columns)
+        merge = f"""MERGE INTO {table} d
+                    USING (SELECT {source} FROM dual) s
+                    ON (d.{where_key} = s.{where_key})"""
+        if update_clause:
+            merge += f"\n                    WHEN MATCHED THEN UPDATE SET {update_clause}"
+        return merge + f"\n                    WHEN NOT MATCHED THEN INSERT ({cols}) VALUES ({values})"
+    else:
+        raise ValueError("Modo de operação não suportado")
+
+
+def load_oracle_chunk(cur, sql, valores):
+    """
+    Array DML: o bloco inteiro vai numa ida ao banco e as linhas rejeitadas
+    voltam em getbatcherrors() sem interromper as demais.
+    Retorna [(posição no bloco, mensagem de erro)].
+    """
+    cur.executemany(sql, valores, batcherrors=True)
+    return [(error.offset, error.message) for error in cur.getbatcherrors()]
+
+
+def load_mysql_chunk(cur, sql, valores):
+    """
+    executemany do mysql.connector (INSERT/REPLACE viram um único INSERT com
+    várias linhas em VALUES). Se o comando falhar por causa de uma linha, o
+    bloco é dividido ao meio até isolar as linhas rejeitadas; como cada comando
+    é atômico no InnoDB, as metades válidas são gravadas normalmente.
+    Erros que não são de linha (tabela inexistente, conexão...) interrompem o
+    bloco com ChunkLoadError, indicando a linha se a divisão já a tinha isolado.
+    Retorna [(posição no bloco, mensagem de erro)].
+    """
+    rejeitadas = []
+    pendentes = [(0, valores)]
+    while pendentes:
+        inicio, parte = pendentes.pop()
+        try:
+            cur.executemany(sql, parte)
+        except mysql.connector.Error as err:
+            if err.errno not in MYSQL_ROW_ERRORS:
+                raise ChunkLoadError(err, inicio if len(parte) == 1 else None) from err
+            if len(parte) == 1:
+                rejeitadas.append((inicio, err.msg))
+                continue
+            meio = len(parte) // 2
+            pendentes.append((inicio + meio, parte[meio:]))
+            pendentes.append((inicio, parte[:meio]))
+    return sorted(rejeitadas)
+
+
+def load_chunk(db_type, cur, sql, valores):
+    """
+    Grava um bloco no destino com o carregador nativo do banco.
+    Retorna as linhas rejeitadas como [(posição no bloco, mensagem de erro)].
+    """
+    if db_type == "oracle":
+        return load_oracle_chunk(cur, sql, valores)
+    if db_type in ("mysql", "mariadb"):
+        return load_mysql_chunk(cur, sql, valores)
+    raise ValueError("❌ Tipo de banco de dados não suportado: " + db_type)
@@ -0,0 +1,133 @@
+import json
+import logging
+import math
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from app.config.db_config import create_db_connection_mysql
+
+PHASES = ("connect", "extract", "transform", "load")
+
+
+class JobRunMetrics:
+    """
+    Métricas de uma execução de job: linhas, bytes e tempo gasto em cada fase.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.utcnow()
+        self._started = time.perf_counter()
+        self.phases_ms = {phase: 0.0 for phase in PHASES}
+        self.rows_read = 0
+        self.rows_written = 0
+        self.rows_rejected = 0
+        self.bytes_read = 0
+        self.partitions = None
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases_ms[name] += (time.perf_counter() - started) * 1000
+
+    @property
+    def duration_ms(self):
+        return (time.perf_counter() - self._started) * 1000
+
+
+def estimate_bytes(valores):
+    """
+    Tamanho aproximado de um bloco: texto/binário pelo comprimento, demais valores 8 bytes.
+    """
+    total = 0
+    for row in valores:
+        for value in row:
+            total += len(value) if isinstance(value, (str, bytes)) else 8
+    return total
+
+
+def start_run(job_id, trigger, metrics):
+    """
+    Registra o início da execução. Retorna o id da linha (None se o registro falhar;
+    o histórico nunca interrompe o job).
+    """
+    try:
+        with create_db_connection_mysql() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO integration_job_runs (job_id, trigger_type, status, started_at)
+                    VALUES (%s, %s, 'running', %s)
+                """, (job_id, trigger, metrics.started_at))
+                conn.commit()
+                return cur.lastrowid
+    except Exception:
+        logging.exception(f"Erro ao registrar início da execução do job #{job_id}.")
+        return None
+
+
+def finish_run(run_id, metrics, status, error=None):
+    if run_id is None:
+        return
+    try:
+        with create_db_connection_mysql() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE integration_job_runs
+                    SET status = %s, finished_at = %s, duration_ms = %s,
+                        rows_read = %s, rows_written = %s, rows_rejected = %s, bytes_read = %s,
+                        connect_ms = %s, extract_ms = %s, transform_ms = %s, load_ms = %s,
+                        partitions = %s, error_message = %s
+                    WHERE id = %s
+                """, (
+                    status, datetime.utcnow(), round(metrics.duration_ms),
+                    metrics.rows_read, metrics.rows_written, metrics.rows_rejected, metrics.bytes_read,
+                    *(round(metrics.phases_ms[phase]) for phase in PHASES),
+                    json.dumps(metrics.partitions) if metrics.partitions else None,
+                    str(error)[:2000] if error else None,
+                    run_id
+                ))
+                conn.commit()
+    except Exception:
+        logging.exception(f"Erro ao registrar fim da execução #{run_id}.")
+
+
+def percentile(sorted_values, p):
+    """
+    Percentil por posição mais próxima (nearest-rank) de uma lista já ordenada.
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize_runs(rows):
+    """
+    Agrega execuções por job: total, falhas, p50/p95/máx da duração e médias de linhas e fases.
+    `rows` são dicionários de integration_job_runs já finalizados.
+    """
+    by_job = {}
+    for row in rows:
+        by_job.setdefault(row["job_id"], []).append(row)
+
+    summary = []
+    for job_id, runs in sorted(by_job.items()):
+        succeeded = [run for run in runs if run["status"] == "success"]
+        durations = sorted(run["duration_ms"] for run in succeeded if run["duration_ms"] is not None)
+        item = {
+            "job_id": job_id,
+            "runs": len(runs),
+            "failures": len(runs) - len(succeeded),
+            "p50_duration_ms": percentile(durations, 50),
+            "p95_duration_ms": percentile(durations, 95),
+            "max_duration_ms": durations[-1] if durations else None,
+            "avg_rows_written": round(sum(run["rows_written"] or 0 for run in succeeded) / len(succeeded)) if succeeded else None,
+            "last_started_at": max(run["started_at"] for run in runs),
+        }
+        for phase in PHASES:
+            values = [run[f"{phase}_ms"] for run in succeeded if run[f"{phase}_ms"] is not None]
+            item[f"avg_{phase}_ms"] = round(sum(values) / len(values)) if values else None
+        summary.append(item)
+    return summary
@@ -1,48 +1,49 @@
 
+import json
 import logging
-import cx_Oracle
-import mysql.connector
+from datetime import datetime
+from decimal import Decimal
 from app.utils.notify_chat_error_job import notificar_erro_chat
 from app.config.db_config import create_db_connection_mysql
-from app.utils.security import decrypt_password
+from contextlib import closing
+from app.config.env import INTEGRATION_CHUNK_SIZE, INTEGRATION_MAX_PARTITIONS
+from app.utils.connection_pool import acquire_target_connection, free_sessions
+from app.utils.connection_cache import get_connection_descriptor
+from app.services.integration_loaders import ChunkLoadError, generate_oracle_statement, load_chunk
+from app.services.integration_runs import JobRunMetrics, estimate_bytes, finish_run, start_run
+from app.services.integration_sources import PartitionedSource, SourceError, build_partition_queries, read_query
+from app.utils.keyset import parse_order_key
 
 def get_connection_by_id(conn_id):
-    conn = create_db_connection_mysql()
-    try:
-        with conn.cursor(dictionary=True) as cur:
-            cur.execute("SELECT * FROM connections WHERE id = %s", (conn_id,))
-            return cur.fetchone()
-    finally:
-        conn.close()
+    return get_connection_descriptor(conn_id)
+
+def _pool_database(conf, job=None):
+    database = conf.get("database_name")
+    if not database and isinstance(job, dict):
+        database = job.get("target_database")
+    return database
 
 def connect_to_database(conf, job=None):
+    """
+    Empresta uma sessão do pool da conexão; `close()` a devolve ao pool.
+    """
     db_type = conf["db_type"]
     host = conf["host"]
     port = conf["port"]
     user = conf["username"]
-    password = decrypt_password(conf["password"])
 
-    database = conf.get("database_name")
-    if not database and isinstance(job, dict):
-        database = job.get("target_database")
+    database = _pool_database(conf, job)
 
     logging.info(f"🔍 Conectando ao banco ({db_type}) em {host}:{port} com user={user}")
     logging.info(f"📦 Nome do banco a ser usado: {database}")
 
     if db_type == "oracle":
-        dsn = cx_Oracle.makedsn(host, port, service_name=conf["service_name"])
-        return cx_Oracle.connect(user=user, password=password, dsn=dsn, encoding="UTF-8")
+        return acquire_target_connection(conf)
 
     elif db_type in ["mysql", "mariadb"]:
         if not database:
             raise ValueError("⚠️ Conexão MySQL/MariaDB sem 'database_name' ou 'target_database'.")
-        return mysql.connector.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database
-        )
+        return acquire_target_connection(conf, database)
 
     else:
         raise ValueError("❌ Tipo de banco de dados não suportado: " + db_type)
@@ -65,6 +66,73 @@ def generate_sql_statement(mode, table, columns, where_key="id"):
     else:
         raise ValueError("Modo de operação não suportado")
 
+# Modos em que regravar uma linha já copiada não a duplica
+IDEMPOTENT_MODES = ("replace", "upsert", "update")
+
+def parse_watermark(job):
+    """
+    Último valor de marca d'água gravado para o job, no tipo da coluna (ou None).
+    """
+    raw = job.get("watermark_value")
+    if raw in (None, ""):
+        return None
+    if job.get("watermark_type") == "timestamp":
+        return datetime.fromisoformat(raw)
+    return Decimal(raw) if "." in raw else int(raw)
+
+def format_watermark(value):
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return str(value)
+
+def build_source_query(job, db_type, full_resync=False, ordered=False):
+    """
+    Monta a query de origem do job. Retorna (sql, parâmetros, coluna da marca d'água).
+
+    No modo incremental (watermark_column preenchida) a source_query é envolvida
+    para trazer só as linhas com a coluna acima da última marca gravada. Sem marca
+    ainda, ou com `full_resync`, lê tudo e a marca é recalculada no fim.
+    Marcas do tipo timestamp em modos idempotentes (replace, upsert, update) usam
+    >=: linhas gravadas depois com o mesmo instante da marca não ficam para trás,
+    e as já copiadas são apenas regravadas. Em insert o filtro continua >.
+    `ordered` ordena pela marca (necessário para checkpoints por bloco).
+    """
+    column = (job.get("watermark_column") or "").strip()
+    if not column:
+        return job["source_query"], None, None
+    columns = parse_order_key(column)
+    if len(columns) != 1:
+        raise ValueError(f"watermark_column deve ser uma única coluna: '{column}'.")
+    column = columns[0]
+
+    source = job["source_query"].strip().rstrip(";")
+    sql = f"SELECT * FROM ({source}) src"
+    order_by = f" ORDER BY src.{column}" if ordered else ""
+    watermark = None if full_resync else parse_watermark(job)
+    if watermark is None:
+        return sql + order_by, None, column
+
+    op = ">=" if job.get("watermark_type") == "timestamp" and job.get("mode") in IDEMPOTENT_MODES else ">"
+    if db_type == "oracle":
+        return f"{sql} WHERE src.{column} {op} :watermark{order_by}", {"watermark": watermark}, column
+    return f"{sql} WHERE src.{column} {op} %s{order_by}", (watermark,), column
+
+def save_watermark(job_id, value):
+    """
+    Grava a nova marca d'água (após o commit no destino) e encerra um full_resync pendente.
+    """
+    with create_db_connection_mysql() as conn:
+        with conn.cursor() as cur:
+            if value is None:
+                cur.execute("UPDATE integration_jobs SET full_resync = 0 WHERE id = %s", (job_id,))
+            else:
+                cur.execute("""
+                    UPDATE integration_jobs
+                    SET watermark_value = %s, full_resync = 0
+                    WHERE id = %s
+                """, (format_watermark(value), job_id))
+            conn.commit()
+
 def get_job_by_id(job_id):
     conn = create_db_connection_mysql()
     try:
@@ -74,8 +142,125 @@ def get_job_by_id(job_id):
     finally:
         conn.close()
 
-def executar_job(job_id, job=None):
+def build_projection(colunas_origem, colunas):
+    """
+    Posição de cada coluna pedida no resultado da origem, calculada uma vez por job.
+    Compara o nome exato e, se não achar, sem diferenciar maiúsculas (Oracle).
+    """
+    upper = [col.upper() for col in colunas_origem]
+    projecao = []
+    for col in colunas:
+        if col in colunas_origem:
+            projecao.append(colunas_origem.index(col))
+        elif col.upper() in upper:
+            projecao.append(upper.index(col.upper()))
+        else:
+            raise ValueError(f"Coluna '{col}' não está no resultado da origem.")
+    return projecao
+
+def snapshot_do_bloco(colunas_origem, linhas, bloco, offset=None, idx_chave=None):
+    """
+    Snapshot do erro crítico de gravação: a linha que falhou, quando o carregador
+    a identificou, ou um descritor do bloco (número, linhas e primeira/última chave).
+    """
+    if offset is not None:
+        return str(dict(zip(colunas_origem, linhas[offset])))
+    descritor = {"bloco": bloco, "linhas": len(linhas)}
+    if idx_chave is not None:
+        descritor["primeira_chave"] = linhas[0][idx_chave]
+        descritor["ultima_chave"] = linhas[-1][idx_chave]
+    return f"Bloco (linha com erro não identificada): {descritor}"
+
+def quarentenar_linhas(job_id, colunas_origem, rejeitadas):
+    """
+    Grava as linhas recusadas pelo destino na integration_quarantine, com o erro de cada uma.
+    `rejeitadas` é [(linha da origem, mensagem de erro)].
+    """
+    registros = [
+        (job_id, mensagem, json.dumps(dict(zip(colunas_origem, row)), default=str))
+        for row, mensagem in rejeitadas
+    ]
+    try:
+        with create_db_connection_mysql() as conn:
+            with conn.cursor() as cur:
+                cur.executemany("""
+                    INSERT INTO integration_quarantine (job_id, error_message, row_data)
+                    VALUES (%s, %s, %s)
+                """, registros)
+                conn.commit()
+    except Exception:
+        logging.exception(f"Erro ao gravar {len(registros)} linhas do job #{job_id} na quarentena.")
+
+def _maior_marca(atual, linhas, idx):
+    marca_bloco = max((row[idx] for row in linhas if row[idx] is not None), default=None)
+    if marca_bloco is not None and (atual is None or marca_bloco > atual):
+        return marca_bloco
+    return atual
+
+def _marca_concluida(linhas, idx):
+    """
+    Maior marca do bloco (lido em ordem) cujas linhas já chegaram todas: as
+    iguais à última do bloco podem continuar no próximo, então ficam de fora.
+    None se o bloco inteiro tem a mesma marca.
+    """
+    ultima = linhas[-1][idx]
+    if ultima is None:
+        # NULLs vêm no fim (Oracle): todas as marcas preenchidas já foram lidas
+        return _maior_marca(None, linhas, idx)
+    return max((row[idx] for row in linhas if row[idx] is not None and row[idx] < ultima), default=None)
+
+def _marca_de_checkpoint(job, linhas, idx, nova_marca):
+    """
+    Marca a gravar após o commit de um bloco lido em ordem. Marcas que podem se
+    repetir (timestamp) ou modos idempotentes seguram a última marca do bloco,
+    cujas linhas podem continuar no próximo; ids únicos em insert avançam até
+    a maior marca lida, para que nenhuma linha já gravada seja lida de novo.
+    """
+    if job.get("watermark_type") == "timestamp" or job.get("mode") in IDEMPOTENT_MODES:
+        return _marca_concluida(linhas, idx)
+    return nova_marca
+
+def _blocos_da_origem(job_id, fonte, metricas):
+    """
+    Repassa os blocos da origem, contando a espera como fase de extração;
+    falhas de leitura são registradas como erro crítico.
+    """
+    iterador = iter(fonte)
+    while True:
+        try:
+            with metricas.phase("extract"):
+                bloco = next(iterador, None)
+        except SourceError as e:
+            logging.error(str(e))
+            registrar_erro_critico(job_id, str(e))
+            raise
+        if bloco is None:
+            return
+        yield bloco
+
+def executar_job(job_id, job=None, full_resync=False, trigger="manual"):
+    """
+    Copia o resultado da source_query para a tabela de destino em blocos.
+
+    A origem é lida com fetchmany de `chunk_size` linhas (INTEGRATION_CHUNK_SIZE
+    por padrão) e cada bloco é gravado com o carregador nativo do destino
+    (integration_loaders), então a memória depende do tamanho do bloco e não da
+    tabela. Linhas recusadas pelo destino vão para a integration_quarantine e o
+    restante segue; só erros do comando ou da conexão interrompem e desativam o job.
+    Com `commit_per_chunk` cada bloco é confirmado (e a marca d'água avança)
+    assim que gravado; sem ele há um único commit no final.
+    Jobs com watermark_column leem só as linhas novas; `full_resync` (ou a coluna
+    full_resync do job) força a leitura completa.
+    Com `partition_count` > 1 a origem é dividida pela partition_column
+    (integration_sources) e lida em paralelo, uma sessão por partição (limitadas
+    às sessões livres do pool da origem); o destino continua com um único gravador.
+    Cada execução fica em integration_job_runs, com linhas, bytes e o tempo das
+    fases connect/extract/transform/load (`trigger`: manual ou schedule).
+    """
     conn = origem_conn = destino_conn = None
+    metricas = JobRunMetrics()
+    run_id = start_run(job_id, trigger, metricas)
+    erro = None
     try:
         logging.info(f"🔁 Executando job #{job_id}")
         if not job:
@@ -83,50 +268,144 @@ def executar_job(job_id, job=None):
         if not job:
             raise Exception(f"Job ID {job_id} não encontrado")
 
-        origem_conf = get_connection_by_id(job["source_connection_id"])
-        destino_conf = get_connection_by_id(job["destination_connection_id"])
-        origem_conn = connect_to_database(origem_conf, job)
-        destino_conn = connect_to_database(destino_conf, job)
+        with metricas.phase("connect"):
+            origem_conf = get_connection_by_id(job["source_connection_id"])
+            destino_conf = get_connection_by_id(job["destination_connection_id"])
+            origem_conn = connect_to_database(origem_conf, job)
+            destino_conn = connect_to_database(destino_conf, job)
+
+        chunk_size = max(1, int(job.get("chunk_size") or INTEGRATION_CHUNK_SIZE))
+        commit_per_chunk = bool(job.get("commit_per_chunk"))
+        full_resync = full_resync or bool(job.get("full_resync"))
+        particoes = min(int(job.get("partition_count") or 1), INTEGRATION_MAX_PARTITIONS)
+        particionado = particoes > 1 and bool(job.get("partition_column"))
+        if particionado:
+            # Cada partição segura uma sessão do pool da origem durante toda a leitura:
+            # não pede mais do que o pool tem livre (a sessão principal será devolvida),
+            # senão as excedentes esperam o timeout do pool e derrubam o job
+            database = None if origem_conf["db_type"] == "oracle" else _pool_database(origem_conf, job)
+            livres = free_sessions(origem_conf, database) + 1
+            if livres < particoes:
+                logging.warning(f"⚠️ Job #{job_id}: {particoes} partições pedidas, mas o pool da origem "
+                                f"tem {livres} sessões livres; usando {livres}.")
+                particoes = livres
+                particionado = particoes > 1
+        # Com commit por bloco a origem vem ordenada pela marca, para que cada commit seja um
+        # checkpoint válido. Partições chegam fora de ordem: a marca só avança no final.
+        checkpoint_por_bloco = commit_per_chunk and not particionado
+        source_sql, source_params, watermark_column = build_source_query(
+            job, origem_conf["db_type"], full_resync, ordered=checkpoint_por_bloco
+        )
+        if watermark_column:
+            modo = "completa" if full_resync or source_params is None else f"incremental (a partir de {job['watermark_value']})"
+            logging.info(f"💧 Job #{job_id}: leitura {modo} por {watermark_column}")
+
+        where_key = job.get("where_key", "id")
+        colunas_destino = [col.strip() for col in job["target_columns"].split(",")]
+        destino_tipo = destino_conf["db_type"]
+        if destino_tipo == "oracle":
+            sql = generate_oracle_statement(job["mode"], job["target_table"], colunas_destino, where_key)
+        else:
+            sql = generate_sql_statement(job["mode"], job["target_table"], colunas_destino, where_key)
+        colunas_lidas = colunas_destino + ([where_key] if job["mode"] == "update" else [])
 
-        # 🔸 Tenta executar a query de origem
         try:
-            with origem_conn.cursor() as cur:
-                cur.execute(job["source_query"])
-                dados = cur.fetchall()
-                colunas_origem = [desc[0] for desc in cur.description]
-        except Exception as e:
-            msg = f"Erro na origem ao executar query: {e}"
-            logging.error(msg)
-            registrar_erro_critico(job_id, msg)
+            if particionado:
+                consultas = build_partition_queries(
+                    job, origem_conf["db_type"], source_sql, source_params, origem_conn, particoes
+                )
+                # Cada partição pega a própria sessão; a sessão principal não é mais necessária
+                origem_conn.close()
+                origem_conn = None
+                logging.info(f"🧩 Job #{job_id}: origem dividida em {len(consultas)} partições "
+                             f"({job.get('partition_strategy') or 'hash'} por {job['partition_column']})")
+                fonte = PartitionedSource(job_id, consultas, lambda: connect_to_database(origem_conf, job), chunk_size)
+            else:
+                fonte = read_query(origem_conn, source_sql, source_params, chunk_size)
+        except (SourceError, ValueError) as e:
+            # 🔸 Falha ao preparar a leitura da origem
+            logging.error(str(e))
+            registrar_erro_critico(job_id, str(e))
             raise
 
-        if not dados:
+        total = blocos = total_rejeitadas = 0
+        nova_marca = None
+        projecao = idx_marca = idx_chave = None
+        with closing(fonte), destino_conn.cursor() as destino_cur:
+            for colunas_origem, linhas in _blocos_da_origem(job_id, fonte, metricas):
+                if projecao is None:
+                    try:
+                        projecao = build_projection(colunas_origem, colunas_lidas)
+                        idx_marca = build_projection(colunas_origem, [watermark_column])[0] if watermark_column else None
+                        chave = [col for col in colunas_origem if col.upper() == where_key.upper()]
+                        idx_chave = colunas_origem.index(chave[0]) if chave else None
+                    except ValueError as e:
+                        registrar_erro_critico(job_id, str(e))
+                        raise
+
+                with metricas.phase("transform"):
+                    valores = [[row[i] for i in projecao] for row in linhas]
+                    metricas.bytes_read += estimate_bytes(valores)
+                    if idx_marca is not None:
+                        nova_marca = _maior_marca(nova_marca, linhas, idx_marca)
+
+                with metricas.phase("load"):
+                    try:
+                        rejeitadas = load_chunk(destino_tipo, destino_cur, sql, valores)
+                    except Exception as err:
+                        msg = f"Erro ao gravar bloco no destino: {err}"
+                        logging.error(msg)
+                        offset = err.offset if isinstance(err, ChunkLoadError) else None
+                        registrar_erro_critico(job_id, msg, snapshot_do_bloco(
+                            colunas_origem, linhas, blocos + 1, offset, idx_chave
+                        ))
+                        raise
+
+                    if rejeitadas:
+                        logging.warning(f"⚠️ Job #{job_id}: {len(rejeitadas)} linhas recusadas pelo destino no bloco {blocos + 1}; enviadas à quarentena.")
+                        quarentenar_linhas(job_id, colunas_origem, [(linhas[i], msg) for i, msg in rejeitadas])
+                        total_rejeitadas += len(rejeitadas)
+
+                    if commit_per_chunk:
+                        destino_conn.commit()
+                        if watermark_column and checkpoint_por_bloco:
+                            marca = _marca_de_checkpoint(job, linhas, idx_marca, nova_marca)
+                            if marca is not None:
+                                save_watermark(job_id, marca)
+
+                total += len(linhas)
+                metricas.rows_read = total
+                metricas.rows_written = total - total_rejeitadas
+                metricas.rows_rejected = total_rejeitadas
+                blocos += 1
+                if not particionado:
+                    logging.info(f"📦 Job #{job_id}: bloco {blocos} com {len(linhas)} linhas (total: {total})")
+
+            with metricas.phase("load"):
+                destino_conn.commit()
+
+        if particionado:
+            metricas.partitions = fonte.progress
+            for indice, progresso in fonte.progress.items():
+                logging.info(f"🧩 Job #{job_id} partição {indice + 1}: {progresso['rows']} linhas em "
+                             f"{progresso['chunks']} blocos ({progresso['elapsed_ms']} ms)")
+
+        if watermark_column:
+            save_watermark(job_id, nova_marca)
+
+        if not total:
             logging.info("Nenhum dado retornado pela origem.")
             return "Nenhum dado retornado."
 
-        colunas_destino = [col.strip() for col in job["target_columns"].split(",")]
-        sql = generate_sql_statement(job["mode"], job["target_table"], colunas_destino, job.get("where_key", "id"))
-
-        with destino_conn.cursor() as cur:
-            for row in dados:
-                try:
-                    valores = [row[colunas_origem.index(col)] for col in colunas_destino]
-                    if job["mode"] == "update":
-                        valores.append(row[colunas_origem.index(job.get("where_key", "id"))])
-                    cur.execute(sql, valores)
-                except Exception as err:
-                    snapshot = str(dict(zip(colunas_origem, row)))
-                    msg = f"Erro ao inserir linha no destino: {err}"
-                    logging.error(msg)
-                    registrar_erro_critico(job_id, msg, snapshot)
-                    raise
-
-            destino_conn.commit()
-
-        logging.info(f"✅ {len(dados)} registros processados.")
-        return f"{len(dados)} registros processados com sucesso."
+        if total_rejeitadas:
+            logging.warning(f"✅ {total - total_rejeitadas} registros processados, {total_rejeitadas} em quarentena.")
+            return f"{total - total_rejeitadas} registros processados com sucesso, {total_rejeitadas} em quarentena."
+
+        logging.info(f"✅ {total} registros processados.")
+        return f"{total} registros processados com sucesso."
 
     except Exception as e:
+        erro = e
         logging.exception("Erro ao executar job")
         raise
 
@@ -137,6 +416,7 @@ def executar_job(job_id, job=None):
                     c.close()
             except:
                 pass
+        finish_run(run_id, metricas, "failed" if erro else "success", erro)
 
 
 from app.utils.notify_chat_error_job import notificar_erro_chat
@@ -0,0 +1,220 @@
+import logging
+import queue
+import threading
+import time
+from datetime import date
+from app.config.env import INTEGRATION_WRITER_QUEUE_SIZE
+from app.utils.keyset import parse_order_key
+
+PARTITION_STRATEGIES = ("hash", "range", "date")
+
+_DONE = object()
+
+
+class SourceError(Exception):
+    """
+    Falha ao ler a origem (query, leitura de blocos ou cálculo das partições).
+    """
+
+
+def read_chunks(cur, sql, params, chunk_size):
+    """
+    Executa a query e gera (colunas, linhas) em blocos de fetchmany.
+    """
+    try:
+        cur.arraysize = chunk_size
+        cur.execute(sql, params)
+        colunas = [desc[0] for desc in cur.description]
+    except Exception as e:
+        raise SourceError(f"Erro na origem ao executar query: {e}") from e
+
+    while True:
+        try:
+            linhas = cur.fetchmany(chunk_size)
+        except Exception as e:
+            raise SourceError(f"Erro na origem ao ler dados: {e}") from e
+        if not linhas:
+            return
+        yield colunas, linhas
+
+
+def read_query(conn, sql, params, chunk_size):
+    """
+    read_chunks num cursor próprio da conexão, fechado ao fim (ou ao fechar o gerador).
+    """
+    with conn.cursor() as cur:
+        yield from read_chunks(cur, sql, params, chunk_size)
+
+
+def _split_bounds(lo, hi, count):
+    """
+    Divide [lo, hi] em até `count` faixas contíguas. Funciona com números e datas.
+    """
+    if lo == hi:
+        return [lo, hi]
+    step = (hi - lo) / count
+    if isinstance(lo, int) and not isinstance(lo, bool):
+        step = max(1, int(step))
+    bounds = [lo]
+    for i in range(1, count):
+        point = lo + step * i
+        if point >= hi:
+            break
+        if point > bounds[-1]:
+            bounds.append(point)
+    return bounds + [hi]
+
+
+def build_partition_queries(job, db_type, base_sql, base_params, conn, count):
+    """
+    Divide a query de origem em `count` partições pela partition_column.
+    Retorna [(sql, parâmetros)], uma por partição.
+
+    - hash: ORA_HASH(coluna, count - 1) no Oracle, MOD(CRC32(coluna), count) no MySQL;
+    - range/date: MIN/MAX da coluna (número ou data) divididos em faixas iguais.
+    Linhas com a coluna nula ficam na primeira partição.
+    """
+    strategy = job.get("partition_strategy") or "hash"
+    if strategy not in PARTITION_STRATEGIES:
+        raise ValueError(f"partition_strategy inválida: '{strategy}'.")
+    columns = parse_order_key(job.get("partition_column"))
+    if len(columns) != 1:
+        raise ValueError(f"partition_column deve ser uma única coluna: '{job.get('partition_column')}'.")
+    column = f"p.{columns[0]}"
+    wrapped = f"SELECT * FROM ({base_sql}) p"
+    oracle = db_type == "oracle"
+
+    def bind(name, value, params):
+        if oracle:
+            params[name] = value
+            return f":{name}"
+        params.append(value)
+        return "%s"
+
+    def with_params():
+        if oracle:
+            return dict(base_params or {})
+        return list(base_params or ())
+
+    if strategy == "hash":
+        expr = f"ORA_HASH({column}, {count - 1})" if oracle else f"MOD(CRC32({column}), {count})"
+        conditions = []
+        for bucket in range(count):
+            params = with_params()
+            conditions.append((f"{expr} = {bind('p_bucket', bucket, params)}", params))
+    else:
+        try:
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT MIN({column}), MAX({column}) FROM ({base_sql}) p", base_params)
+                lo, hi = cur.fetchone()
+        except Exception as e:
+            raise SourceError(f"Erro na origem ao calcular partições: {e}") from e
+        if lo is None:
+            # Sem valores na coluna: uma única partição (só nulos ou origem vazia)
+            return [(base_sql, base_params)]
+        if strategy == "date" and not isinstance(lo, date):
+            raise ValueError(f"partition_strategy 'date' exige coluna de data: {columns[0]}.")
+
+        bounds = _split_bounds(lo, hi, count)
+        conditions = []
+        for i, (start, end) in enumerate(zip(bounds, bounds[1:])):
+            params = with_params()
+            op = "<=" if i == len(bounds) - 2 else "<"
+            conditions.append((
+                f"{column} >= {bind('p_start', start, params)} AND {column} {op} {bind('p_end', end, params)}",
+                params
+            ))
+
+    queries = []
+    for i, (condition, params) in enumerate(conditions):
+        if i == 0:
+            condition = f"({condition}) OR {column} IS NULL"
+        queries.append((f"{wrapped} WHERE {condition}", params if oracle else tuple(params)))
+    return queries
+
+
+class PartitionedSource:
+    """
+    Lê as partições em paralelo, cada uma numa sessão própria do pool, e
+    entrega os blocos numa fila limitada a um único gravador (quem itera).
+
+    A fila cheia segura os leitores, então a memória fica limitada a
+    (INTEGRATION_WRITER_QUEUE_SIZE + partições) blocos. `progress` guarda linhas,
+    blocos, situação e tempo de cada partição.
+    """
+
+    def __init__(self, job_id, queries, connect, chunk_size):
+        self.job_id = job_id
+        self.queries = queries
+        self.connect = connect
+        self.chunk_size = chunk_size
+        self.queue = queue.Queue(maxsize=INTEGRATION_WRITER_QUEUE_SIZE)
+        self.stop = threading.Event()
+        self.threads = []
+        self.progress = {
+            i: {"rows": 0, "chunks": 0, "status": "pending", "elapsed_ms": None}
+            for i in range(len(queries))
+        }
+
+    def _put(self, item):
+        while not self.stop.is_set():
+            try:
+                self.queue.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read(self, index, sql, params):
+        progress = self.progress[index]
+        progress["status"] = "running"
+        started = time.monotonic()
+        conn = None
+        try:
+            conn = self.connect()
+            for colunas, linhas in read_query(conn, sql, params, self.chunk_size):
+                if not self._put((colunas, linhas)):
+                    progress["status"] = "cancelled"
+                    return
+                progress["rows"] += len(linhas)
+                progress["chunks"] += 1
+                logging.info(f"📦 Job #{self.job_id} partição {index + 1}/{len(self.queries)}: "
+                             f"bloco {progress['chunks']} com {len(linhas)} linhas (total: {progress['rows']})")
+            progress["status"] = "done"
+            self._put(_DONE)
+        except Exception as e:
+            progress["status"] = "error"
+            if not isinstance(e, SourceError):
+                e = SourceError(f"Erro na origem (partição {index + 1}): {e}")
+            self._put(e)
+        finally:
+            progress["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+    def __iter__(self):
+        for index, (sql, params) in enumerate(self.queries):
+            thread = threading.Thread(target=self._read, args=(index, sql, params),
+                                      name=f"job-{self.job_id}-p{index}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+        pending = len(self.queries)
+        while pending:
+            item = self.queue.get()
+            if item is _DONE:
+                pending -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+
+    def close(self):
+        """
+        Interrompe os leitores (ex.: erro no gravador); cada um devolve a sessão
+        ao pool ao terminar o bloco em andamento.
+        """
+        self.stop.set()
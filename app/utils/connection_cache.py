@@ -0,0 +1,162 @@
+import logging
+from app.config.db_config import create_db_connection_mysql
+from app.config.env import CONNECTION_CACHE_TTL
+from app.utils.cache import TTLCache
+from app.utils.connection_pool import connection_fingerprint, make_oracle_dsn, pool_options
+from app.utils.security import decrypt_password
+from app.utils.shared_version import bump_version, current_version
+
+# Descritores já resolvidos (senha descriptografada, DSN, opções), por id
+_descriptors = TTLCache(ttl=CONNECTION_CACHE_TTL, maxsize=512)
+# Índice slug -> id, para as rotas que recebem conexões pelo slug
+_slug_index = TTLCache(ttl=CONNECTION_CACHE_TTL, maxsize=512)
+
+# Versão dos descritores no Redis, trocada a cada invalidação: os outros
+# processos, ao ver uma versão nova, descartam todos os seus descritores
+# (em até CACHE_VERSION_CHECK_INTERVAL s). Sem Redis, valem até CONNECTION_CACHE_TTL.
+VERSION_KEY = "verzo:conn:ver"
+_seen_version = None
+
+
+def _sync():
+    global _seen_version
+    version = current_version(VERSION_KEY)
+    if version != _seen_version:
+        _seen_version = version
+        _descriptors.clear()
+        _slug_index.clear()
+
+
+def resolve_connection(row):
+    """
+    Monta o descritor de uma linha da tabela connections.
+
+    O descritor mantém os campos originais (inclusive a senha criptografada,
+    usada na impressão digital do pool) e acrescenta `plain_password`, `dsn`,
+    `pool_options` e `fingerprint`. Nunca devolva um descritor em uma resposta.
+    """
+    descriptor = dict(row)
+    descriptor["db_type"] = (row.get("db_type") or "").lower()
+    descriptor["plain_password"] = decrypt_password(row["password"]) if row.get("password") else None
+    descriptor["dsn"] = None
+    if descriptor["db_type"] == "oracle" and (row.get("service_name") or row.get("sid")):
+        descriptor["dsn"] = make_oracle_dsn(row["host"], row["port"], row.get("service_name"), row.get("sid"))
+    descriptor["pool_options"] = pool_options(row)
+    descriptor["fingerprint"] = connection_fingerprint(row)
+    return descriptor
+
+
+def _store(descriptor):
+    _descriptors.set(descriptor["id"], descriptor)
+    if descriptor.get("slug"):
+        _slug_index.set(descriptor["slug"].strip().lower(), descriptor["id"])
+
+
+def get_connection_descriptor(connection_id):
+    """
+    Retorna o descritor da conexão pelo id, consultando o banco só em caso de miss.
+    """
+    _sync()
+    connection_id = int(connection_id)
+    descriptor = _descriptors.get(connection_id)
+    if descriptor is not None:
+        return descriptor
+
+    conn = create_db_connection_mysql()
+    try:
+        with conn.cursor(dictionary=True) as cur:
+            cur.execute("SELECT * FROM connections WHERE id = %s", (connection_id,))
+            row = cur.fetchone()
+    finally:
+        conn.close()
+
+    if not row:
+        return None
+    descriptor = resolve_connection(row)
+    _store(descriptor)
+    return descriptor
+
+
+def get_connection_descriptors(connection_ids):
+    """
+    Retorna {id: descritor} para vários ids, com uma única consulta para os misses.
+    """
+    _sync()
+    found = {}
+    missing = []
+    for connection_id in connection_ids:
+        connection_id = int(connection_id)
+        descriptor = _descriptors.get(connection_id)
+        if descriptor is not None:
+            found[connection_id] = descriptor
+        elif connection_id not in missing:
+            missing.append(connection_id)
+
+    if missing:
+        conn = create_db_connection_mysql()
+        try:
+            with conn.cursor(dictionary=True) as cur:
+                placeholders = ",".join(["%s"] * len(missing))
+                cur.execute(f"SELECT * FROM connections WHERE id IN ({placeholders})", tuple(missing))
+                rows = cur.fetchall()
+        finally:
+            conn.close()
+        for row in rows:
+            descriptor = resolve_connection(row)
+            _store(descriptor)
+            found[descriptor["id"]] = descriptor
+
+    return found
+
+
+def get_connection_descriptors_by_slugs(slugs):
+    """
+    Retorna {slug: descritor} para os slugs informados (slug em minúsculas).
+    """
+    _sync()
+    result = {}
+    missing = []
+    for slug in slugs:
+        key = slug.strip().lower()
+        connection_id = _slug_index.get(key)
+        descriptor = _descriptors.get(connection_id) if connection_id is not None else None
+        if descriptor is not None:
+            result[key] = descriptor
+        elif key not in missing:
+            missing.append(key)
+
+    if missing:
+        conn = create_db_connection_mysql()
+        try:
+            with conn.cursor(dictionary=True) as cur:
+                placeholders = ",".join(["%s"] * len(missing))
+                cur.execute(f"SELECT * FROM connections WHERE slug IN ({placeholders})", tuple(missing))
+                rows = cur.fetchall()
+        finally:
+            conn.close()
+        for row in rows:
+            descriptor = resolve_connection(row)
+            _store(descriptor)
+            result[descriptor["slug"].strip().lower()] = descriptor
+
+    return result
+
+
+def invalidate_connection_descriptor(connection_id=None):
+    """
+    Remove o descritor de uma conexão (ou de todas, sem argumento) neste
+    processo e, com Redis, faz os demais workers descartarem os seus.
+    """
+    global _seen_version
+    if bump_version(VERSION_KEY):
+        _seen_version = current_version(VERSION_KEY)
+    if connection_id is None:
+        _descriptors.clear()
+        _slug_index.clear()
+        logging.info("🧹 Cache de conexões limpo.")
+        return
+    connection_id = int(connection_id)
+    descriptor = _descriptors.pop(connection_id)
+    if descriptor and descriptor.get("slug"):
+        _slug_index.pop(descriptor["slug"].strip().lower())
+    logging.info(f"🧹 Conexão {connection_id} removida do cache.")
@@ -0,0 +1,274 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import cx_Oracle
+import mysql.connector
+from app.config.db_pool import ConnectionPool
+from app.config.env import TARGET_POOL_CONFIG
+from app.utils.security import decrypt_password
+
+# Registro de pools por conexão cadastrada: (connection_id, database) -> pool
+_pools = {}
+_pools_lock = threading.Lock()
+_pools_pid = os.getpid()
+
+FINGERPRINT_FIELDS = (
+    "db_type", "host", "port", "username", "password",
+    "database_name", "service_name", "sid", "extra_params"
+)
+
+
+def parse_extra_params(conf):
+    """
+    Lê o campo extra_params (JSON em texto ou dict) de uma conexão.
+    """
+    extra = conf.get("extra_params")
+    if not extra:
+        return {}
+    if isinstance(extra, dict):
+        return extra
+    try:
+        parsed = json.loads(extra)
+        return parsed if isinstance(parsed, dict) else {}
+    except (TypeError, ValueError):
+        return {}
+
+
+def connection_fingerprint(conf):
+    """
+    Hash dos campos que definem a sessão; muda sempre que a conexão é editada.
+    """
+    raw = "|".join(str(conf.get(field)) for field in FINGERPRINT_FIELDS)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def pool_options(conf):
+    """
+    Limites do pool da conexão: extra_params sobrescreve TARGET_POOL_CONFIG.
+    """
+    extra = parse_extra_params(conf)
+    options = {
+        "min": int(extra.get("pool_min", TARGET_POOL_CONFIG["min"])),
+        "max": int(extra.get("pool_max", TARGET_POOL_CONFIG["max"])),
+        "timeout": float(extra.get("pool_timeout", TARGET_POOL_CONFIG["timeout"])),
+        "idle_timeout": int(extra.get("pool_idle_timeout", TARGET_POOL_CONFIG["idle_timeout"])),
+        "max_lifetime": int(extra.get("pool_max_lifetime", TARGET_POOL_CONFIG["max_lifetime"])),
+    }
+    options["max"] = max(1, options["max"])
+    options["min"] = max(0, min(options["min"], options["max"]))
+    return options
+
+
+def make_oracle_dsn(host, port, service_name=None, sid=None):
+    if service_name:
+        return cx_Oracle.makedsn(host, port, service_name=service_name)
+    if sid:
+        return cx_Oracle.makedsn(host, port, sid=sid)
+    raise ValueError("É necessário fornecer 'service_name' ou 'sid' para conexões Oracle.")
+
+
+class OracleSessionPool:
+    """
+    cx_Oracle.SessionPool com contadores de empréstimo e espera.
+    `conn.close()` devolve a sessão ao pool.
+    """
+
+    def __init__(self, name, user, password, dsn, options):
+        self.name = name
+        self.options = options
+        self._pool = cx_Oracle.SessionPool(
+            user=user,
+            password=password,
+            dsn=dsn,
+            min=options["min"],
+            max=options["max"],
+            increment=1,
+            threaded=True,
+            getmode=cx_Oracle.SPOOL_ATTRVAL_TIMEDWAIT,
+            wait_timeout=int(options["timeout"] * 1000),
+            timeout=options["idle_timeout"],
+            max_lifetime_session=options["max_lifetime"],
+            encoding="UTF-8"
+        )
+        self._lock = threading.Lock()
+        self._acquired = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+        self._timeouts = 0
+
+    def acquire(self):
+        started = time.monotonic()
+        try:
+            conn = self._pool.acquire()
+        except cx_Oracle.DatabaseError:
+            with self._lock:
+                self._timeouts += 1
+            raise
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self._acquired += 1
+            self._wait_time += elapsed
+            self._max_wait = max(self._max_wait, elapsed)
+        return conn
+
+    def close_all(self):
+        try:
+            self._pool.close()
+        except cx_Oracle.Error as e:
+            # Ainda há sessões emprestadas; o pool é encerrado quando elas
+            # forem devolvidas e ele deixar de ser referenciado.
+            logging.warning(f"Pool '{self.name}' com sessões em uso, fechamento adiado ({e}).")
+
+    def stats(self):
+        opened = self._pool.opened
+        busy = self._pool.busy
+        with self._lock:
+            return {
+                "name": self.name,
+                "min_size": self.options["min"],
+                "max_size": self.options["max"],
+                "open": opened,
+                "idle": opened - busy,
+                "borrowed": busy,
+                "acquired_total": self._acquired,
+                "timeouts": self._timeouts,
+                "wait_time_total_ms": round(self._wait_time * 1000, 3),
+                "wait_time_max_ms": round(self._max_wait * 1000, 3),
+            }
+
+
+def _build_pool(conf, database):
+    db_type = (conf.get("db_type") or "").lower()
+    name = f"{conf.get('slug') or conf.get('name') or conf.get('id')}:{db_type}"
+    # Descritores do connection_cache já trazem senha, DSN e opções resolvidos
+    options = conf.get("pool_options") or pool_options(conf)
+    password = conf.get("plain_password") or decrypt_password(conf["password"])
+
+    if db_type == "oracle":
+        dsn = conf.get("dsn") or make_oracle_dsn(conf["host"], conf["port"], conf.get("service_name"), conf.get("sid"))
+        return OracleSessionPool(name, conf["username"], password, dsn, options)
+
+    if db_type in ("mysql", "mariadb"):
+        if not database:
+            raise ValueError("⚠️ Conexão MySQL/MariaDB sem 'database_name'.")
+
+        def connect():
+            return mysql.connector.connect(
+                host=conf["host"],
+                port=conf["port"],
+                user=conf["username"],
+                password=password,
+                database=database
+            )
+
+        return ConnectionPool(
+            name, connect,
+            pool_size=options["max"],
+            timeout=options["timeout"],
+            recycle=options["max_lifetime"],
+            ping_after=30
+        )
+
+    raise ValueError(f"❌ Tipo de banco de dados não suportado para pool: {db_type}")
+
+
+def get_target_pool(conf, database=None):
+    """
+    Retorna o pool da conexão cadastrada `conf` (linha da tabela connections),
+    criando-o na primeira chamada e recriando-o se a conexão foi editada.
+    """
+    global _pools_pid
+    if conf.get("id") is None:
+        raise ValueError("A conexão precisa do campo 'id' para usar o pool.")
+
+    database = database or conf.get("database_name")
+    key = (int(conf["id"]), database)
+    fingerprint = conf.get("fingerprint") or connection_fingerprint(conf)
+
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # Processo filho após fork: os pools do pai não servem aqui.
+            _pools.clear()
+            _pools_pid = os.getpid()
+
+        entry = _pools.get(key)
+        if entry and entry[0] == fingerprint:
+            return entry[1]
+
+    # A criação abre sessões na rede; é feita fora do lock global.
+    pool = _build_pool(conf, database)
+
+    with _pools_lock:
+        current = _pools.get(key)
+        if current and current[0] == fingerprint:
+            # Outra thread criou o mesmo pool antes; descarta o nosso.
+            stale, pool = pool, current[1]
+        else:
+            stale = current[1] if current else None
+            _pools[key] = (fingerprint, pool)
+            logging.info(f"🏊 Pool criado para a conexão {key[0]} ({pool.name}).")
+
+    if stale is not None:
+        stale.close_all()
+    return pool
+
+
+def acquire_target_connection(conf, database=None):
+    """
+    Empresta uma sessão do pool da conexão. Use `close()` para devolvê-la.
+    """
+    return get_target_pool(conf, database).acquire()
+
+
+def free_sessions(conf, database=None):
+    """
+    Sessões que ainda podem ser emprestadas do pool da conexão agora
+    (tamanho máximo menos as emprestadas, inclusive por outras requisições).
+    """
+    stats = get_target_pool(conf, database).stats()
+    return max(0, stats["max_size"] - stats["borrowed"])
+
+
+def kill_mysql_query(conf, thread_id):
+    """
+    Interrompe o comando em execução na sessão MySQL `thread_id` (KILL QUERY),
+    por uma conexão avulsa, fora do pool; a sessão em si continua aberta.
+    """
+    conn = mysql.connector.connect(
+        host=conf["host"],
+        port=conf["port"],
+        user=conf["username"],
+        password=conf.get("plain_password") or decrypt_password(conf["password"]),
+        connection_timeout=5
+    )
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"KILL QUERY {int(thread_id)}")
+        cursor.close()
+    finally:
+        conn.close()
+
+
+def invalidate_target_pool(connection_id):
+    """
+    Fecha e remove os pools de uma conexão (chamado ao editar/deletar).
+    """
+    with _pools_lock:
+        keys = [key for key in _pools if key[0] == int(connection_id)]
+        entries = [_pools.pop(key) for key in keys]
+    for _, pool in entries:
+        pool.close_all()
+    if entries:
+        logging.info(f"🧹 Pools da conexão {connection_id} descartados.")
+
+
+def target_pool_stats():
+    with _pools_lock:
+        items = list(_pools.items())
+    return [
+        dict(pool.stats(), connection_id=key[0], database=key[1])
+        for key, (_, pool) in items
+    ]
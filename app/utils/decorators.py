@@ -3,7 +3,7 @@ from flask import request, jsonify
 import jwt
 from app.config.env import SECRET_KEY
 from app.utils.helpers import check_user_permission
-from app.config.db_config import create_db_connection_mysql 
+from app.utils.permission_cache import get_user_permissions
 from flask import request, jsonify, g
 import logging
 
@@ -57,25 +57,8 @@ def permission_required(route_prefix=None):
                 return f(user_data=user_data, *args, **kwargs)
 
             try:
-                conn = create_db_connection_mysql()
-                cursor = conn.cursor(dictionary=True)
-
-                # Verificar permissões do usuário
-                query = """
-                    SELECT DISTINCT ar.route_prefix, ar.route_slug
-                    FROM user_access ua
-                    JOIN access_routes ar ON ua.access_id = ar.access_id
-                    WHERE ua.user_id = %s
-                """
-                cursor.execute(query, (user_id,))
-                permissions = cursor.fetchall()
-
-                # Verificar se o usuário possui acesso ao route_prefix ou route_slug
-                allowed_prefixes = [perm['route_prefix'] for perm in permissions if perm['route_prefix']]
-                allowed_slugs = [perm['route_slug'] for perm in permissions if perm['route_slug']]
-
-                cursor.close()
-                conn.close()
+                # Prefixos e slugs permitidos (cache por usuário, sem ida ao banco no acerto)
+                allowed_prefixes, allowed_slugs = get_user_permissions(user_id)
 
                 # Validação do route_prefix ou route_slug
                 if route_prefix and route_prefix not in allowed_prefixes:
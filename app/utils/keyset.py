@@ -0,0 +1,138 @@
+import base64
+import hashlib
+import hmac
+import json
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from app.config.env import SECRET_KEY
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_$#]*$")
+
+
+def parse_order_key(order_key):
+    """
+    Converte "COL_A, COL_B" em ["COL_A", "COL_B"], validando cada identificador.
+    """
+    columns = [col.strip() for col in (order_key or "").split(",") if col.strip()]
+    if not columns:
+        raise ValueError("Chave de ordenação vazia.")
+    for col in columns:
+        if not _IDENTIFIER.match(col):
+            raise ValueError(f"Coluna de ordenação inválida: '{col}'.")
+    return columns
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"$dec": str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "$dt" in value:
+            return datetime.fromisoformat(value["$dt"])
+        if "$d" in value:
+            return date.fromisoformat(value["$d"])
+        if "$dec" in value:
+            return Decimal(value["$dec"])
+    return value
+
+
+def _sign(payload):
+    return hmac.new(SECRET_KEY.encode(), payload, hashlib.sha256).digest()[:16]
+
+
+def encode_continuation_token(executor_id, positions, finished):
+    """
+    Gera o token opaco com a última chave lida em cada conexão.
+
+    `positions` é {connection_id: [valores da chave]} e `finished` a lista de
+    conexões que já chegaram ao fim. O token é assinado com SECRET_KEY.
+    """
+    payload = json.dumps({
+        "e": int(executor_id),
+        "k": {str(cid): [_encode_value(v) for v in key] for cid, key in positions.items()},
+        "f": sorted(str(cid) for cid in finished),
+    }, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(_sign(payload) + payload).decode().rstrip("=")
+
+
+def decode_continuation_token(token, executor_id):
+    """
+    Valida e abre o token; retorna (positions, finished). Lança ValueError se inválido.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        signature, payload = raw[:16], raw[16:]
+        if not hmac.compare_digest(signature, _sign(payload)):
+            raise ValueError
+        data = json.loads(payload)
+    except ValueError:
+        raise ValueError("Token de continuação inválido.")
+
+    if data.get("e") != int(executor_id):
+        raise ValueError("Token de continuação pertence a outro executor.")
+
+    positions = {cid: [_decode_value(v) for v in key] for cid, key in data.get("k", {}).items()}
+    return positions, set(data.get("f", []))
+
+
+def build_keyset_query(query, db_type, key_columns, last_key, limit):
+    """
+    Monta a query da próxima página a partir da última chave lida.
+
+    Em vez de descartar as linhas anteriores (OFFSET/ROWNUM), filtra pela chave:
+    (k1 > :v1) OR (k1 = :v1 AND k2 > :v2) ... e ordena por ela. Busca `limit + 1`
+    linhas para saber se há próxima página. Retorna (sql, binds): no Oracle os
+    binds seguem o formato ":nome" dos parâmetros do executor; no MySQL, que só
+    substitui %(nome)s, usam esse formato e chaves sem os dois-pontos.
+    """
+    if db_type == "mysql":
+        placeholder, bind_key = "%(seek_{})s", "seek_{}"
+    else:
+        placeholder, bind_key = ":seek_{}", ":seek_{}"
+
+    binds = {}
+    where = ""
+    if last_key is not None:
+        clauses = []
+        for i in range(len(key_columns)):
+            parts = [f"q.{key_columns[j]} = {placeholder.format(j)}" for j in range(i)]
+            parts.append(f"q.{key_columns[i]} > {placeholder.format(i)}")
+            clauses.append("(" + " AND ".join(parts) + ")")
+        where = "WHERE " + " OR ".join(clauses)
+        binds = {bind_key.format(i): value for i, value in enumerate(last_key)}
+
+    order_by = ", ".join(f"q.{col}" for col in key_columns)
+
+    if db_type == "mysql":
+        sql = f"SELECT q.* FROM ({query}) AS q {where} ORDER BY {order_by} LIMIT {limit + 1}"
+    elif db_type == "oracle":
+        sql = f"""
+        SELECT * FROM (
+            SELECT q.* FROM ({query}) q
+            {where}
+            ORDER BY {order_by}
+        )
+        WHERE ROWNUM <= {limit + 1}
+        """
+    else:
+        return None
+    return sql, binds
+
+
+def extract_key(row, key_columns):
+    """
+    Lê os valores da chave em uma linha (dict), sem diferenciar maiúsculas.
+    """
+    lookup = {str(name).lower(): value for name, value in row.items()}
+    try:
+        return [lookup[col.lower()] for col in key_columns]
+    except KeyError as e:
+        raise ValueError(f"Coluna de ordenação {e} não está no resultado da query.")
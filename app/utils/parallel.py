@@ -0,0 +1,67 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from app.config.env import FANOUT_MAX_WORKERS
+
+# Pool de threads compartilhado pelas execuções em várias conexões (um por processo)
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_fanout_executor():
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=FANOUT_MAX_WORKERS, thread_name_prefix="fanout")
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def run_parallel(tasks, timeout):
+    """
+    Executa as tarefas em paralelo no pool compartilhado.
+
+    `tasks` é um dict {chave: callable} ou {chave: (callable, timeout)}.
+    Retorna {chave: {"status": "ok"|"error"|"timeout", "result", "error", "elapsed_ms"}}
+    na mesma ordem das chaves. Uma tarefa que estoura o tempo é reportada
+    como "timeout" sem bloquear as demais (a thread termina em segundo plano).
+    """
+    executor = get_fanout_executor()
+    started = time.monotonic()
+    submitted = {}
+
+    for key, task in tasks.items():
+        func, task_timeout = task if isinstance(task, tuple) else (task, timeout)
+        timing = {}
+
+        def run(func=func, timing=timing):
+            timing["start"] = time.monotonic()
+            try:
+                return func()
+            finally:
+                timing["end"] = time.monotonic()
+
+        submitted[key] = (executor.submit(run), started + task_timeout, timing)
+
+    outcomes = {}
+    for key, (future, deadline, timing) in submitted.items():
+        outcome = {"status": "ok", "result": None, "error": None}
+        try:
+            outcome["result"] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            future.cancel()  # Só tem efeito se ainda estiver na fila
+            outcome["status"] = "timeout"
+            outcome["error"] = f"Tempo limite de {round(deadline - started, 3)}s excedido."
+            logging.warning(f"⏱️ Tarefa '{key}' excedeu o tempo limite.")
+        except Exception as e:
+            outcome["status"] = "error"
+            outcome["error"] = str(e)
+
+        end = timing.get("end", time.monotonic())
+        outcome["elapsed_ms"] = round((end - timing.get("start", started)) * 1000, 3)
+        outcomes[key] = outcome
+
+    return outcomes
@@ -0,0 +1,71 @@
+import logging
+from app.config.db_config import create_db_connection_mysql
+from app.config.env import PERMISSION_CACHE_TTL
+from app.utils.cache import TTLCache
+from app.utils.shared_version import bump_version, current_version
+
+# Permissões já carregadas por usuário: user_id -> (versão, (prefixos, slugs))
+_permissions = TTLCache(ttl=PERMISSION_CACHE_TTL, maxsize=4096)
+
+# Versão das permissões de cada usuário no Redis, trocada a cada invalidação:
+# os outros processos comparam com a versão guardada e recarregam em até
+# CACHE_VERSION_CHECK_INTERVAL segundos. Sem Redis, a invalidação vale só
+# para o processo atual e os demais enxergam a mudança em até
+# PERMISSION_CACHE_TTL segundos.
+VERSION_KEY = "verzo:perm:ver:{}"
+
+
+def get_user_permissions(user_id):
+    """
+    Retorna (prefixos, slugs) permitidos ao usuário como frozensets,
+    consultando user_access/access_routes só em caso de miss ou de versão nova.
+    """
+    user_id = int(user_id)
+    version = current_version(VERSION_KEY.format(user_id))
+    cached = _permissions.get(user_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    conn = create_db_connection_mysql()
+    try:
+        with conn.cursor(dictionary=True) as cursor:
+            cursor.execute("""
+                SELECT DISTINCT ar.route_prefix, ar.route_slug
+                FROM user_access ua
+                JOIN access_routes ar ON ua.access_id = ar.access_id
+                WHERE ua.user_id = %s
+            """, (user_id,))
+            permissions = cursor.fetchall()
+    finally:
+        conn.close()
+
+    allowed = (
+        frozenset(perm['route_prefix'] for perm in permissions if perm['route_prefix']),
+        frozenset(perm['route_slug'] for perm in permissions if perm['route_slug']),
+    )
+    # Guardado com a versão lida antes da consulta: uma invalidação no meio força nova leitura
+    _permissions.set(user_id, (version, allowed))
+    return allowed
+
+
+def invalidate_user_permissions(*user_ids):
+    """
+    Descarta as permissões em cache dos usuários informados, neste processo
+    e, com Redis, em todos os workers (trocando a versão de cada usuário).
+    """
+    for user_id in user_ids:
+        _permissions.pop(int(user_id))
+        # Expira depois do cache local: uma versão ausente também difere da guardada
+        bump_version(VERSION_KEY.format(int(user_id)), ex=PERMISSION_CACHE_TTL * 2 or None)
+
+    if user_ids:
+        logging.info(f"🧹 Permissões em cache descartadas para os usuários: {', '.join(map(str, user_ids))}")
+
+
+def invalidate_access_permissions(cursor, access_id):
+    """
+    Descarta as permissões dos usuários que têm o access informado
+    (usa o cursor, sem dictionary, da transação que está alterando o access).
+    """
+    cursor.execute("SELECT DISTINCT user_id FROM user_access WHERE access_id = %s", (access_id,))
+    invalidate_user_permissions(*[row[0] for row in cursor.fetchall()])
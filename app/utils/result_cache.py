@@ -0,0 +1,208 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, request
+from app.config.env import RESULT_CACHE_MAX_BYTES, RESULT_CACHE_TTL
+from app.config.redis_config import get_redis
+
+KEY_PREFIX = "verzo:result"
+
+# Só consultas podem ter o resultado reaproveitado; DML nunca passa pelo cache
+READ_ONLY_STATEMENTS = ("SELECT", "WITH")
+
+
+def is_read_only(query):
+    words = (query or "").strip().split(None, 1)
+    return bool(words) and words[0].upper().lstrip("(") in READ_ONLY_STATEMENTS
+
+
+class ByteBudgetLRU:
+    """
+    Cache local (por processo) limitado pelo total de bytes dos valores: os
+    menos usados recentemente saem primeiro até caber no orçamento.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # chave -> (expira_em, bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.time():
+                self._remove(key)
+                return None
+            self._data.move_to_end(key)
+            return item
+
+    def set(self, key, expires_at, payload):
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (expires_at, payload)
+            self._bytes += len(payload)
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def pop_prefix(self, prefix):
+        with self._lock:
+            keys = [key for key in self._data if key.startswith(prefix)]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def _remove(self, key):
+        _, payload = self._data.pop(key)
+        self._bytes -= len(payload)
+
+    def stats(self):
+        with self._lock:
+            return {"items": len(self._data), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                    "evictions": self.evictions}
+
+
+_local = ByteBudgetLRU(RESULT_CACHE_MAX_BYTES)
+_counters = {"hits": 0, "local_hits": 0, "redis_hits": 0, "misses": 0, "stores": 0, "bypasses": 0}
+_counters_lock = threading.Lock()
+
+
+def _count(name):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+class CachePolicy:
+    """
+    Como o cache deve ser usado nesta requisição: tempo de vida e se pode ler/gravar.
+    """
+
+    def __init__(self, ttl, read=True, write=True):
+        self.ttl = ttl
+        self.read = read and bool(ttl)
+        self.write = write and bool(ttl)
+
+    @property
+    def enabled(self):
+        return self.read or self.write
+
+
+def request_cache_policy(ttl=None):
+    """
+    Política do cache para a requisição atual.
+
+    `ttl` vem da rota/executor (None = RESULT_CACHE_TTL, 0 = sem cache).
+    Cabeçalhos: `Cache-Control: no-cache` ou `X-Cache-Bypass: 1` ignoram o valor
+    guardado e gravam o novo; `Cache-Control: no-store` não lê nem grava.
+    """
+    ttl = RESULT_CACHE_TTL if ttl is None else int(ttl)
+    cache_control = (request.headers.get("Cache-Control") or "").lower()
+    if "no-store" in cache_control:
+        _count("bypasses")
+        return CachePolicy(ttl, read=False, write=False)
+    if "no-cache" in cache_control or request.headers.get("X-Cache-Bypass", "").lower() in ("1", "true"):
+        _count("bypasses")
+        return CachePolicy(ttl, read=False)
+    return CachePolicy(ttl)
+
+
+def result_cache_key(kind, ident, connection, params, extra=None):
+    """
+    Chave do resultado: (rota ou executor, conexão, parâmetros normalizados, página).
+    Parâmetros são comparados sem diferenciar maiúsculas no nome.
+    """
+    normalized = {str(k).lower().lstrip(":"): v for k, v in (params or {}).items()}
+    digest = hashlib.sha1(
+        json.dumps([normalized, extra], sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"{KEY_PREFIX}:{kind}:{ident}:{connection}:{digest}"
+
+
+def get_cached_result(key, policy):
+    """
+    Busca o resultado no cache local e depois no Redis. Retorna None em caso de miss.
+    """
+    if not policy.read:
+        return None
+
+    item = _local.get(key)
+    if item is not None:
+        _count("hits")
+        _count("local_hits")
+        return json.loads(item[1])
+
+    redis_client = get_redis()
+    if redis_client is not None:
+        try:
+            payload = redis_client.get(key)
+        except Exception as e:
+            logging.warning(f"⚠️ Redis indisponível para leitura do cache: {e}")
+            payload = None
+        if payload is not None:
+            envelope = json.loads(payload)
+            if envelope["exp"] > time.time():
+                # Traz para o cache local com o tempo de vida restante
+                value = json.dumps(envelope["v"]).encode()
+                _local.set(key, envelope["exp"], value)
+                _count("hits")
+                _count("redis_hits")
+                return envelope["v"]
+
+    _count("misses")
+    return None
+
+
+def store_result(key, value, policy):
+    """
+    Grava o resultado nas duas camadas, serializado como na resposta JSON.
+    """
+    if not policy.write:
+        return
+    value = json.loads(current_app.json.dumps(value))
+    expires_at = time.time() + policy.ttl
+    _local.set(key, expires_at, json.dumps(value).encode())
+    _count("stores")
+
+    redis_client = get_redis()
+    if redis_client is not None:
+        try:
+            redis_client.set(key, json.dumps({"exp": expires_at, "v": value}), ex=int(policy.ttl))
+        except Exception as e:
+            logging.warning(f"⚠️ Redis indisponível para gravação do cache: {e}")
+
+
+def invalidate_results(kind, ident=None):
+    """
+    Remove os resultados de uma rota/executor (ou de todos do tipo, sem `ident`).
+    """
+    prefix = f"{KEY_PREFIX}:{kind}:" + (f"{ident}:" if ident is not None else "")
+    removed = _local.pop_prefix(prefix)
+
+    redis_client = get_redis()
+    if redis_client is not None:
+        try:
+            keys = list(redis_client.scan_iter(match=f"{prefix}*", count=500))
+            if keys:
+                removed += redis_client.delete(*keys)
+        except Exception as e:
+            logging.warning(f"⚠️ Redis indisponível para invalidação do cache: {e}")
+
+    logging.info(f"🧹 Cache de resultados invalidado: {prefix}* ({removed} itens)")
+    return removed
+
+
+def result_cache_stats():
+    with _counters_lock:
+        counters = dict(_counters)
+    return {**counters, "local": _local.stats(), "redis": get_redis() is not None}
@@ -0,0 +1,269 @@
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime, timedelta
+from app.config.db_config import create_db_connection_mysql
+from app.config.env import ROUTE_ADAPTATION_TTL
+from app.utils.cache import TTLCache
+from app.utils.connection_pool import acquire_target_connection, connection_fingerprint
+
+# Adaptações lidas do banco, por (route_id, connection_id); _NONE = sem adaptação.
+# Outros processos enxergam adaptações novas ou apagadas em até LOCAL_TTL segundos.
+LOCAL_TTL = 60
+_local = TTLCache(ttl=LOCAL_TTL, maxsize=4096)
+_NONE = object()
+# Impressão digital do dicionário por (connection_id, fingerprint da conexão, tabelas):
+# uma coluna criada ou removida invalida a adaptação em até LOCAL_TTL segundos
+_fingerprints = TTLCache(ttl=LOCAL_TTL, maxsize=4096)
+
+_STRING_OR_COMMENT = re.compile(r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/", re.DOTALL)
+_NAME = r'"?[A-Za-z][\w$#]*"?(?:\s*\.\s*"?[A-Za-z][\w$#]*"?)?'
+_TABLE_AFTER_KEYWORD = re.compile(rf"\b(?:JOIN|INTO|UPDATE|USING)\s+({_NAME})", re.IGNORECASE)
+# Lista do FROM até a próxima cláusula (subconsultas são lidas pelo próprio FROM)
+_FROM_LIST = re.compile(
+    r"\bFROM\s+(.*?)(?=\b(?:WHERE|GROUP|ORDER|HAVING|CONNECT|START|UNION|MINUS|INTERSECT|"
+    r"JOIN|INNER|LEFT|RIGHT|FULL|CROSS|FETCH|FOR)\b|[();]|$)",
+    re.IGNORECASE | re.DOTALL
+)
+_LEADING_NAME = re.compile(rf"\s*({_NAME})")
+# Palavras que os padrões acima capturam mas não são tabelas (UPDATE SET, FOR UPDATE OF)
+_NOT_TABLES = {"SET", "OF", "DUAL"}
+
+
+class RouteAdaptation:
+    """
+    SQL da rota já sem as colunas que não existem no schema de uma conexão
+    (aprendido com ORA-00904), válido para uma versão da rota, da conexão
+    e das colunas das tabelas que ela usa.
+    """
+
+    __slots__ = ("route_id", "connection_id", "route_updated_at", "schema_fingerprint",
+                 "removed_columns", "adapted_query", "learned_at")
+
+    def __init__(self, row):
+        for field in self.__slots__:
+            setattr(self, field, row[field])
+        if isinstance(self.removed_columns, str):
+            self.removed_columns = json.loads(self.removed_columns)
+
+    def is_valid(self, route_updated_at, fingerprint):
+        if self.route_updated_at != route_updated_at or self.schema_fingerprint != fingerprint:
+            return False
+        # Depois de ROUTE_ADAPTATION_TTL a query original volta a ser tentada uma vez
+        return not ROUTE_ADAPTATION_TTL or self.learned_at + timedelta(seconds=ROUTE_ADAPTATION_TTL) > datetime.utcnow()
+
+
+def referenced_tables(sql):
+    """
+    Tabelas citadas no SQL da rota (FROM, JOIN, INTO, UPDATE, MERGE ... USING),
+    como (OWNER ou None, TABELA). Pode incluir nomes que não são tabelas
+    (ex.: o alvo de um EXTRACT(... FROM coluna)), que só não aparecem no dicionário.
+    """
+    sql = _STRING_OR_COMMENT.sub(" ", sql or "")
+    names = _TABLE_AFTER_KEYWORD.findall(sql)
+    for table_list in _FROM_LIST.findall(sql):
+        for item in table_list.split(","):
+            match = _LEADING_NAME.match(item)
+            if match:
+                names.append(match.group(1))
+
+    tables = set()
+    for name in names:
+        parts = re.sub(r'[\s"]', "", name).upper().split(".")
+        if len(parts) == 1 and parts[0] in _NOT_TABLES:
+            continue
+        tables.add((parts[0], parts[1]) if len(parts) == 2 else (None, parts[0]))
+    return sorted(tables, key=lambda table: (table[0] or "", table[1]))
+
+
+def _dictionary_columns(connection, tables):
+    """
+    (owner, tabela, coluna) de ALL_TAB_COLUMNS para as tabelas informadas;
+    sem owner, vale a tabela de qualquer schema visível.
+    """
+    conditions, params = [], {}
+    for i, (owner, table) in enumerate(tables):
+        params[f"t{i}"] = table
+        if owner:
+            params[f"o{i}"] = owner
+            conditions.append(f"(owner = :o{i} AND table_name = :t{i})")
+        else:
+            conditions.append(f"table_name = :t{i}")
+
+    db_conn = acquire_target_connection(connection)
+    if not db_conn:
+        raise ConnectionError(f"Falha ao conectar com {connection['slug']}.")
+    try:
+        db_cursor = db_conn.cursor()
+        try:
+            db_cursor.execute(f"""
+                SELECT owner, table_name, column_name
+                FROM all_tab_columns
+                WHERE {' OR '.join(conditions)}
+                ORDER BY owner, table_name, column_name
+            """, params)
+            return db_cursor.fetchall()
+        finally:
+            db_cursor.close()
+    finally:
+        db_conn.close()
+
+
+def schema_fingerprint(connection, route_query):
+    """
+    Hash da conexão e das colunas (ALL_TAB_COLUMNS) das tabelas que a rota usa:
+    muda quando a conexão é editada ou quando uma dessas tabelas ganha ou perde
+    colunas. Fora do Oracle, só a conexão. None se o dicionário não responder.
+    """
+    base = connection_fingerprint(connection)
+    if connection["db_type"] != "oracle":
+        return base
+    tables = referenced_tables(route_query)
+    if not tables:
+        return base
+
+    key = (connection["id"], base, tuple(tables))
+    fingerprint = _fingerprints.get(key)
+    if fingerprint is None:
+        try:
+            rows = _dictionary_columns(connection, tables)
+        except Exception:
+            logging.exception("Erro ao consultar o dicionário para a adaptação de rota")
+            return None
+        digest = hashlib.sha1(base.encode("utf-8"))
+        for row in rows:
+            digest.update(("|" + ".".join(row)).encode("utf-8"))
+        fingerprint = digest.hexdigest()
+        _fingerprints.set(key, fingerprint)
+    return fingerprint
+
+
+def get_adaptation(route_id, route_updated_at, connection, route_query):
+    """
+    Adaptação aprendida para a rota nesta conexão, ou None se não houver uma
+    válida (rota editada, conexão editada ou colunas das tabelas alteradas).
+    """
+    key = (route_id, connection["id"])
+    cached = _local.get(key)
+    if cached is None:
+        try:
+            conn = create_db_connection_mysql()
+            try:
+                with conn.cursor(dictionary=True) as cur:
+                    cur.execute("""
+                        SELECT route_id, connection_id, route_updated_at, schema_fingerprint,
+                               removed_columns, adapted_query, learned_at
+                        FROM route_query_adaptations
+                        WHERE route_id = %s AND connection_id = %s
+                    """, key)
+                    row = cur.fetchone()
+            finally:
+                conn.close()
+        except Exception:
+            logging.exception("Erro ao buscar adaptação de rota")
+            return None
+        cached = RouteAdaptation(row) if row else _NONE
+        _local.set(key, cached)
+
+    if cached is _NONE:
+        return None
+    fingerprint = schema_fingerprint(connection, route_query)
+    if fingerprint is None or not cached.is_valid(route_updated_at, fingerprint):
+        return None
+    return cached
+
+
+def save_adaptation(route_id, route_updated_at, connection, route_query, removed_columns, adapted_query):
+    """
+    Grava (ou substitui) o SQL que funcionou após remover `removed_columns`.
+    Sem a impressão digital do schema, nada é gravado.
+    """
+    fingerprint = schema_fingerprint(connection, route_query)
+    if fingerprint is None:
+        return
+    row = {
+        "route_id": route_id,
+        "connection_id": connection["id"],
+        "route_updated_at": route_updated_at,
+        "schema_fingerprint": fingerprint,
+        "removed_columns": list(removed_columns),
+        "adapted_query": adapted_query,
+        "learned_at": datetime.utcnow().replace(microsecond=0),
+    }
+    try:
+        conn = create_db_connection_mysql()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    REPLACE INTO route_query_adaptations
+                        (route_id, connection_id, route_updated_at, schema_fingerprint,
+                         removed_columns, adapted_query, learned_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """, (row["route_id"], row["connection_id"], row["route_updated_at"], row["schema_fingerprint"],
+                      json.dumps(row["removed_columns"]), row["adapted_query"], row["learned_at"]))
+            conn.commit()
+        finally:
+            conn.close()
+    except Exception:
+        logging.exception("Erro ao gravar adaptação de rota")
+        return
+    _local.set((route_id, connection["id"]), RouteAdaptation(row))
+    logging.warning(f"📚 Rota #{route_id} adaptada para a conexão #{connection['id']}: "
+                    f"sem {', '.join(removed_columns)}")
+
+
+def list_adaptations(route_id=None):
+    query = """
+        SELECT a.route_id, r.slug AS route_slug, a.connection_id, c.slug AS connection_slug,
+               a.removed_columns, a.learned_at, a.route_updated_at,
+               a.route_updated_at <=> r.updated_at AS route_unchanged, a.adapted_query
+        FROM route_query_adaptations a
+        LEFT JOIN routes r ON r.id = a.route_id
+        LEFT JOIN connections c ON c.id = a.connection_id
+    """
+    params = ()
+    if route_id is not None:
+        query += " WHERE a.route_id = %s"
+        params = (route_id,)
+    query += " ORDER BY a.route_id, a.connection_id"
+
+    conn = create_db_connection_mysql()
+    try:
+        with conn.cursor(dictionary=True) as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+    for row in rows:
+        row["removed_columns"] = json.loads(row["removed_columns"])
+        row["route_unchanged"] = bool(row["route_unchanged"])
+    return rows
+
+
+def clear_adaptations(route_id=None, connection_id=None):
+    """
+    Apaga adaptações (todas, de uma rota, de uma conexão ou do par). Retorna quantas.
+    """
+    conditions, params = [], []
+    if route_id is not None:
+        conditions.append("route_id = %s")
+        params.append(route_id)
+    if connection_id is not None:
+        conditions.append("connection_id = %s")
+        params.append(connection_id)
+    query = "DELETE FROM route_query_adaptations"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+
+    conn = create_db_connection_mysql()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(query, tuple(params))
+            removed = cur.rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    _local.pop_where(lambda key: (route_id is None or key[0] == route_id)
+                     and (connection_id is None or key[1] == connection_id))
+    return removed
@@ -0,0 +1,107 @@
+import re
+from app.utils.cache import TTLCache
+from app.utils.result_cache import is_read_only
+
+_LEGACY_PARAM = re.compile(r"@(\w+)")
+_BIND = re.compile(r":(\w+)")
+_SET_CLAUSE = re.compile(r"SET\s+(.*?)\s+WHERE", re.IGNORECASE | re.DOTALL)
+_ASSIGNMENT = re.compile(r"(\w+)\s*=\s*(TO_DATE\s*\(:\w+[^)]*\)|:\w+)")
+
+# Templates compilados por (route_id, updated_at, variante); sem expiração, só limite de itens
+_templates = TTLCache(ttl=0, maxsize=2048)
+
+
+def _unique_lower(names):
+    return list(dict.fromkeys(name.lower() for name in names))
+
+
+class RouteTemplate:
+    """
+    SQL de uma rota analisado uma única vez: parâmetros @nome já convertidos
+    para :nome, nomes dos binds em ordem, tipo do comando e, para UPDATE, as
+    atribuições do SET. Por requisição resta só `bind(params)`.
+    """
+
+    __slots__ = ("source", "sql", "kind", "read_only", "bind_names",
+                 "set_prefix", "set_suffix", "assignments", "outer_bind_names")
+
+    def __init__(self, source):
+        self.source = source
+        self.sql = _LEGACY_PARAM.sub(r":\1", source)
+        words = self.sql.strip().split(None, 1)
+        self.kind = words[0].upper() if words else ""
+        self.read_only = is_read_only(self.sql)
+        self.bind_names = _unique_lower(_BIND.findall(self.sql))
+
+        self.set_prefix = self.set_suffix = None
+        self.assignments = []
+        self.outer_bind_names = []
+        if self.kind == "UPDATE":
+            match = _SET_CLAUSE.search(self.sql)
+            if match:
+                self.set_prefix = self.sql[:match.start()]
+                self.set_suffix = self.sql[match.end():]
+                # (coluna, expressão, parâmetro): atribuições do SET que dependem de um bind
+                for column, expression in _ASSIGNMENT.findall(match.group(1)):
+                    param = _BIND.search(expression)
+                    if param:
+                        self.assignments.append((column, expression, param.group(1).lower()))
+                self.outer_bind_names = _unique_lower(
+                    _BIND.findall(self.set_prefix) + _BIND.findall(self.set_suffix)
+                )
+
+    def bind(self, params):
+        """
+        Retorna (sql, parâmetros) para os valores informados (chaves em minúsculas).
+
+        Em UPDATE, exige `primary_key` e mantém no SET só as colunas com valor
+        (None, "" e "null" ficam de fora); os binds do WHERE são sempre enviados.
+        """
+        if self.kind != "UPDATE":
+            return self.sql, {name: params.get(name) for name in self.bind_names}
+
+        # 🔒 Validação obrigatória do campo primary_key
+        primary_key = params.get("primary_key")
+        if primary_key in [None, "", "null", "none"]:
+            raise ValueError("❌ Parâmetro obrigatório 'primary_key' não foi informado ou está vazio.")
+
+        if self.set_prefix is None:
+            return self.sql, params
+
+        kept_assignments = []
+        kept_params = {}
+        for column, expression, param in self.assignments:
+            value = params.get(param)
+            if value not in [None, "", "null"]:
+                kept_assignments.append(f"{column} = {expression}")
+                kept_params[param] = value
+
+        # Mantém parâmetros do WHERE mesmo se não estiverem no SET
+        for param in self.outer_bind_names:
+            if param not in kept_params:
+                kept_params[param] = params.get(param)
+
+        sql = f"{self.set_prefix}SET {', '.join(kept_assignments)} WHERE{self.set_suffix}"
+        return sql, kept_params
+
+
+def get_route_template(route_id, updated_at, source, variant=None):
+    """
+    Template da rota, compilado na primeira execução após cada edição.
+    O texto do SQL também é conferido, para edições no mesmo segundo de updated_at.
+    `variant` separa versões adaptadas do SQL (ex.: o id da conexão).
+    """
+    key = (route_id, updated_at, variant)
+    template = _templates.get(key)
+    if template is None or template.source != source:
+        template = RouteTemplate(source)
+        _templates.set(key, template)
+    return template
+
+
+def invalidate_route_templates(route_id):
+    return _templates.pop_where(lambda key: key[0] == route_id)
+
+
+def route_template_stats():
+    return _templates.stats()
@@ -0,0 +1,183 @@
+import logging
+import os
+import threading
+from app.config.env import SCHEMA_CACHE_MAX_TABLES, SCHEMA_CACHE_TTL, SCHEMA_PREFETCH_INTERVAL, SCHEMA_PREFETCH_TABLES
+from app.utils.cache import TTLCache
+from app.utils.connection_cache import get_connection_descriptors_by_slugs
+from app.utils.connection_pool import acquire_target_connection, connection_fingerprint
+
+# Colunas por (connection_id, fingerprint, OWNER, TABELA); tabela inexistente = []
+_columns = TTLCache(ttl=SCHEMA_CACHE_TTL, maxsize=SCHEMA_CACHE_MAX_TABLES)
+# Um lock por conexão: pedidos simultâneos da mesma tabela fazem uma só consulta ao dicionário
+_locks = {}
+_locks_guard = threading.Lock()
+# Pares (owner, tabela) por consulta; o Oracle aceita até 1000 itens num IN
+_BATCH_SIZE = 500
+
+_prefetch_stop = threading.Event()
+_prefetch_pid = None
+
+
+def _connection_lock(connection_id):
+    with _locks_guard:
+        return _locks.setdefault(connection_id, threading.Lock())
+
+
+def _key(connection, owner, table):
+    return (connection["id"], connection_fingerprint(connection), owner, table)
+
+
+def _normalize(tables):
+    return list(dict.fromkeys((owner.strip().upper(), table.strip().upper()) for owner, table in tables))
+
+
+def _fetch_columns(connection, tables):
+    """
+    Consulta all_tab_columns para várias tabelas de uma vez.
+    Retorna {(OWNER, TABELA): [colunas]}, com [] para as que não existem.
+    """
+    found = {table: [] for table in tables}
+    db_conn = acquire_target_connection(connection)
+    if not db_conn:
+        raise ConnectionError(f"Falha ao conectar com {connection['slug']}.")
+    try:
+        db_cursor = db_conn.cursor()
+        try:
+            for start in range(0, len(tables), _BATCH_SIZE):
+                batch = tables[start:start + _BATCH_SIZE]
+                params = {}
+                pairs = []
+                for i, (owner, table) in enumerate(batch):
+                    params[f"o{i}"] = owner
+                    params[f"t{i}"] = table
+                    pairs.append(f"(:o{i}, :t{i})")
+                db_cursor.execute(f"""
+                    SELECT owner, table_name, column_name, data_type, data_length,
+                           data_precision, data_scale, nullable
+                    FROM all_tab_columns
+                    WHERE (owner, table_name) IN ({', '.join(pairs)})
+                    ORDER BY owner, table_name, column_id
+                """, params)
+                for row in db_cursor.fetchall():
+                    found[(row[0], row[1])].append({
+                        "column_name": row[2],
+                        "data_type": row[3],
+                        "data_length": row[4],
+                        "data_precision": row[5],
+                        "data_scale": row[6],
+                        "nullable": row[7]
+                    })
+        finally:
+            db_cursor.close()
+    finally:
+        db_conn.close()
+    return found
+
+
+def get_table_columns(connection, tables, refresh=False):
+    """
+    Estrutura de várias tabelas de uma conexão Oracle: {(OWNER, TABELA): [colunas]}.
+    Só as tabelas fora do cache vão ao banco, numa única consulta ao dicionário.
+    """
+    tables = _normalize(tables)
+    result = {}
+    missing = []
+    for owner, table in tables:
+        cached = None if refresh else _columns.get(_key(connection, owner, table))
+        if cached is None:
+            missing.append((owner, table))
+        else:
+            result[(owner, table)] = cached
+
+    if missing:
+        with _connection_lock(connection["id"]):
+            # Outra requisição pode ter buscado enquanto esperávamos o lock
+            if not refresh:
+                still_missing = []
+                for owner, table in missing:
+                    cached = _columns.get(_key(connection, owner, table))
+                    if cached is None:
+                        still_missing.append((owner, table))
+                    else:
+                        result[(owner, table)] = cached
+                missing = still_missing
+            if missing:
+                for (owner, table), columns in _fetch_columns(connection, missing).items():
+                    _columns.set(_key(connection, owner, table), columns)
+                    result[(owner, table)] = columns
+
+    return result
+
+
+def invalidate_table_columns(connection_id=None):
+    """
+    Descarta a estrutura guardada de uma conexão (ou de todas, sem argumento).
+    """
+    return _columns.pop_where(lambda key: connection_id is None or key[0] == connection_id)
+
+
+def schema_cache_stats():
+    return _columns.stats()
+
+
+def parse_prefetch_tables(spec):
+    """
+    "slug:OWNER.TABELA,slug:OWNER.TABELA" -> {slug: [(OWNER, TABELA)]}; itens inválidos são ignorados.
+    """
+    tables = {}
+    for item in (spec or "").split(","):
+        slug, _, name = item.strip().partition(":")
+        owner, _, table = name.partition(".")
+        if not slug or not owner or not table:
+            if item.strip():
+                logging.warning(f"⚠️ SCHEMA_PREFETCH_TABLES: item inválido '{item.strip()}'")
+            continue
+        tables.setdefault(slug.strip().lower(), []).append((owner, table))
+    return tables
+
+
+def prefetch_tables():
+    """
+    Recarrega a estrutura das tabelas de SCHEMA_PREFETCH_TABLES.
+    """
+    tables = parse_prefetch_tables(SCHEMA_PREFETCH_TABLES)
+    if not tables:
+        return 0
+    loaded = 0
+    for slug, connection in get_connection_descriptors_by_slugs(list(tables)).items():
+        if connection["db_type"].lower() != "oracle":
+            continue
+        try:
+            loaded += len(get_table_columns(connection, tables[slug], refresh=True))
+        except Exception as e:
+            logging.error(f"❌ Erro ao pré-carregar estrutura de tabelas em {slug}: {e}")
+    return loaded
+
+
+def _prefetch_loop():
+    while not _prefetch_stop.is_set():
+        try:
+            loaded = prefetch_tables()
+            logging.info(f"📐 Estrutura de {loaded} tabela(s) pré-carregada")
+        except Exception:
+            logging.exception("Erro no pré-carregamento de estrutura de tabelas")
+        _prefetch_stop.wait(SCHEMA_PREFETCH_INTERVAL)
+
+
+def start_schema_prefetch():
+    """
+    Inicia (uma vez por processo) o thread que mantém as tabelas configuradas em cache.
+    """
+    global _prefetch_pid
+    if not SCHEMA_PREFETCH_TABLES or SCHEMA_PREFETCH_INTERVAL <= 0:
+        return
+    with _locks_guard:
+        if _prefetch_pid == os.getpid():
+            return
+        _prefetch_pid = os.getpid()
+    _prefetch_stop.clear()
+    threading.Thread(target=_prefetch_loop, name="schema-prefetch", daemon=True).start()
+
+
+def stop_schema_prefetch():
+    _prefetch_stop.set()
@@ -0,0 +1,85 @@
+import re
+import threading
+from collections import deque
+from app.config.env import SEQUENCE_BLOCK_SIZE, SEQUENCE_MAX_COUNT
+from app.utils.connection_pool import acquire_target_connection, connection_fingerprint
+
+# Nome de sequência Oracle, opcionalmente com owner (ex.: DBAMV.SEQ_PROIBICAO)
+_IDENTIFIER = re.compile(r"^[A-Za-z][A-Za-z0-9_$#]{0,127}(\.[A-Za-z][A-Za-z0-9_$#]{0,127})?$")
+
+# Valores já reservados por (connection_id, fingerprint, SEQUENCIA)
+_blocks = {}
+_blocks_guard = threading.Lock()
+
+
+class _Block:
+    __slots__ = ("lock", "values")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = deque()
+
+
+def validate_sequence_name(name):
+    """
+    Nome da sequência em maiúsculas; ValueError se não for um identificador válido
+    (o nome entra no SQL, não pode ser passado como bind).
+    """
+    if not isinstance(name, str) or not _IDENTIFIER.match(name.strip()):
+        raise ValueError(f"Nome de sequência inválido: {name!r}")
+    return name.strip().upper()
+
+
+def fetch_nextvals(connection, sequence, count):
+    """
+    `count` valores de NEXTVAL numa única ida ao banco (CONNECT BY LEVEL).
+    """
+    db_conn = acquire_target_connection(connection)
+    if not db_conn:
+        raise ConnectionError(f"Falha ao conectar com {connection['slug']}.")
+    try:
+        db_cursor = db_conn.cursor()
+        try:
+            db_cursor.arraysize = max(count, 100)
+            db_cursor.execute(f"SELECT {sequence}.NEXTVAL FROM DUAL CONNECT BY LEVEL <= :n", {"n": count})
+            return [row[0] for row in db_cursor.fetchall()]
+        finally:
+            db_cursor.close()
+    finally:
+        db_conn.close()
+
+
+def _block(connection, sequence):
+    key = (connection["id"], connection_fingerprint(connection), sequence)
+    with _blocks_guard:
+        block = _blocks.get(key)
+        if block is None:
+            block = _blocks[key] = _Block()
+        return block
+
+
+def next_sequence_values(connection, sequence, count=1, use_block=True):
+    """
+    Retorna `count` valores da sequência. Com SEQUENCE_BLOCK_SIZE > 0, reserva
+    blocos de valores por conexão e sequência e atende os pedidos da memória;
+    valores reservados e não usados (ex.: reinício do processo) viram lacunas.
+    """
+    sequence = validate_sequence_name(sequence)
+    if not 1 <= count <= SEQUENCE_MAX_COUNT:
+        raise ValueError(f"count deve estar entre 1 e {SEQUENCE_MAX_COUNT}.")
+
+    if not use_block or SEQUENCE_BLOCK_SIZE <= 0 or count > SEQUENCE_BLOCK_SIZE:
+        return fetch_nextvals(connection, sequence, count)
+
+    block = _block(connection, sequence)
+    with block.lock:
+        if len(block.values) < count:
+            # Um thread reabastece; os demais pedidos da mesma sequência esperam aqui
+            block.values.extend(fetch_nextvals(connection, sequence, SEQUENCE_BLOCK_SIZE))
+        return [block.values.popleft() for _ in range(count)]
+
+
+def sequence_block_stats():
+    with _blocks_guard:
+        blocks = list(_blocks.values())
+    return {"sequences": len(blocks), "reserved": sum(len(block.values) for block in blocks)}
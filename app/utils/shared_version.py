@@ -0,0 +1,55 @@
+import logging
+import uuid
+from app.config.env import CACHE_VERSION_CHECK_INTERVAL
+from app.config.redis_config import get_redis
+from app.utils.cache import TTLCache
+
+# Versões de cache compartilhadas entre os workers via Redis: quem invalida
+# troca a versão da chave, e cada processo, ao ver uma versão diferente da
+# que guardou, descarta o que tem em memória. A última versão lida de cada
+# chave fica aqui, para ir ao Redis no máximo uma vez a cada
+# CACHE_VERSION_CHECK_INTERVAL segundos por processo.
+_seen = TTLCache(ttl=CACHE_VERSION_CHECK_INTERVAL, maxsize=8192)
+_ABSENT = object()
+
+
+def current_version(key):
+    """
+    Versão atual de `key` no Redis, lida de novo só depois do intervalo.
+    None sem Redis, com a chave ausente ou com o Redis indisponível.
+    """
+    redis_client = get_redis()
+    if redis_client is None:
+        return None
+    if CACHE_VERSION_CHECK_INTERVAL > 0:
+        cached = _seen.get(key, _ABSENT)
+        if cached is not _ABSENT:
+            return cached
+    try:
+        version = redis_client.get(key)
+    except Exception as e:
+        logging.warning(f"⚠️ Redis indisponível para a versão de {key}: {e}")
+        return None
+    if CACHE_VERSION_CHECK_INTERVAL > 0:
+        _seen.set(key, version)
+    return version
+
+
+def bump_version(key, ex=None):
+    """
+    Troca a versão de `key` (expira em `ex` segundos, se informado).
+    Retorna False sem Redis ou se o Redis falhar.
+    """
+    redis_client = get_redis()
+    if redis_client is None:
+        return False
+    version = uuid.uuid4().hex.encode()
+    try:
+        redis_client.set(key, version, ex=ex)
+    except Exception as e:
+        logging.warning(f"⚠️ Redis indisponível para trocar a versão de {key}: {e}")
+        return False
+    # Este processo já descartou o que tinha; não precisa esperar o intervalo
+    if CACHE_VERSION_CHECK_INTERVAL > 0:
+        _seen.set(key, version)
+    return True
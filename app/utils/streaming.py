@@ -0,0 +1,124 @@
+import csv
+import io
+import logging
+import time
+from flask import Response, current_app, request, stream_with_context
+from app.config.env import STREAM_ARRAYSIZE, STREAM_MAX_ARRAYSIZE
+
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def requested_stream_format():
+    """
+    Retorna o formato de streaming pedido em `?format=` ou None (resposta JSON normal).
+    Lança ValueError para formatos desconhecidos.
+    """
+    fmt = (request.args.get("format") or "").strip().lower()
+    if not fmt or fmt == "json":
+        return None
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"Formato '{fmt}' não suportado. Use: json, {', '.join(STREAM_FORMATS)}.")
+    return fmt
+
+
+def requested_arraysize():
+    """
+    Quantidade de linhas buscadas por vez (`?arraysize=`), limitada a STREAM_MAX_ARRAYSIZE.
+    """
+    try:
+        arraysize = int(request.args.get("arraysize", STREAM_ARRAYSIZE))
+    except (TypeError, ValueError):
+        arraysize = STREAM_ARRAYSIZE
+    return max(1, min(arraysize, STREAM_MAX_ARRAYSIZE))
+
+
+def iter_cursor(cursor, arraysize):
+    """
+    Percorre o cursor com fetchmany, mantendo no máximo `arraysize` linhas em memória.
+    """
+    cursor.arraysize = arraysize
+    while True:
+        rows = cursor.fetchmany(arraysize)
+        if not rows:
+            break
+        yield from rows
+
+
+def failed_section(message):
+    """
+    Seção que falha ao iniciar; usada para conexões que não podem ser executadas.
+    """
+    raise ValueError(message)
+    yield
+
+
+def _plain(value):
+    # LOBs do Oracle precisam ser lidos antes de serializar
+    if hasattr(value, "read"):
+        return value.read()
+    return value
+
+
+def _ndjson_section(name, section):
+    dumps = current_app.json.dumps
+    started = time.monotonic()
+    count = 0
+    try:
+        rows = section()
+        columns = next(rows)
+        yield dumps({"connection": name, "columns": columns}) + "\n"
+        for row in rows:
+            count += 1
+            yield dumps({"connection": name, "row": dict(zip(columns, map(_plain, row)))}) + "\n"
+    except Exception as e:
+        logging.error(f"❌ Erro no streaming da conexão '{name}': {e}")
+        yield dumps({"connection": name, "error": str(e)}) + "\n"
+        return
+    elapsed_ms = round((time.monotonic() - started) * 1000, 3)
+    yield dumps({"connection": name, "end": True, "rows": count, "elapsed_ms": elapsed_ms}) + "\n"
+
+
+def _csv_section(name, section):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    # Cada conexão abre com uma linha "# connection: <nome>" e termina com uma linha em branco
+    yield f"# connection: {name}\n"
+    try:
+        rows = section()
+        writer.writerow(next(rows))
+        yield flush()
+        for row in rows:
+            writer.writerow([_plain(value) for value in row])
+            yield flush()
+    except Exception as e:
+        logging.error(f"❌ Erro no streaming da conexão '{name}': {e}")
+        yield f"# error: {' '.join(str(e).split())}\n"
+    yield "\n"
+
+
+def stream_sections(sections, fmt):
+    """
+    Resposta HTTP em streaming com uma seção por conexão.
+
+    `sections` é uma lista de (nome, gerador) onde cada gerador, quando chamado,
+    produz primeiro a lista de colunas e depois as linhas (tuplas), e é
+    responsável por devolver a sessão ao pool ao terminar (inclusive se o
+    cliente desconectar).
+    """
+    write_section = _ndjson_section if fmt == "ndjson" else _csv_section
+
+    def generate():
+        for name, section in sections:
+            yield from write_section(name, section)
+
+    return Response(stream_with_context(generate()), mimetype=STREAM_FORMATS[fmt])
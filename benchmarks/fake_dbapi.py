@@ -0,0 +1,306 @@
+"""
+Bancos de mentira para o benchmark dos jobs de integração.
+
+- SyntheticSource: origem que gera as linhas sob demanda (sem guardar a tabela),
+  com fetchmany em idas ao banco de `arraysize` linhas, como o cx_Oracle.
+- SQLiteSource: origem lida de um arquivo SQLite de verdade (aceita %s e os
+  filtros das partições, com CRC32/MOD registrados como funções).
+- FakeTarget: destino que só conta linhas, idas ao banco e commits, imitando o
+  executemany do cx_Oracle (uma ida por bloco, batcherrors) e do mysql-connector
+  (INSERT/REPLACE em uma ida com várias linhas; UPDATE uma ida por linha).
+  `reject(linha)` devolve o errno com que o destino recusa a linha (ou None).
+
+A latência de rede é simulada com `latency_ms` por ida ao banco.
+"""
+import math
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+
+
+def synthetic_columns(width):
+    """
+    ID, DT_ATUALIZACAO e `width - 2` colunas alternando texto, inteiro e decimal.
+    """
+    columns = ["ID", "DT_ATUALIZACAO"]
+    columns += [f"C{i:02d}" for i in range(1, max(0, width - 2) + 1)]
+    return columns
+
+
+_BASE_DATE = datetime(2024, 1, 1)
+_TEXT_POOL = {}
+
+
+def _text_pool(text_size, seed):
+    """
+    1024 textos aleatórios por tamanho, sorteados uma vez: gerar a linha não
+    pode custar mais que processá-la, senão o benchmark mede o gerador.
+    """
+    key = (text_size, seed)
+    if key not in _TEXT_POOL:
+        rng = random.Random(seed)
+        alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+        _TEXT_POOL[key] = ["".join(rng.choice(alphabet) for _ in range(text_size)) for _ in range(1024)]
+    return _TEXT_POOL[key]
+
+
+def synthetic_row(index, width, text_size, seed=42):
+    """
+    Linha determinística `index`: mesmos valores para o mesmo (index, seed).
+    """
+    pool = _text_pool(text_size, seed)
+    row = [index, _BASE_DATE + timedelta(seconds=index)]
+    for col in range(width - 2):
+        mixed = (index * 2654435761 + col * 40503 + seed) & 0xFFFFFFFF
+        kind = col % 3
+        if kind == 0:
+            row.append(pool[mixed & 1023])
+        elif kind == 1:
+            row.append(mixed % 1_000_000)
+        else:
+            row.append((mixed % 1_000_000) / 100)
+    return tuple(row)
+
+
+class Counters:
+    """
+    Contadores compartilhados pelas conexões de um mesmo lado (origem ou destino).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.round_trips = 0
+        self.rows = 0
+        self.commits = 0
+        self.connections = 0
+
+    def add(self, round_trips=0, rows=0, commits=0, connections=0):
+        with self.lock:
+            self.round_trips += round_trips
+            self.rows += rows
+            self.commits += commits
+            self.connections += connections
+
+
+def _wait(latency_ms, round_trips):
+    if latency_ms and round_trips:
+        time.sleep(latency_ms * round_trips / 1000)
+
+
+class _Cursor:
+    arraysize = 100
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        pass
+
+
+class SyntheticSourceCursor(_Cursor):
+    def __init__(self, source):
+        self.source = source
+        self.description = None
+        self._next = 1
+
+    def execute(self, sql, params=None):
+        _wait(self.source.latency_ms, 1)
+        self.source.counters.add(round_trips=1)
+        self.description = [(name, None, None, None, None, None, None) for name in self.source.columns]
+        self._next = 1
+
+    def fetchmany(self, size=None):
+        size = size or self.arraysize
+        end = min(self._next + size, self.source.rows + 1)
+        count = end - self._next
+        if count <= 0:
+            return []
+        trips = math.ceil(count / max(1, self.arraysize))
+        _wait(self.source.latency_ms, trips)
+        rows = [synthetic_row(i, self.source.width, self.source.text_size, self.source.seed) for i in range(self._next, end)]
+        self._next = end
+        self.source.counters.add(round_trips=trips, rows=count)
+        return rows
+
+
+class SyntheticSource:
+    """
+    Origem sintética; ignora filtros da query (não serve para partições).
+    """
+
+    def __init__(self, rows, width, text_size=20, latency_ms=0.0, seed=42):
+        self.rows = rows
+        self.width = width
+        self.text_size = text_size
+        self.latency_ms = latency_ms
+        self.seed = seed
+        self.columns = synthetic_columns(width)
+        self.counters = Counters()
+
+    def connect(self):
+        self.counters.add(connections=1)
+        return _Connection(lambda: SyntheticSourceCursor(self), self.counters)
+
+
+def build_sqlite_source(path, rows, width, text_size=20, seed=42, batch=5000):
+    """
+    Cria o arquivo SQLite com a tabela `origem` sintética.
+    """
+    columns = synthetic_columns(width)
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("DROP TABLE IF EXISTS origem")
+        conn.execute(f"CREATE TABLE origem ({', '.join(columns)})")
+        placeholders = ", ".join("?" * len(columns))
+        for start in range(1, rows + 1, batch):
+            chunk = [synthetic_row(i, width, text_size, seed) for i in range(start, min(start + batch, rows + 1))]
+            conn.executemany(f"INSERT INTO origem VALUES ({placeholders})", chunk)
+        conn.commit()
+    finally:
+        conn.close()
+    return columns
+
+
+class SQLiteSourceCursor(_Cursor):
+    def __init__(self, source, conn):
+        self.source = source
+        self._cur = conn.cursor()
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    def execute(self, sql, params=None):
+        _wait(self.source.latency_ms, 1)
+        self.source.counters.add(round_trips=1)
+        self._cur.execute(sql.replace("%s", "?"), tuple(params or ()))
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    def fetchmany(self, size=None):
+        rows = self._cur.fetchmany(size or self.arraysize)
+        if rows:
+            trips = math.ceil(len(rows) / max(1, self.arraysize))
+            _wait(self.source.latency_ms, trips)
+            self.source.counters.add(round_trips=trips, rows=len(rows))
+        return rows
+
+    def close(self):
+        self._cur.close()
+
+
+class SQLiteSource:
+    """
+    Origem em arquivo SQLite, com sintaxe de MySQL (%s, MOD, CRC32).
+    """
+
+    def __init__(self, path, latency_ms=0.0):
+        self.path = path
+        self.latency_ms = latency_ms
+        self.counters = Counters()
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.create_function("CRC32", 1, lambda v: None if v is None else zlib.crc32(str(v).encode()))
+        conn.create_function("MOD", 2, lambda a, b: None if a is None else a % b)
+        self.counters.add(connections=1)
+        return _Connection(lambda: SQLiteSourceCursor(self, conn), self.counters, conn.close)
+
+
+class _BatchError:
+    def __init__(self, offset, message):
+        self.offset = offset
+        self.message = message
+
+
+class FakeTargetCursor(_Cursor):
+    def __init__(self, target):
+        self.target = target
+        self._batch_errors = []
+
+    def execute(self, sql, params=None):
+        _wait(self.target.latency_ms, 1)
+        self.target.counters.add(round_trips=1, rows=1)
+
+    def executemany(self, sql, seq, batcherrors=False):
+        rejected = {}
+        for i, row in enumerate(seq if self.target.reject else ()):
+            errno = self.target.reject(row)
+            if errno is not None:
+                rejected[i] = errno
+        self._batch_errors = []
+        if rejected and not (self.target.db_type == "oracle" and batcherrors):
+            # mysql-connector: o comando inteiro falha com o erro da primeira linha recusada
+            import mysql.connector
+            self.target.counters.add(round_trips=1)
+            errno = next(iter(rejected.values()))
+            raise mysql.connector.Error(msg=f"Erro {errno} (simulado)", errno=errno)
+        self._batch_errors = [_BatchError(i, f"ORA-{errno:05d} (simulado)") for i, errno in rejected.items()]
+        seq = [row for i, row in enumerate(seq) if i not in rejected]
+        if self.target.keep_rows:
+            with self.target.counters.lock:
+                self.target.written.extend(seq)
+
+        rows = len(seq)
+        if self.target.db_type == "oracle":
+            trips = 1  # array DML
+        elif sql.lstrip().upper().startswith(("INSERT", "REPLACE")):
+            trips = 1  # mysql-connector junta as linhas num único VALUES
+        else:
+            trips = rows  # UPDATE: uma ida por linha
+        _wait(self.target.latency_ms, trips)
+        if self.target.per_row_us:
+            time.sleep(self.target.per_row_us * rows / 1_000_000)
+        self.target.counters.add(round_trips=trips, rows=rows)
+
+    def getbatcherrors(self):
+        return self._batch_errors
+
+
+class FakeTarget:
+    def __init__(self, db_type="mysql", latency_ms=0.0, per_row_us=0.0, reject=None, keep_rows=False):
+        self.db_type = db_type
+        self.latency_ms = latency_ms
+        self.per_row_us = per_row_us
+        self.reject = reject
+        self.keep_rows = keep_rows
+        self.written = []  # linhas gravadas, só com keep_rows
+        self.counters = Counters()
+
+    def connect(self):
+        self.counters.add(connections=1)
+        return _Connection(lambda: FakeTargetCursor(self), self.counters, on_commit=self._commit)
+
+    def _commit(self):
+        _wait(self.latency_ms, 1)
+        self.counters.add(round_trips=1, commits=1)
+
+
+class _Connection:
+    def __init__(self, make_cursor, counters, on_close=None, on_commit=None):
+        self._make_cursor = make_cursor
+        self._counters = counters
+        self._on_close = on_close
+        self._on_commit = on_commit
+
+    def cursor(self, **kwargs):
+        return self._make_cursor()
+
+    def commit(self):
+        if self._on_commit:
+            self._on_commit()
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        if self._on_close:
+            self._on_close()
+            self._on_close = None
@@ -0,0 +1,239 @@
+"""
+Benchmark offline do executar_job (jobs de integração), sem bancos reais.
+
+A origem é sintética (gerada sob demanda) ou um arquivo SQLite; o destino é um
+driver de mentira que imita as idas ao banco do cx_Oracle e do mysql-connector
+(ver fake_dbapi). Cada combinação de modo de gravação, tamanho de bloco e
+política de commit roda num processo novo, para medir o pico de memória (RSS)
+só daquele caso. O resultado vai para um JSON que pode ser comparado com outro.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.integration_benchmark --rows 200000 --width 20 \\
+        --chunk-sizes 1000,5000,20000 --modes insert,replace,update,upsert \\
+        --target mysql --latency-ms 0.5 --output benchmarks/results/atual.json
+
+    python -m benchmarks.integration_benchmark --compare antes.json depois.json
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.fake_dbapi import FakeTarget, SQLiteSource, SyntheticSource, build_sqlite_source, synthetic_columns
+
+MODES = ("insert", "replace", "update", "upsert")
+SOURCE_ID, TARGET_ID = 1, 2
+
+
+def _peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB; macOS em bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_case(case):
+    """
+    Executa um caso num processo próprio e devolve as métricas.
+    """
+    from app.services import integration_service
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if case["source"] == "sqlite":
+        source = SQLiteSource(case["sqlite_path"], case["source_latency_ms"])
+        source_type = "mysql"
+    else:
+        source = SyntheticSource(case["rows"], case["width"], case["text_size"], case["source_latency_ms"])
+        source_type = "oracle"
+    target = FakeTarget(case["target"], case["target_latency_ms"], case["per_row_us"])
+
+    run = {}
+    errors = []
+    integration_service.get_connection_by_id = lambda conn_id: {
+        "id": conn_id, "db_type": source_type if conn_id == SOURCE_ID else case["target"]
+    }
+    integration_service.connect_to_database = (
+        lambda conf, job=None: source.connect() if conf["id"] == SOURCE_ID else target.connect()
+    )
+    integration_service.free_sessions = lambda conf, database=None: case["partitions"]
+    integration_service.registrar_erro_critico = lambda job_id, msg, snapshot=None: errors.append(msg)
+    integration_service.save_watermark = lambda job_id, value: None
+    integration_service.quarentenar_linhas = lambda job_id, colunas, rejeitadas: None
+    integration_service.start_run = lambda job_id, trigger, metrics: None
+    integration_service.finish_run = lambda run_id, metrics, status, error=None: run.update(
+        status=status, phases_ms={k: round(v, 1) for k, v in metrics.phases_ms.items()},
+        bytes_read=metrics.bytes_read, rows_written=metrics.rows_written
+    )
+
+    columns = synthetic_columns(case["width"])
+    job = {
+        "id": 0,
+        "source_connection_id": SOURCE_ID,
+        "destination_connection_id": TARGET_ID,
+        "source_query": "SELECT * FROM origem",
+        "target_table": "destino",
+        "target_columns": ", ".join(columns),
+        "where_key": "ID",
+        "mode": case["mode"],
+        "chunk_size": case["chunk_size"],
+        "commit_per_chunk": case["commit_per_chunk"],
+        "partition_count": case["partitions"],
+        "partition_strategy": "range",
+        "partition_column": "ID" if case["partitions"] > 1 else None,
+    }
+
+    started = time.perf_counter()
+    try:
+        message = integration_service.executar_job(0, job, trigger="benchmark")
+    except Exception as e:
+        message = f"erro: {e}"
+    seconds = time.perf_counter() - started
+
+    rows = target.counters.rows
+    return {
+        **{key: case[key] for key in ("source", "target", "mode", "chunk_size", "commit_per_chunk", "partitions")},
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(rows / seconds) if seconds else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "commits": target.counters.commits,
+        "target_round_trips": target.counters.round_trips,
+        "source_round_trips": source.counters.round_trips,
+        "source_connections": source.counters.connections,
+        "status": run.get("status"),
+        "phases_ms": run.get("phases_ms"),
+        "bytes_read": run.get("bytes_read"),
+        "result": message,
+        "errors": errors[:5],
+    }
+
+
+def build_cases(args):
+    commit_modes = [mode.strip() == "chunk" for mode in args.commit.split(",")]
+    cases = []
+    for mode in args.modes.split(","):
+        for chunk_size in [int(size) for size in args.chunk_sizes.split(",")]:
+            for commit_per_chunk in commit_modes:
+                cases.append({
+                    "source": args.source,
+                    "target": args.target,
+                    "mode": mode.strip(),
+                    "chunk_size": chunk_size,
+                    "commit_per_chunk": commit_per_chunk,
+                    "partitions": args.partitions,
+                    "rows": args.rows,
+                    "width": args.width,
+                    "text_size": args.text_size,
+                    "source_latency_ms": args.latency_ms,
+                    "target_latency_ms": args.latency_ms,
+                    "per_row_us": args.per_row_us,
+                    "sqlite_path": args.sqlite_path,
+                })
+    return cases
+
+
+def run_benchmark(args):
+    for mode in args.modes.split(","):
+        if mode.strip() not in MODES:
+            raise SystemExit(f"Modo inválido: {mode}")
+    if args.partitions > 1 and args.source != "sqlite":
+        raise SystemExit("--partitions exige --source sqlite (a origem sintética ignora filtros).")
+
+    tmpdir = None
+    if args.source == "sqlite":
+        tmpdir = tempfile.TemporaryDirectory()
+        args.sqlite_path = os.path.join(tmpdir.name, "origem.db")
+        print(f"Gerando origem SQLite com {args.rows} linhas x {args.width} colunas...")
+        build_sqlite_source(args.sqlite_path, args.rows, args.width, args.text_size)
+    else:
+        args.sqlite_path = None
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    try:
+        for case in build_cases(args):
+            with context.Pool(1) as pool:
+                result = pool.apply(run_case, (case,))
+            results.append(result)
+            commit = "bloco" if case["commit_per_chunk"] else "final"
+            print(f"{result['mode']:8} chunk={result['chunk_size']:<6} commit={commit:5} "
+                  f"{result['rows_per_sec'] or 0:>9} linhas/s  rss={result['peak_rss_mb']} MB  "
+                  f"commits={result['commits']}  {result['status']}")
+    finally:
+        if tmpdir:
+            tmpdir.cleanup()
+
+    report = {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "python": sys.version.split()[0],
+        "config": {key: getattr(args, key) for key in (
+            "source", "target", "rows", "width", "text_size", "latency_ms", "per_row_us", "partitions"
+        )},
+        "results": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Resultados gravados em {args.output}")
+    return report
+
+
+def _case_key(result):
+    return (result["mode"], result["chunk_size"], result["commit_per_chunk"], result.get("partitions", 1))
+
+
+def compare(before_path, after_path):
+    """
+    Mostra a variação de linhas/s e memória entre dois JSON do benchmark.
+    """
+    with open(before_path, encoding="utf-8") as f:
+        before = {_case_key(r): r for r in json.load(f)["results"]}
+    with open(after_path, encoding="utf-8") as f:
+        after = json.load(f)["results"]
+
+    print(f"{'modo':8} {'chunk':>6} {'commit':6} {'antes':>10} {'depois':>10} {'Δ%':>7} {'rss antes':>10} {'rss depois':>10}")
+    for result in after:
+        old = before.get(_case_key(result))
+        if not old:
+            continue
+        delta = ((result["rows_per_sec"] or 0) / old["rows_per_sec"] - 1) * 100 if old["rows_per_sec"] else 0
+        commit = "bloco" if result["commit_per_chunk"] else "final"
+        print(f"{result['mode']:8} {result['chunk_size']:>6} {commit:6} {old['rows_per_sec']:>10} "
+              f"{result['rows_per_sec']:>10} {delta:>6.1f}% {old['peak_rss_mb']:>10} {result['peak_rss_mb']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline do executar_job.")
+    parser.add_argument("--source", choices=("synthetic", "sqlite"), default="synthetic")
+    parser.add_argument("--target", choices=("mysql", "oracle"), default="mysql")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--width", type=int, default=12, help="colunas por linha (mínimo 2)")
+    parser.add_argument("--text-size", type=int, default=20, help="caracteres das colunas de texto")
+    parser.add_argument("--chunk-sizes", default="1000,5000,20000")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--commit", default="final,chunk", help="final, chunk ou os dois")
+    parser.add_argument("--partitions", type=int, default=1, help="leitura particionada (só com --source sqlite)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="latência simulada por ida ao banco")
+    parser.add_argument("--per-row-us", type=float, default=0.0, help="custo simulado por linha gravada no destino")
+    parser.add_argument("--output", default=None, help="arquivo JSON de saída")
+    parser.add_argument("--compare", nargs=2, metavar=("ANTES", "DEPOIS"), help="compara dois JSON e sai")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    args.width = max(2, args.width)
+    run_benchmark(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# gunicorn.conf.py — servidor de produção (gunicorn -c gunicorn.conf.py wsgi:app)
+import os
+
+bind = os.getenv("WEB_BIND", "0.0.0.0:5000")
+
+# Processos pré-forkados, cada um com um pool de threads
+workers = int(os.getenv("WEB_WORKERS", 4))
+threads = int(os.getenv("WEB_THREADS", 8))
+worker_class = "gthread"
+
+# Carrega a aplicação uma vez no master; os workers herdam via fork
+preload_app = True
+
+# Rotas que consultam vários bancos podem demorar; reinício gracioso com folga
+timeout = int(os.getenv("WEB_TIMEOUT", 300))
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", 60))
+keepalive = 5
+
+# Recicla workers periodicamente para conter vazamentos de memória
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("WEB_MAX_REQUESTS_JITTER", 1000))
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("WEB_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    # Todos os workers disputam o papel de agendador; só o dono do lock executa jobs.
+    # Pools de conexão e threads de fundo são recriados sob demanda no novo processo.
+    from app.config.env import SCHEDULER_ENABLED
+    from app.utils.schema_cache import start_schema_prefetch
+    start_schema_prefetch()  # cache de estrutura é por processo
+    if SCHEDULER_ENABLED:
+        from app.scheduler.leader_election import start_scheduler_election
+        start_scheduler_election()
+
+
+def worker_exit(server, worker):
+    # Libera o lock do agendador e envia os logs de requisição pendentes
+    from app.scheduler.leader_election import stop_scheduler_election
+    from app.middleware.request_logger import flush_request_logs
+    from app.utils.schema_cache import stop_schema_prefetch
+    stop_scheduler_election()
+    stop_schema_prefetch()
+    flush_request_logs()
@@ -18,11 +18,13 @@ import sys
 from app import create_app
 from datetime import datetime
 from app.config.db_config import create_db_connection_mysql
-from celery_worker import log_request_to_db
+from app.middleware.request_logger import enqueue_request_log
 import threading
 import time
 from app.middleware.rate_limiter import rate_limit
-from app.scheduler.job_scheduler import start_scheduler
+from app.config.env import SCHEDULER_ENABLED
+from app.scheduler.leader_election import start_scheduler_election
+from app.utils.schema_cache import start_schema_prefetch
 import socket
 
 app = create_app()
@@ -148,8 +150,8 @@ def log_request(response):
         xfwd = request.headers.get("X-Forwarded-For", "")
         ip_addr = xfwd.split(",")[0].strip() if xfwd else request.remote_addr
 
-        # ✅ Envia diretamente ao Celery — sem threading!
-        log_request_to_db.delay(username, endpoint, status_code, ts.isoformat(), ip_addr)
+        # ✅ Vai para o buffer em memória; um thread envia lotes ao Celery
+        enqueue_request_log(username, endpoint, status_code, ts.isoformat(), ip_addr)
     except Exception:
         logging.exception("Erro ao preparar log assíncrono")
     
@@ -172,6 +174,8 @@ def wait_for_rabbitmq(host="rabbitmq", port=5672, timeout=30):
     return False
 
 if __name__ == "__main__":
-    if wait_for_rabbitmq():
-        start_scheduler()
+    # Servidor de desenvolvimento. Em produção: gunicorn -c gunicorn.conf.py wsgi:app
+    if wait_for_rabbitmq() and SCHEDULER_ENABLED:
+        start_scheduler_election()
+    start_schema_prefetch()
     app.run(host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,6 @@
+import os
+
+
+def pytest_configure(config):
+    # app.config.env exige SECRET_KEY, e app.utils.security a usa como chave Fernet
+    os.environ.setdefault("SECRET_KEY", "dmVyem8tdGVzdGVzLXZlcnpvLXRlc3Rlcy12ZXJ6byE=")
@@ -0,0 +1,91 @@
+import sqlite3
+
+import pytest
+
+from app.services import integration_service
+from app.services.integration_service import _marca_concluida, _marca_de_checkpoint
+from benchmarks.fake_dbapi import FakeTarget, SQLiteSource
+
+SOURCE_ID, TARGET_ID = 1, 2
+
+
+def test_marca_concluida_holds_back_the_last_value():
+    linhas = [(1, 10), (2, 10), (3, 11), (4, 12), (5, 12)]
+    assert _marca_concluida(linhas, 1) == 11
+
+
+def test_marca_concluida_without_a_complete_value():
+    assert _marca_concluida([(1, 10), (2, 10)], 1) is None
+
+
+def test_marca_concluida_with_trailing_nulls():
+    # NULLs vêm no fim (Oracle): as marcas preenchidas já foram todas lidas
+    assert _marca_concluida([(1, 10), (2, 11), (3, None)], 1) == 11
+
+
+@pytest.mark.parametrize("watermark_type, mode, expected", [
+    ("int", "insert", 12),
+    ("timestamp", "insert", 11),
+    ("int", "upsert", 11),
+])
+def test_marca_de_checkpoint_by_watermark_type_and_mode(watermark_type, mode, expected):
+    job = {"watermark_type": watermark_type, "mode": mode}
+    linhas = [(1, 10), (2, 11), (3, 12)]
+    assert _marca_de_checkpoint(job, linhas, 1, 12) == expected
+
+
+def _run_job(monkeypatch, tmp_path, rows, **job_fields):
+    path = str(tmp_path / "origem.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE origem (ID, LOTE)")
+    conn.executemany("INSERT INTO origem VALUES (?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+    source = SQLiteSource(path)
+    target = FakeTarget("mysql", keep_rows=True)
+    saved = []
+    monkeypatch.setattr(integration_service, "get_connection_by_id",
+                        lambda conn_id: {"id": conn_id, "db_type": "mysql"})
+    monkeypatch.setattr(integration_service, "connect_to_database",
+                        lambda conf, job=None: source.connect() if conf["id"] == SOURCE_ID else target.connect())
+    monkeypatch.setattr(integration_service, "save_watermark", lambda job_id, value: saved.append(value))
+    monkeypatch.setattr(integration_service, "registrar_erro_critico", lambda job_id, msg, snapshot=None: None)
+    monkeypatch.setattr(integration_service, "quarentenar_linhas", lambda job_id, colunas, rejeitadas: None)
+    monkeypatch.setattr(integration_service, "start_run", lambda job_id, trigger, metrics: None)
+    monkeypatch.setattr(integration_service, "finish_run", lambda run_id, metrics, status, error=None: None)
+
+    job = {
+        "id": 0,
+        "source_connection_id": SOURCE_ID,
+        "destination_connection_id": TARGET_ID,
+        "source_query": "SELECT * FROM origem",
+        "target_table": "destino",
+        "target_columns": "ID, LOTE",
+        "where_key": "ID",
+        "mode": "insert",
+        "chunk_size": 4,
+        "commit_per_chunk": True,
+        "watermark_value": None,
+        **job_fields,
+    }
+    integration_service.executar_job(0, job, trigger="teste")
+    return saved, target
+
+
+def test_unique_id_watermark_advances_to_each_chunk_end(monkeypatch, tmp_path):
+    rows = [(i, i) for i in range(1, 11)]
+    saved, target = _run_job(monkeypatch, tmp_path, rows, watermark_column="ID", watermark_type="int")
+
+    # Um checkpoint por bloco, até a última linha lida, e a marca final
+    assert saved == [4, 8, 10, 10]
+    assert target.counters.commits == 4
+
+
+def test_timestamp_watermark_checkpoints_only_complete_values(monkeypatch, tmp_path):
+    # LOTE se repete entre blocos: [0, 0, 1, 1] [1, 1, 2, 2] [2, 3]
+    rows = [(1, 0), (2, 0), (3, 1), (4, 1), (5, 1), (6, 1), (7, 2), (8, 2), (9, 2), (10, 3)]
+    saved, target = _run_job(monkeypatch, tmp_path, rows, watermark_column="LOTE", watermark_type="timestamp")
+
+    assert saved == [0, 1, 2, 3]
+    assert len(target.written) == 10
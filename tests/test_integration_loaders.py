@@ -0,0 +1,57 @@
+import pytest
+
+from app.services.integration_loaders import ChunkLoadError, load_chunk
+from benchmarks.fake_dbapi import FakeTarget
+
+SQL = "INSERT INTO destino (ID, NOME) VALUES (%s, %s)"
+ROWS = [(i, f"nome {i}") for i in range(1, 11)]
+
+
+def _rejecting(errno, ids):
+    return lambda row: errno if row[0] in ids else None
+
+
+def test_mysql_bisection_isolates_rejected_rows_and_writes_the_rest():
+    target = FakeTarget("mysql", reject=_rejecting(1062, {3, 8}), keep_rows=True)
+    cur = target.connect().cursor()
+
+    rejected = load_chunk("mysql", cur, SQL, ROWS)
+
+    assert [offset for offset, _ in rejected] == [2, 7]
+    assert sorted(target.written) == [row for row in ROWS if row[0] not in (3, 8)]
+
+
+def test_mysql_statement_error_stops_the_chunk():
+    # 1146: tabela inexistente não é erro de linha; o bloco inteiro é interrompido
+    target = FakeTarget("mysql", reject=_rejecting(1146, set(range(1, 11))))
+    cur = target.connect().cursor()
+
+    with pytest.raises(ChunkLoadError) as info:
+        load_chunk("mysql", cur, SQL, ROWS)
+
+    assert info.value.error.errno == 1146
+    assert info.value.offset is None
+
+
+def test_mysql_statement_error_reports_the_row_once_isolated():
+    # O erro de linha do ID 4 leva a bisseção até o ID 5, cujo erro 1146 aparece sozinho
+    reject = {4: 1062, 5: 1146}
+    target = FakeTarget("mysql", reject=lambda row: reject.get(row[0]))
+    cur = target.connect().cursor()
+
+    with pytest.raises(ChunkLoadError) as info:
+        load_chunk("mysql", cur, SQL, ROWS)
+
+    assert info.value.offset == 4
+
+
+def test_oracle_batcherrors_return_rejected_offsets():
+    target = FakeTarget("oracle", reject=_rejecting(1, {1, 10}), keep_rows=True)
+    cur = target.connect().cursor()
+
+    rejected = load_chunk("oracle", cur, "INSERT INTO destino (ID, NOME) VALUES (:1, :2)", ROWS)
+
+    assert [offset for offset, _ in rejected] == [0, 9]
+    assert target.written == ROWS[1:9]
+    # Array DML: o bloco vai numa única ida ao banco
+    assert target.counters.round_trips == 1
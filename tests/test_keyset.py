@@ -0,0 +1,35 @@
+import re
+
+from app.utils.keyset import build_keyset_query
+
+QUERY = "SELECT id, nome FROM pacientes"
+LAST_KEY = [10, "MARIA"]
+
+
+def test_keyset_page_2_mysql_uses_pyformat_binds():
+    sql, binds = build_keyset_query(QUERY, "mysql", ["id", "nome"], LAST_KEY, 50)
+
+    assert binds == {"seek_0": 10, "seek_1": "MARIA"}
+    assert ":seek" not in sql
+    # Mesma substituição que o mysql-connector faz com %(nome)s
+    bound = sql % {name: repr(value) for name, value in binds.items()}
+    assert "q.id > 10" in bound
+    assert "q.id = 10 AND q.nome > 'MARIA'" in bound
+    assert bound.rstrip().endswith("LIMIT 51")
+
+
+def test_keyset_page_2_oracle_uses_named_binds():
+    sql, binds = build_keyset_query(QUERY, "oracle", ["id", "nome"], LAST_KEY, 50)
+
+    assert binds == {":seek_0": 10, ":seek_1": "MARIA"}
+    placeholders = set(re.findall(r":(seek_\d+)", sql))
+    assert placeholders == {name.lstrip(":") for name in binds}
+    assert "%(" not in sql
+    assert "ROWNUM <= 51" in sql
+
+
+def test_keyset_first_page_has_no_binds():
+    for db_type in ("mysql", "oracle"):
+        sql, binds = build_keyset_query(QUERY, db_type, ["id"], None, 50)
+        assert binds == {}
+        assert "seek" not in sql